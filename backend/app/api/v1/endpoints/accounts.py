@@ -8,15 +8,15 @@ from sqlalchemy import select
 from typing import List
 
 from app.core.database import get_db
-from app.core.auth import get_current_user
-from app.models.user import User
+from app.core.auth import get_current_principal
+from app.core.user_cache import UserPrincipal
 from app.models.account import Account, Platform, AccountStatus
 
 router = APIRouter()
 
 @router.get("/")
 async def get_user_accounts(
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """Get all connected social media accounts for current user"""
@@ -41,7 +41,7 @@ async def get_user_accounts(
 @router.post("/")
 async def add_account(
     account_data: dict,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """Add a new social media account"""
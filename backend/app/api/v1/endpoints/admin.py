@@ -0,0 +1,64 @@
+"""
+Admin endpoints - runtime diagnostics
+"""
+
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from app.core.auth import require_admin_role
+from app.core.profiler import ProfileResult, ProfilerBusy, profiler
+from app.core.user_cache import UserPrincipal
+
+router = APIRouter()
+
+
+def _render_profile(result: ProfileResult, output_format: str):
+    if output_format == "speedscope":
+        return JSONResponse(
+            result.speedscope(),
+            headers={"Content-Disposition": "attachment; filename=profile.speedscope.json"}
+        )
+    return PlainTextResponse(result.collapsed())
+
+
+@router.get("/profile")
+async def profile_worker(
+    seconds: float = Query(10.0, gt=0, le=120, description="How long to sample"),
+    interval_ms: float = Query(5.0, ge=1, le=100, description="Sampling interval"),
+    output_format: str = Query("collapsed", alias="format", pattern="^(collapsed|speedscope)$"),
+    include_idle: bool = Query(False, description="Keep samples of idle threads/event loop"),
+    current_user: UserPrincipal = Depends(require_admin_role)
+):
+    """
+    Sample all threads of this worker (event loop and thread pools) for N seconds
+
+    Returns collapsed stacks (for flamegraph.pl/inferno/speedscope) or speedscope JSON.
+    Only the worker process that serves this request is profiled.
+    """
+    try:
+        profiler.start(interval=interval_ms / 1000, include_idle=include_idle)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        result = await profiler.stop()
+
+    return _render_profile(result, output_format)
+
+
+@router.get("/profiles/{profile_id}")
+async def get_request_profile(
+    profile_id: str,
+    output_format: str = Query("collapsed", alias="format", pattern="^(collapsed|speedscope)$"),
+    current_user: UserPrincipal = Depends(require_admin_role)
+):
+    """Download a per-request profile (see the X-Profile request header)"""
+    result = profiler.get_stored(profile_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    return _render_profile(result, output_format)
@@ -10,9 +10,10 @@ from datetime import datetime, timezone
 import logging
 
 from app.core.database import get_db
-from app.core.auth import get_current_user, require_growth_plan
-from app.models.user import User
+from app.core.auth import get_current_principal, require_growth_plan
+from app.core.user_cache import UserPrincipal
 from app.services.ai.content_analyzer import content_analyzer
+from app.services.ai.usage_ledger import require_ai_budget
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +27,7 @@ class ContentGenerationRequest(BaseModel):
 @router.post("/generate-content")
 async def generate_content_suggestions(
     request: ContentGenerationRequest,
-    current_user: User = Depends(require_growth_plan),  # Growth+ feature
+    current_user: UserPrincipal = Depends(require_ai_budget(require_growth_plan)),  # Growth+ feature
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -55,7 +56,7 @@ async def generate_content_suggestions(
 @router.get("/trending-topics")
 async def get_trending_topics(
     platform: Optional[str] = None,
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_principal)
 ):
     """Get AI-identified trending topics"""
     # Simplified implementation - in production, this would analyze recent high-performing content
@@ -9,8 +9,8 @@ from datetime import datetime, timezone, timedelta
 from typing import Optional
 
 from app.core.database import get_db
-from app.core.auth import get_current_user
-from app.models.user import User
+from app.core.auth import get_current_principal
+from app.core.user_cache import UserPrincipal
 from app.models.account import Account, Platform
 from app.models.creative import Creative
 from app.models.metric import Metric
@@ -21,7 +21,7 @@ router = APIRouter()
 async def get_analytics_overview(
     days_back: int = Query(default=30, ge=1, le=90),
     platform: Optional[Platform] = None,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """Get analytics overview for user's content"""
@@ -72,7 +72,7 @@ async def get_analytics_overview(
 @router.get("/performance-trends")
 async def get_performance_trends(
     days_back: int = Query(default=30, ge=7, le=90),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """Get performance trends over time"""
@@ -3,19 +3,24 @@ Authentication endpoints
 """
 
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordRequestForm
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordRequestForm, HTTPAuthorizationCredentials
+from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.core.database import get_db
+from app.core.login_throttle import login_throttle, client_ip
 from app.core.auth import (
     authenticate_user, 
     create_access_token, 
     create_refresh_token,
     get_password_hash,
     get_current_user,
-    decode_token
+    decode_token,
+    revoke_token,
+    security
 )
 from app.models.user import User, SubscriptionPlan
 from app.schemas.auth import TokenResponse, UserCreate, UserResponse
@@ -49,7 +54,7 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash(user_data.password)
     new_user = User(
         email=user_data.email,
         username=user_data.username,
@@ -68,12 +73,16 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
 
 @router.post("/login", response_model=TokenResponse)
 async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: AsyncSession = Depends(get_db)
 ):
     """User login"""
+    await login_throttle.check(client_ip(request), form_data.username)
+    
     user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
+        await login_throttle.record_failure(form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -87,10 +96,11 @@ async def login(
     )
     refresh_token = create_refresh_token(data={"sub": str(user.id)})
     
-    # Update last login
+    # Update last login (also persists a rehashed password)
     from datetime import datetime, timezone
     user.last_login_at = datetime.now(timezone.utc)
     await db.commit()
+    await login_throttle.record_success(form_data.username)
     
     return TokenResponse(
         access_token=access_token,
@@ -101,7 +111,7 @@ async def login(
 
 @router.post("/refresh", response_model=TokenResponse)
 async def refresh_token(refresh_token: str, db: AsyncSession = Depends(get_db)):
-    """Refresh access token"""
+    """Exchange a refresh token for a new access token and a new (rotated) refresh token"""
     try:
         payload = decode_token(refresh_token)
         if payload.get("type") != "refresh":
@@ -126,15 +136,24 @@ async def refresh_token(refresh_token: str, db: AsyncSession = Depends(get_db)):
                 detail="User not found or inactive"
             )
         
-        # Create new access token
+        # Refresh tokens are single use: revoking fails if it was already exchanged
+        if not await revoke_token(refresh_token):
+            logger.warning(f"Reuse of a rotated refresh token for user {user.id}")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Refresh token has already been used"
+            )
+        
+        # Create new tokens
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
             data={"sub": str(user.id)}, expires_delta=access_token_expires
         )
+        new_refresh_token = create_refresh_token(data={"sub": str(user.id)})
         
         return TokenResponse(
             access_token=access_token,
-            refresh_token=refresh_token,  # Keep the same refresh token
+            refresh_token=new_refresh_token,
             token_type="bearer",
             expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
         )
@@ -151,8 +170,21 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
     return UserResponse.from_orm(current_user)
 
 @router.post("/logout")
-async def logout(current_user: User = Depends(get_current_user)):
-    """User logout"""
-    # In a real implementation, you might want to blacklist the token
-    # For now, we'll just return a success message
+async def logout(
+    refresh_token: Optional[str] = None,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: User = Depends(get_current_user)
+):
+    """User logout - revokes the access token and, if given, the refresh token"""
+    await revoke_token(credentials.credentials)
+    
+    if refresh_token:
+        try:
+            payload = decode_token(refresh_token)
+            if payload.get("type") == "refresh" and payload.get("sub") == str(current_user.id):
+                await revoke_token(refresh_token)
+        except HTTPException:
+            # Already invalid or expired, nothing to revoke
+            pass
+    
     return {"message": "Successfully logged out"} 
\ No newline at end of file
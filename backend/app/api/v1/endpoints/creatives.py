@@ -8,10 +8,11 @@ from sqlalchemy import select, desc, and_, or_
 from sqlalchemy.orm import selectinload
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timezone, timedelta
+from loguru import logger
 
 from app.core.database import get_db
-from app.core.auth import get_current_user, require_growth_plan
-from app.models.user import User
+from app.core.auth import get_current_principal, require_growth_plan
+from app.core.user_cache import UserPrincipal
 from app.models.account import Account, Platform
 from app.models.creative import Creative, CreativeType, ContentType
 from app.models.metric import Metric
@@ -23,6 +24,7 @@ from app.schemas.creative import (
     CreativeFilterParams
 )
 from app.services.ai.content_analyzer import content_analyzer
+from app.services.ai.usage_ledger import usage_ledger, require_ai_budget
 from app.core.monitoring import metrics
 
 router = APIRouter()
@@ -37,7 +39,7 @@ async def get_creatives(
     offset: Optional[int] = Query(default=0, ge=0),
     sort_by: Optional[str] = Query(default="published_at", regex="^(published_at|engagement_rate|views|buzz_score)$"),
     sort_order: Optional[str] = Query(default="desc", regex="^(asc|desc)$"),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -159,7 +161,7 @@ async def get_creatives(
 @router.get("/{creative_id}", response_model=CreativeResponse)
 async def get_creative(
     creative_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """Get a specific creative with full details"""
@@ -198,7 +200,7 @@ async def get_creative(
 @router.post("/{creative_id}/analyze", response_model=BuzzAnalysisResponse)
 async def analyze_creative_buzz_factors(
     creative_id: int,
-    current_user: User = Depends(require_growth_plan),  # Growth+ feature
+    current_user: UserPrincipal = Depends(require_ai_budget(require_growth_plan)),  # Growth+ feature
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -225,8 +227,10 @@ async def analyze_creative_buzz_factors(
                 detail="Creative not found"
             )
         
-        # Check if user has reached monthly limit
-        if not current_user.can_analyze_creatives(0):  # TODO: Get actual monthly count
+        # Check if user has reached monthly limit (counter, not a COUNT query)
+        monthly_usage = await usage_ledger.get_monthly_usage(current_user.id)
+        if not current_user.can_analyze_creatives(monthly_usage.requests.get("buzz_analysis", 0)):
+            metrics.record_ai_budget_rejection(current_user.subscription_plan.value, "monthly_analyses")
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Monthly analysis limit reached. Upgrade to Enterprise for unlimited analysis."
@@ -298,7 +302,7 @@ async def analyze_creative_buzz_factors(
 async def get_trending_genres(
     platform: Optional[Platform] = None,
     days_back: int = Query(default=7, ge=1, le=30),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -354,7 +358,7 @@ async def get_trending_genres(
 async def get_buzz_timeline(
     platform: Optional[Platform] = None,
     days_back: int = Query(default=30, ge=7, le=90),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """
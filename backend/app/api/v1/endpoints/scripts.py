@@ -8,6 +8,7 @@ from pydantic import BaseModel, Field
 
 from app.services.ai.script_generator import script_generator
 from app.services.social_media.youtube_trending import youtube_trending
+from app.core.http_cache import cache_control
 from loguru import logger
 
 router = APIRouter()
@@ -94,7 +95,7 @@ async def generate_script_from_video(request: GenerateScriptFromVideoRequest):
         if not videos:
             raise HTTPException(status_code=404, detail="Video not found")
         
-        video_data = videos[0]
+        video_data = videos[0].to_dict()
         
         # Generate script
         script = await script_generator.generate_script_from_video(
@@ -195,6 +196,7 @@ async def generate_call_to_actions(request: GenerateCTAsRequest):
 
 
 @router.get("/script-templates")
+@cache_control(max_age=3600)
 async def get_script_templates():
     """
     Get pre-made script templates for common video types
@@ -266,6 +268,7 @@ async def get_script_templates():
 
 
 @router.get("/style-guides")
+@cache_control(max_age=3600)
 async def get_style_guides():
     """
     Get style guides for different content types
@@ -2,15 +2,27 @@
 API endpoints for trending videos - Similar to 2nd-buzz.com
 """
 
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
-from datetime import datetime, timedelta
+import time
 from pydantic import BaseModel, Field
 
 from app.services.social_media.youtube_trending import youtube_trending
+from app.services.social_media.search_cache import keyword_search_cache
+from app.services.social_media.video_index import video_index
+from app.services.social_media.trending_patterns import trending_patterns
+from app.services.social_media.trending_feed import trending_feed
+from app.services.social_media.video_record import VideoRecord
 from app.services.ai.content_analyzer import content_analyzer
+from app.schemas.trending import trending_video_list_adapter
+from app.core.http_cache import cache_control
 from loguru import logger
 
+# List scores are computed against a clock floored to this (the /videos max-age),
+# so an unchanged chart serializes identically and keeps its ETag
+VIRAL_SCORE_CLOCK_SECONDS = 300
+
 router = APIRouter()
 
 
@@ -21,6 +33,13 @@ class VideoStatistics(BaseModel):
     comments: int
 
 
+class ViralSummary(BaseModel):
+    viral_score: float
+    status: str
+    views_per_hour: float
+    engagement_rate: float
+
+
 class TrendingVideoResponse(BaseModel):
     video_id: str
     url: str
@@ -35,6 +54,7 @@ class TrendingVideoResponse(BaseModel):
     statistics: VideoStatistics
     tags: List[str]
     category_id: str
+    viral: ViralSummary  # always set by the list endpoints
 
 
 class ViralPotentialResponse(BaseModel):
@@ -42,10 +62,26 @@ class ViralPotentialResponse(BaseModel):
     engagement_rate: float
     views_per_hour: float
     hours_since_published: float
+    acceleration: Optional[float] = None  # views/hour per hour, from trending snapshots
+    velocity_source: str = "lifetime"  # snapshots or lifetime (views / hours since published)
     status: str
     prediction: str
 
 
+class ViralPotentialBatchRequest(BaseModel):
+    video_ids: List[str] = Field(..., min_length=1, max_length=500, description="YouTube video IDs (50 per quota unit)")
+    time_window_hours: int = Field(default=24, ge=1, le=168, description="Time window for snapshot velocity")
+
+
+class ViralPotentialItem(ViralPotentialResponse):
+    video_id: str
+
+
+class ViralPotentialBatchResponse(BaseModel):
+    results: List[ViralPotentialItem]
+    not_found: List[str]
+
+
 class TrendingAnalysisResponse(BaseModel):
     total_videos_analyzed: int
     top_categories: List[dict]
@@ -54,8 +90,32 @@ class TrendingAnalysisResponse(BaseModel):
     average_metrics: dict
 
 
+class TrendingPatternsResponse(TrendingAnalysisResponse):
+    region: str
+    window: str
+    observations: int  # video appearances counted (once per video per 15-minute bucket)
+
+
+async def _video_list_response(videos: List[VideoRecord]) -> Response:
+    """
+    Serialize video records directly to JSON (response_model is kept for the docs only)
+    
+    Every video is annotated with its viral score, computed for the whole list in one pass.
+    """
+    now = time.time() // VIRAL_SCORE_CLOCK_SECONDS * VIRAL_SCORE_CLOCK_SECONDS
+    scores = await youtube_trending.score_viral_potential(videos, now=now)
+    items = []
+    for video, viral in zip(videos, scores.summaries()):
+        item = video.to_dict()
+        item["viral"] = viral
+        items.append(item)
+    content = trending_video_list_adapter.dump_json(items)
+    return Response(content=content, media_type="application/json")
+
+
 # Endpoints
 @router.get("/videos", response_model=List[TrendingVideoResponse])
+@cache_control(max_age=300, stale_while_revalidate=60)
 async def get_trending_videos(
     region: str = Query(default="US", description="Region code (e.g., US, JP, KR)"),
     category: Optional[str] = Query(default=None, description="YouTube category ID"),
@@ -75,14 +135,42 @@ async def get_trending_videos(
             category_id=category_id,
             max_results=max_results
         )
+        if not videos:
+            # Upstream failures come back as []; a 503 is not cached like a 200 chart would be
+            raise HTTPException(status_code=503, detail="Trending chart is temporarily unavailable")
         
-        return videos
+        return await _video_list_response(videos)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching trending videos: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error fetching trending videos: {str(e)}")
 
 
+@router.get("/live")
+async def live_trending_feed(
+    region: str = Query(default="US", pattern="^[A-Z]{2}$", description="Region code (e.g., US, JP, KR)"),
+    category: Optional[str] = Query(default=None, pattern="^([0-9]+|all)$", description="YouTube category ID")
+):
+    """
+    Live trending chart as Server-Sent Events
+    
+    Sends a `snapshot` event with the ranked chart on connect, then `diff`
+    events (added, removed, moved, stats) whenever the chart changes. One
+    upstream poller per region/category is shared by all connected clients.
+    """
+    category_id = None if category == "all" else category
+    if not trending_feed.has_capacity(region, category_id):
+        raise HTTPException(status_code=503, detail="Live feed capacity reached, use /trending/videos instead")
+    
+    return StreamingResponse(
+        trending_feed.stream(region, category_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/search", response_model=List[TrendingVideoResponse])
 async def search_videos(
     keyword: str = Query(..., description="Search keyword or phrase"),
@@ -94,26 +182,40 @@ async def search_videos(
     order: str = Query(
         default="relevance",
         description="Sort order: relevance, date, viewCount, rating"
-    )
+    ),
+    source: str = Query(
+        default="youtube",
+        pattern="^(youtube|local)$",
+        description="youtube (search API, cached) or local (index of videos already fetched, no quota)"
+    ),
+    min_views: Optional[int] = Query(default=None, ge=0, description="Only videos with at least this many views")
 ):
     """
     Search for videos by keyword
     
-    Similar to 2nd-buzz.com keyword search feature
+    Similar to 2nd-buzz.com keyword search feature. YouTube results are cached
+    by normalized keyword, order and a bucketed published_after_hours;
+    source=local searches the local full-text index instead (BM25 relevance).
     """
     try:
-        published_after = None
-        if published_after_hours:
-            published_after = datetime.now() - timedelta(hours=published_after_hours)
-        
-        videos = await youtube_trending.search_videos_by_keyword(
-            keyword=keyword,
-            published_after=published_after,
-            max_results=max_results,
-            order=order
-        )
+        if source == "local":
+            videos = await video_index.search(
+                query=keyword,
+                max_results=max_results,
+                order=order,
+                min_views=min_views,
+                published_after_hours=published_after_hours
+            )
+        else:
+            videos = await keyword_search_cache.search(
+                keyword=keyword,
+                published_after_hours=published_after_hours,
+                max_results=max_results,
+                order=order,
+                min_views=min_views
+            )
         
-        return videos
+        return await _video_list_response(videos)
         
     except Exception as e:
         logger.error(f"Error searching videos: {str(e)}")
@@ -137,11 +239,9 @@ async def analyze_viral_potential(
         if not videos:
             raise HTTPException(status_code=404, detail="Video not found")
         
-        video_data = videos[0]
-        
         # Analyze viral potential
         analysis = await youtube_trending.detect_viral_potential(
-            video_data=video_data,
+            video=videos[0],
             time_window_hours=time_window_hours
         )
         
@@ -154,6 +254,34 @@ async def analyze_viral_potential(
         raise HTTPException(status_code=500, detail=f"Error analyzing viral potential: {str(e)}")
 
 
+@router.post("/viral-potential", response_model=ViralPotentialBatchResponse)
+async def analyze_viral_potential_batch(request: ViralPotentialBatchRequest):
+    """
+    Analyze the viral potential of many videos at once
+    
+    Fetches the videos 50 per request (requests run concurrently) and scores them in a single pass
+    """
+    try:
+        video_ids = list(dict.fromkeys(request.video_ids))
+        videos = await youtube_trending._get_videos_details(video_ids)
+        
+        scores = await youtube_trending.score_viral_potential(videos, request.time_window_hours)
+        results = [
+            {"video_id": video_id, **analysis}
+            for video_id, analysis in zip(scores.video_ids, scores.analyses())
+        ]
+        
+        found = set(scores.video_ids)
+        return {
+            "results": results,
+            "not_found": [video_id for video_id in video_ids if video_id not in found]
+        }
+        
+    except Exception as e:
+        logger.error(f"Error analyzing viral potential batch: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error analyzing viral potential: {str(e)}")
+
+
 @router.post("/analyze-trending-patterns", response_model=TrendingAnalysisResponse)
 async def analyze_trending_patterns(
     video_ids: List[str] = None,
@@ -163,7 +291,9 @@ async def analyze_trending_patterns(
     """
     Analyze patterns in trending videos
     
-    Identifies common themes, tags, categories, and engagement patterns
+    Identifies common themes, tags, categories, and engagement patterns of
+    the given videos or of the region's current chart. For aggregates over
+    1h/24h/7d without fetching, use GET /trending/patterns.
     """
     try:
         videos = []
@@ -193,7 +323,30 @@ async def analyze_trending_patterns(
         raise HTTPException(status_code=500, detail=f"Error analyzing patterns: {str(e)}")
 
 
+@router.get("/patterns", response_model=TrendingPatternsResponse)
+@cache_control(max_age=60)
+async def get_trending_patterns(
+    region: str = Query(default="US", description="Region code (e.g., US, JP, KR)"),
+    window: str = Query(default="24h", pattern="^(1h|24h|7d)$", description="Sliding window: 1h, 24h or 7d")
+):
+    """
+    Top categories, top tags and duration distribution of a region's chart
+    
+    Answered from the incrementally maintained aggregate of charts seen in the
+    window, without fetching from YouTube. Counts are video appearances per
+    15-minute bucket; tag counts are Count-Min Sketch estimates.
+    """
+    try:
+        patterns = await trending_patterns.patterns(region, window)
+        return {"region": region, "window": window, **patterns}
+        
+    except Exception as e:
+        logger.error(f"Error aggregating trending patterns: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error aggregating trending patterns: {str(e)}")
+
+
 @router.get("/categories")
+@cache_control(max_age=86400)
 async def get_video_categories():
     """
     Get YouTube video categories
@@ -227,6 +380,7 @@ async def get_video_categories():
 
 
 @router.get("/regions")
+@cache_control(max_age=86400)
 async def get_supported_regions():
     """
     Get supported region codes for trending videos
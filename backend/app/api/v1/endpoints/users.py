@@ -8,6 +8,7 @@ from sqlalchemy import select
 
 from app.core.database import get_db
 from app.core.auth import get_current_user
+from app.core.user_cache import user_principal_cache
 from app.models.user import User
 from app.schemas.auth import UserResponse
 
@@ -32,4 +33,5 @@ async def update_user_profile(
     
     await db.commit()
     await db.refresh(current_user)
+    user_principal_cache.invalidate(current_user.id)
     return UserResponse.from_orm(current_user) 
\ No newline at end of file
@@ -3,7 +3,7 @@ Main API router
 """
 
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, users, accounts, creatives, analytics, ai, trending, scripts
+from app.api.v1.endpoints import auth, users, accounts, creatives, analytics, ai, trending, scripts, admin
 
 api_router = APIRouter()
 
@@ -15,4 +15,5 @@ api_router.include_router(creatives.router, prefix="/creatives", tags=["creative
 api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
 api_router.include_router(ai.router, prefix="/ai", tags=["ai"])
 api_router.include_router(trending.router, prefix="/trending", tags=["trending"])
-api_router.include_router(scripts.router, prefix="/scripts", tags=["scripts"])
\ No newline at end of file
+api_router.include_router(scripts.router, prefix="/scripts", tags=["scripts"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
@@ -4,8 +4,7 @@ Authentication and authorization utilities
 
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Union
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+import uuid
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -13,23 +12,29 @@ from sqlalchemy import select
 
 from app.core.config import get_settings
 from app.core.database import get_db
+from app.core.jwt_backends import TokenDecodeError, VerifiedTokenCache, get_jwt_backend
+from app.core.token_revocation import token_revocation
+from app.core.passwords import password_hasher
 from app.models.user import User
+from app.core.user_cache import UserPrincipal, user_principal_cache
 
 settings = get_settings()
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # Security scheme
 security = HTTPBearer()
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+# JWT implementation and cache of already verified tokens
+jwt_backend = get_jwt_backend(settings.JWT_BACKEND)
+verified_token_cache = VerifiedTokenCache(maxsize=settings.JWT_VERIFIED_CACHE_SIZE)
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    valid, _ = await password_hasher.verify_and_update(plain_password, hashed_password)
+    return valid
 
-def get_password_hash(password: str) -> str:
+async def get_password_hash(password: str) -> str:
     """Hash a password"""
-    return pwd_context.hash(password)
+    return await password_hasher.hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create access token"""
@@ -39,30 +44,60 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
+    encoded_jwt = jwt_backend.encode(to_encode, settings.SECRET_KEY, settings.ALGORITHM)
     return encoded_jwt
 
 def create_refresh_token(data: dict) -> str:
     """Create refresh token"""
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire, "type": "refresh"})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    to_encode.update({"exp": expire, "type": "refresh", "jti": uuid.uuid4().hex})
+    encoded_jwt = jwt_backend.encode(to_encode, settings.SECRET_KEY, settings.ALGORITHM)
     return encoded_jwt
 
 def decode_token(token: str) -> dict:
-    """Decode and validate token"""
+    """Decode and validate token (signature checks are skipped for recently verified tokens)"""
+    payload = verified_token_cache.get(token)
+    if payload is not None:
+        return payload
+    
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = jwt_backend.decode(token, settings.SECRET_KEY, settings.ALGORITHM)
+        verified_token_cache.set(token, payload)
         return payload
-    except JWTError:
+    except TokenDecodeError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+async def ensure_token_not_revoked(payload: dict) -> None:
+    """Reject tokens whose jti has been revoked (logout or refresh-token rotation)"""
+    jti = payload.get("jti")
+    if jti and await token_revocation.is_revoked(jti):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+async def revoke_token(token: str) -> bool:
+    """
+    Revoke a token until it expires
+    
+    Returns:
+        False if the token was already revoked
+    """
+    payload = decode_token(token)
+    verified_token_cache.discard(token)
+    jti = payload.get("jti")
+    if not jti:
+        # Tokens issued before jti claims existed cannot be revoked individually
+        return True
+    return await token_revocation.revoke(jti, payload.get("exp"))
+
 async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
     """Get user by email"""
     result = await db.execute(select(User).where(User.email == email))
@@ -74,12 +109,20 @@ async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
     return result.scalar_one_or_none()
 
 async def authenticate_user(db: AsyncSession, email: str, password: str) -> Union[User, bool]:
-    """Authenticate user with email and password"""
+    """
+    Authenticate user with email and password
+    
+    A hash made with outdated parameters is replaced on the user object;
+    the caller's commit persists it.
+    """
     user = await get_user_by_email(db, email)
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = await password_hasher.verify_and_update(password, user.hashed_password)
+    if not valid:
         return False
+    if new_hash:
+        user.hashed_password = new_hash
     return user
 
 async def get_current_user(
@@ -93,12 +136,10 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    try:
-        payload = decode_token(credentials.credentials)
-        user_id: int = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
+    payload = decode_token(credentials.credentials)
+    await ensure_token_not_revoked(payload)
+    user_id: int = payload.get("sub")
+    if user_id is None:
         raise credentials_exception
     
     user = await get_user_by_id(db, user_id=user_id)
@@ -113,6 +154,49 @@ async def get_current_user(
     
     return user
 
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db)
+) -> UserPrincipal:
+    """
+    Get a cached snapshot of the authenticated user (id, role, plan, limits)
+    
+    Use this instead of get_current_user when the full User row is not needed;
+    the users table is only queried on a cache miss.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    
+    payload = decode_token(credentials.credentials)
+    await ensure_token_not_revoked(payload)
+    user_id = payload.get("sub")
+    if user_id is None:
+        raise credentials_exception
+    
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        raise credentials_exception
+    
+    principal = await user_principal_cache.get(user_id)
+    if principal is None:
+        user = await get_user_by_id(db, user_id=user_id)
+        if user is None:
+            raise credentials_exception
+        principal = UserPrincipal.from_user(user)
+        await user_principal_cache.set(principal)
+    
+    if not principal.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Inactive user"
+        )
+    
+    return principal
+
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """Get current active user"""
     if not current_user.is_active:
@@ -121,7 +205,7 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
 
 def require_subscription_plan(required_plan: str):
     """Decorator to require specific subscription plan"""
-    def subscription_checker(current_user: User = Depends(get_current_active_user)) -> User:
+    def subscription_checker(current_user: UserPrincipal = Depends(get_current_principal)) -> UserPrincipal:
         plan_hierarchy = {"starter": 1, "growth": 2, "enterprise": 3}
         
         current_level = plan_hierarchy.get(current_user.subscription_plan.value, 0)
@@ -139,7 +223,7 @@ def require_subscription_plan(required_plan: str):
 
 def require_role(required_role: str):
     """Decorator to require specific user role"""
-    def role_checker(current_user: User = Depends(get_current_active_user)) -> User:
+    def role_checker(current_user: UserPrincipal = Depends(get_current_principal)) -> UserPrincipal:
         if current_user.role.value != required_role and current_user.role.value != "admin":
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
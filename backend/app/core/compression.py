@@ -0,0 +1,123 @@
+"""
+Response compression
+
+Compresses complete responses above a size threshold with the best encoding
+the client accepts: brotli when the optional `brotli` package is installed,
+otherwise gzip. Streamed responses (e.g. server-sent events), already-encoded
+bodies and non-text content types pass through untouched.
+"""
+
+from typing import Dict, Optional, Tuple
+import gzip
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
+UNCOMPRESSIBLE_TYPES = ("text/event-stream",)
+
+# Server preference when the client accepts several with the same q-value
+SUPPORTED_ENCODINGS: Tuple[str, ...] = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def _parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Accept-Encoding to {coding: q-value}"""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Preferred supported content-coding for an Accept-Encoding header, if any"""
+    if not accept_encoding:
+        return None
+
+    accepted = _parse_accept_encoding(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for coding in SUPPORTED_ENCODINGS:
+        quality = accepted.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+class CompressionMiddleware:
+    """ASGI middleware applying negotiated gzip/brotli compression"""
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        pending_start = None
+
+        async def send_wrapper(message):
+            nonlocal pending_start
+
+            if message["type"] == "http.response.start":
+                if self._may_compress(message):
+                    # Hold the headers until we know whether the body is complete
+                    pending_start = message
+                    return
+
+            if message["type"] == "http.response.body" and pending_start is not None:
+                start, pending_start = pending_start, None
+                body = message.get("body", b"")
+                if not message.get("more_body", False) and self._should_compress(start, body):
+                    # Compressible whether or not this client accepts it, so caches must vary
+                    headers = MutableHeaders(scope=start)
+                    headers.add_vary_header("Accept-Encoding")
+                    if encoding is not None:
+                        body = self._compress(body, encoding)
+                        headers["Content-Encoding"] = encoding
+                        headers["Content-Length"] = str(len(body))
+                        message = {**message, "body": body}
+                await send(start)
+
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _may_compress(start) -> bool:
+        """Whether the body could be compressed; otherwise headers are sent immediately (e.g. SSE)"""
+        if start["status"] in (204, 304):
+            return False
+        headers = Headers(raw=start.get("headers", []))
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES) and not content_type.startswith(UNCOMPRESSIBLE_TYPES)
+
+    def _should_compress(self, start, body: bytes) -> bool:
+        return len(body) >= self.minimum_size and self._may_compress(start)
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        # mtime=0 keeps output deterministic, so ETags of compressed bodies are stable
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
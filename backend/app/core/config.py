@@ -27,6 +27,11 @@ class Settings(BaseSettings):
     DATABASE_URL: str = Field(...)
     DATABASE_POOL_SIZE: int = Field(default=10)
     DATABASE_MAX_OVERFLOW: int = Field(default=20)
+    AUTO_CREATE_TABLES: bool = Field(default=False)  # run create_all on startup instead of `python -m app.migrate`
+    DATABASE_ECHO: bool = Field(default=False)  # log every statement (very noisy; see SLOW_QUERY_MS)
+    SLOW_QUERY_MS: float = Field(default=200.0)  # slower statements are logged with their EXPLAIN plan
+    N_PLUS_ONE_THRESHOLD: int = Field(default=10)  # same statement this many times in one request
+    REQUEST_QUERY_BUDGET: int = Field(default=50)  # warn above this many statements per request (0 = off)
     
     # Redis
     REDIS_URL: str = Field(...)
@@ -35,6 +40,23 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(default=30)
     REFRESH_TOKEN_EXPIRE_DAYS: int = Field(default=7)
     ALGORITHM: str = "HS256"
+    JWT_BACKEND: str = Field(default="pyjwt")  # pyjwt or jose (see benchmarks/bench_jwt.py)
+    JWT_VERIFIED_CACHE_SIZE: int = Field(default=10000)  # 0 disables the verified-token cache
+    TOKEN_REVOCATION_BACKEND: str = Field(default="memory")  # memory or redis
+    TOKEN_REVOCATION_BLOOM_CAPACITY: int = Field(default=100000)
+    TOKEN_REVOCATION_BLOOM_ERROR_RATE: float = Field(default=0.001)
+    PASSWORD_HASH_TARGET_MS: float = Field(default=250.0)  # bcrypt cost is benchmarked against this at startup
+    PASSWORD_HASH_MIN_ROUNDS: int = Field(default=12)  # never below passlib's previous default cost
+    PASSWORD_HASH_MAX_ROUNDS: int = Field(default=14)
+    PASSWORD_HASH_ROUNDS: Optional[int] = Field(default=None)  # pin the cost and skip the benchmark
+    PASSWORD_HASH_WORKERS: int = Field(default=4)
+    LOGIN_THROTTLE_BACKEND: str = Field(default="memory")  # memory or redis
+    LOGIN_ATTEMPT_WINDOW_SECONDS: int = Field(default=300)
+    LOGIN_MAX_ATTEMPTS_PER_IP: int = Field(default=30)
+    LOGIN_MAX_FAILURES_PER_EMAIL: int = Field(default=5)
+    USER_CACHE_BACKEND: str = Field(default="memory")  # memory or redis (invalidations reach all workers)
+    USER_CACHE_TTL_SECONDS: int = Field(default=30)
+    USER_CACHE_MAX_SIZE: int = Field(default=10000)
     
     # CORS
     CORS_ORIGINS: List[str] = Field(
@@ -44,12 +66,31 @@ class Settings(BaseSettings):
         default=["localhost", "127.0.0.1"]
     )
     
+    # Response compression
+    COMPRESSION_MINIMUM_SIZE: int = Field(default=1024)  # bytes; smaller bodies are sent as-is
+    COMPRESSION_GZIP_LEVEL: int = Field(default=6)
+    COMPRESSION_BROTLI_QUALITY: int = Field(default=5)  # used when the brotli package is installed
+    
     # YouTube API
     YOUTUBE_API_KEY: str = Field(...)
+    YOUTUBE_API_BASE: str = Field(default="https://www.googleapis.com/youtube/v3")  # local fake: http://127.0.0.1:8200/youtube/v3
+    SEARCH_CACHE_BACKEND: str = Field(default="memory")  # memory or redis (shared across workers)
+    SEARCH_CACHE_MAX_ENTRIES: int = Field(default=2000)
+    SEARCH_CACHE_WARM_INTERVAL_MINUTES: int = Field(default=0)  # 0 = no background warming
+    SEARCH_CACHE_WARM_TERMS: int = Field(default=5)  # searches per warm run (~101 quota units each)
+    SEARCH_CACHE_WARM_REGION: str = Field(default="US")  # trending tags of this region are warmed too
+    VIDEO_INDEX_ENABLED: bool = Field(default=True)  # index fetched videos for /trending/search?source=local
+    TRENDING_SNAPSHOT_INTERVAL_MINUTES: int = Field(default=0)  # 0 = off; enable in one process only, or use python -m app.snapshot
+    TRENDING_SNAPSHOT_REGIONS: List[str] = Field(default=["US", "JP"])  # one videos.list call (1 unit) per region per run
+    TRENDING_SNAPSHOT_RETENTION_DAYS: int = Field(default=30)
+    TRENDING_FEED_INTERVAL_SECONDS: int = Field(default=120)  # live feed chart refresh; 1 quota unit per region/category per worker
+    TRENDING_FEED_MAX_CHANNELS: int = Field(default=20)  # region/category pollers per worker
+    TRENDING_FEED_HEARTBEAT_SECONDS: int = Field(default=15)  # keep-alive comment interval for proxies
     
     # OpenAI
     OPENAI_API_KEY: str = Field(...)
     OPENAI_MODEL: str = Field(default="gpt-4o")
+    OPENAI_BASE_URL: Optional[str] = Field(default=None)  # e.g. local stub: http://127.0.0.1:8100/v1
     
     # Celery
     CELERY_BROKER_URL: str = Field(...)
@@ -65,9 +106,20 @@ class Settings(BaseSettings):
     # AI Settings
     AI_LABELING_BATCH_SIZE: int = Field(default=10)
     IMAGE_RESIZE_WIDTH: int = Field(default=256)
+    PROMPT_DESCRIPTION_MAX_TOKENS: int = Field(default=300)  # Description budget after boilerplate stripping
+    PROMPT_MAX_TAGS: int = Field(default=10)
+    AI_USAGE_BACKEND: str = Field(default="memory")  # memory or redis (shared across workers)
+    AI_USAGE_RESYNC_SECONDS: int = Field(default=30)  # memory backend: re-read counters from ai_usage (other workers' usage)
+    AI_MONTHLY_TOKEN_BUDGET_STARTER: int = Field(default=100_000)  # 0 = unlimited
+    AI_MONTHLY_TOKEN_BUDGET_GROWTH: int = Field(default=2_000_000)
+    AI_MONTHLY_TOKEN_BUDGET_ENTERPRISE: int = Field(default=0)
     
     # Monitoring
     PROMETHEUS_PORT: int = Field(default=8080)
+    LOG_JSON_FILE: Optional[str] = Field(default=None)  # e.g. logs/app.jsonl (structured JSON lines sink)
+    LOG_INFO_SAMPLE_RATE: float = Field(default=1.0)  # fraction of INFO/DEBUG records kept (WARNING+ always kept)
+    PROFILING_TOKEN: Optional[str] = Field(default=None)  # enables per-request profiling via "X-Profile: <token>"
+    OTEL_ENABLED: bool = Field(default=False)  # emit OpenTelemetry spans for outbound calls (needs opentelemetry-api)
 
 @lru_cache()
 def get_settings() -> Settings:
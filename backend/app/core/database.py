@@ -10,6 +10,7 @@ from contextlib import asynccontextmanager
 import asyncio
 
 from app.core.config import get_settings
+from app.core.query_profiler import instrument_engine
 
 settings = get_settings()
 
@@ -23,7 +24,7 @@ is_sqlite = "sqlite" in SQLALCHEMY_DATABASE_URL
 if is_sqlite:
     async_engine = create_async_engine(
         SQLALCHEMY_DATABASE_URL,
-        echo=settings.ENVIRONMENT == "development",
+        echo=settings.DATABASE_ECHO,
         future=True,
         connect_args={"check_same_thread": False}
     )
@@ -32,7 +33,7 @@ else:
         SQLALCHEMY_DATABASE_URL,
         pool_size=settings.DATABASE_POOL_SIZE,
         max_overflow=settings.DATABASE_MAX_OVERFLOW,
-        echo=settings.ENVIRONMENT == "development",
+        echo=settings.DATABASE_ECHO,
         future=True
     )
 
@@ -40,7 +41,7 @@ else:
 if is_sqlite:
     sync_engine = create_engine(
         SQLALCHEMY_DATABASE_URL.replace("+aiosqlite", ""),
-        echo=settings.ENVIRONMENT == "development",
+        echo=settings.DATABASE_ECHO,
         connect_args={"check_same_thread": False}
     )
 else:
@@ -48,9 +49,13 @@ else:
         SQLALCHEMY_DATABASE_URL.replace("+asyncpg", "+psycopg2"),
         pool_size=settings.DATABASE_POOL_SIZE,
         max_overflow=settings.DATABASE_MAX_OVERFLOW,
-        echo=settings.ENVIRONMENT == "development"
+        echo=settings.DATABASE_ECHO
     )
 
+# Statement timing, fingerprints and slow-query plans
+instrument_engine(async_engine.sync_engine)
+instrument_engine(sync_engine)
+
 # Session makers
 AsyncSessionLocal = async_sessionmaker(
     async_engine, 
@@ -74,7 +79,7 @@ async def init_db():
     """Initialize database"""
     async with async_engine.begin() as conn:
         # Import all models here to ensure they are created
-        from app.models import user, creative, account, metric, label  # noqa
+        from app.models import user, creative, account, metric, label, ai_usage, video_index, trending_snapshot  # noqa
         await conn.run_sync(Base.metadata.create_all)
 
 async def get_db() -> AsyncSession:
@@ -0,0 +1,108 @@
+"""
+HTTP caching for read endpoints
+
+Endpoints opt in with the @cache_control(...) decorator. For their successful
+GET responses HTTPCacheMiddleware adds Cache-Control and a strong ETag, and
+answers a matching If-None-Match with 304 Not Modified and no body.
+
+The ETag is a hash of the body as sent. This middleware runs outside
+CompressionMiddleware, so each content-coding gets its own tag.
+"""
+
+from typing import Callable, Optional
+import hashlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+# Headers a 304 must repeat from the 200 it stands in for (RFC 9110 15.4.5)
+NOT_MODIFIED_HEADERS = {b"cache-control", b"content-location", b"date", b"etag", b"expires", b"vary"}
+
+
+def cache_control(max_age: int, private: bool = False, stale_while_revalidate: int = 0) -> Callable:
+    """
+    Mark an endpoint's GET responses as cacheable
+
+    Apply below the router decorator:
+
+        @router.get("/categories")
+        @cache_control(max_age=86400)
+        async def get_video_categories(): ...
+    """
+    directive = f"{'private' if private else 'public'}, max-age={max_age}"
+    if stale_while_revalidate:
+        directive += f", stale-while-revalidate={stale_while_revalidate}"
+
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.__cache_control__ = directive
+        return endpoint
+
+    return decorator
+
+
+def make_etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+class HTTPCacheMiddleware:
+    """ASGI middleware adding ETag/Cache-Control and 304s for @cache_control endpoints"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        pending_start = None
+        directive: Optional[str] = None
+
+        async def send_wrapper(message):
+            nonlocal pending_start, directive
+
+            if message["type"] == "http.response.start":
+                # Routing has run by now, so the matched endpoint is known
+                endpoint = getattr(scope.get("route"), "endpoint", None)
+                directive = getattr(endpoint, "__cache_control__", None)
+                if directive is None or message["status"] != 200:
+                    await send(message)
+                    return
+                pending_start = message
+                return
+
+            if message["type"] == "http.response.body" and pending_start is not None:
+                start, pending_start = pending_start, None
+                headers = MutableHeaders(scope=start)
+                headers["Cache-Control"] = directive
+
+                # Streamed bodies cannot be hashed up front; they only get Cache-Control
+                if not message.get("more_body", False):
+                    etag = make_etag(message.get("body", b""))
+                    headers["ETag"] = etag
+
+                    if_none_match = Headers(scope=scope).get("if-none-match")
+                    if if_none_match and etag_matches(if_none_match, etag):
+                        await send({
+                            "type": "http.response.start",
+                            "status": 304,
+                            "headers": [
+                                (name, value) for name, value in start["headers"]
+                                if name.lower() in NOT_MODIFIED_HEADERS
+                            ]
+                        })
+                        await send({"type": "http.response.body", "body": b""})
+                        return
+
+                await send(start)
+
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,229 @@
+"""
+Instrumented outbound HTTP
+
+All calls to upstream APIs (YouTube, OpenAI, media downloads) go through
+httpx clients built here. An httpx transport wrapper records per-upstream,
+per-endpoint latency, status, response size and retries in Prometheus, plus
+time-to-first-token for streamed OpenAI completions and time to response
+headers for non-streamed ones. The model and stream flag come from
+openai_request() at the call site, so request bodies (which can carry base64
+images) are never parsed. When OTEL_ENABLED is set
+and opentelemetry-api is installed, each call is also a client span (exporters
+are configured through the OpenTelemetry SDK/environment as usual).
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+import re
+import time
+
+import httpx
+
+from app.core.config import get_settings
+from app.core.monitoring import metrics
+
+settings = get_settings()
+
+VERSION_SEGMENT = re.compile(r"^v\d+$")
+ID_SEGMENT = re.compile(r"^(?=.*\d)[\w-]{8,}$|^\d+$")
+
+_tracer = None
+
+# (model, streaming) of the OpenAI call being made in this context
+_openai_request: ContextVar[Optional[Tuple[str, bool]]] = ContextVar("openai_request", default=None)
+
+
+def get_tracer():
+    """OpenTelemetry tracer, or None when tracing is disabled or not installed"""
+    global _tracer
+    if _tracer is None and settings.OTEL_ENABLED:
+        try:
+            from opentelemetry import trace
+            _tracer = trace.get_tracer("creaft")
+        except ImportError:
+            _tracer = False
+    return _tracer or None
+
+
+@contextmanager
+def span(name: str, attributes: Optional[Dict[str, Any]] = None):
+    """Current-context span (yields None when tracing is off)"""
+    tracer = get_tracer()
+    if tracer is None:
+        yield None
+        return
+    with tracer.start_as_current_span(name, attributes=attributes or {}) as current:
+        yield current
+
+
+@contextmanager
+def openai_request(model: str, streaming: bool = False):
+    """Label OpenAI calls made inside the block with their model and stream flag"""
+    token = _openai_request.set((model, streaming))
+    try:
+        yield
+    finally:
+        _openai_request.reset(token)
+
+
+def endpoint_label(path: str) -> str:
+    """
+    Low-cardinality endpoint name from a URL path
+
+    Drops everything up to the API version segment and replaces id-like
+    segments, e.g. /youtube/v3/videos -> videos, /v1/chat/completions -> chat/completions.
+    """
+    segments = [segment for segment in path.split("/") if segment]
+    for index, segment in enumerate(segments):
+        if VERSION_SEGMENT.match(segment):
+            segments = segments[index + 1:]
+            break
+    return "/".join("{id}" if ID_SEGMENT.match(segment) else segment for segment in segments) or "/"
+
+
+class _CallObservation:
+    """Timing and size of one outbound call, finished when its body is closed"""
+
+    def __init__(self, request: httpx.Request, upstream: str, endpoint: str):
+        self.upstream = upstream
+        self.endpoint = endpoint
+        self.start = time.perf_counter()
+        self.status = "error"
+        self.size = 0
+        self.model: Optional[str] = None
+        self.streaming = False
+        self._first_chunk = True
+        self._finished = False
+        self._span = None
+
+        if upstream == "openai":
+            self.model, self.streaming = _openai_request.get() or ("unknown", False)
+
+        retry_count = request.headers.get("x-stainless-retry-count")
+        if retry_count and retry_count != "0":
+            metrics.record_upstream_retry(upstream, endpoint)
+
+        tracer = get_tracer()
+        if tracer is not None:
+            from opentelemetry.trace import SpanKind
+            self._span = tracer.start_span(
+                f"{request.method} {upstream} {endpoint}",
+                kind=SpanKind.CLIENT,
+                attributes={
+                    "http.request.method": request.method,
+                    "server.address": request.url.host,
+                    "url.path": request.url.path,
+                    "upstream": upstream,
+                }
+            )
+
+    def on_response(self, status_code: int) -> None:
+        self.status = str(status_code)
+        if self.model and not self.streaming:
+            # Non-streamed completions send headers once the whole reply is generated
+            metrics.record_openai_time_to_response(self.model, time.perf_counter() - self.start)
+        if self._span is not None:
+            self._span.set_attribute("http.response.status_code", status_code)
+
+    def on_chunk(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self._first_chunk and chunk:
+            self._first_chunk = False
+            if self.streaming and self.model:
+                metrics.record_openai_time_to_first_token(self.model, time.perf_counter() - self.start)
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        if self._finished:
+            return
+        self._finished = True
+
+        duration = time.perf_counter() - self.start
+        metrics.record_upstream_call(self.upstream, self.endpoint, self.status, duration, self.size)
+
+        if self._span is not None:
+            self._span.set_attribute("http.response.body.size", self.size)
+            if error is not None:
+                self._span.record_exception(error)
+            self._span.end()
+
+
+class _ObservedStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, observation: _CallObservation):
+        self._stream = stream
+        self._observation = observation
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            self._observation.on_chunk(chunk)
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._observation.finish()
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """httpx transport that records metrics/spans for every request"""
+
+    def __init__(self, upstream: str, endpoint: Optional[str] = None, **transport_kwargs: Any):
+        self.upstream = upstream
+        self.endpoint = endpoint
+        self._transport = httpx.AsyncHTTPTransport(**transport_kwargs)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        observation = _CallObservation(request, self.upstream, self.endpoint or endpoint_label(request.url.path))
+
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception as e:
+            observation.finish(error=e)
+            raise
+
+        observation.on_response(response.status_code)
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ObservedStream(response.stream, observation),
+            extensions=response.extensions
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def create_http_client(upstream: str, endpoint: Optional[str] = None, **kwargs: Any) -> httpx.AsyncClient:
+    """
+    httpx.AsyncClient whose calls are recorded under the given upstream name
+
+    Args:
+        upstream: Upstream label (e.g. 'youtube', 'media')
+        endpoint: Fixed endpoint label; derived from the URL path when omitted
+        **kwargs: Extra httpx.AsyncClient arguments
+    """
+    return httpx.AsyncClient(transport=InstrumentedTransport(upstream, endpoint), **kwargs)
+
+
+def create_openai_http_client():
+    """httpx client for AsyncOpenAI with the SDK's defaults plus instrumentation"""
+    from openai import DefaultAsyncHttpxClient
+    return DefaultAsyncHttpxClient(transport=InstrumentedTransport("openai"))
+
+
+@lru_cache(maxsize=None)
+def get_openai_client():
+    """
+    Shared AsyncOpenAI client, created on first use
+
+    The openai SDK is imported here rather than at module import so workers
+    that never call OpenAI do not pay for it at startup.
+    """
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        base_url=settings.OPENAI_BASE_URL,
+        http_client=create_openai_http_client()
+    )
@@ -0,0 +1,130 @@
+"""
+JWT encode/decode backends and the verified-token cache
+
+create_access_token/decode_token in app.core.auth delegate to one of these
+backends, chosen by the JWT_BACKEND setting. benchmarks/bench_jwt.py compares
+them; PyJWT is markedly faster than python-jose for HS256.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import hashlib
+import time
+
+from loguru import logger
+
+
+class TokenDecodeError(Exception):
+    """Raised when a token is malformed, has a bad signature or is expired"""
+
+
+class JoseBackend:
+    """python-jose backend"""
+    name = "jose"
+
+    def __init__(self):
+        from jose import jwt, JWTError
+        self._jwt = jwt
+        self._error = JWTError
+
+    def encode(self, claims: Dict[str, Any], key: str, algorithm: str) -> str:
+        return self._jwt.encode(claims, key, algorithm=algorithm)
+
+    def decode(self, token: str, key: str, algorithm: str) -> Dict[str, Any]:
+        try:
+            return self._jwt.decode(token, key, algorithms=[algorithm])
+        except self._error as e:
+            raise TokenDecodeError(str(e)) from e
+
+
+class PyJWTBackend:
+    """PyJWT backend"""
+    name = "pyjwt"
+
+    def __init__(self):
+        import jwt
+        self._jwt = jwt
+        self._error = jwt.PyJWTError
+
+    def encode(self, claims: Dict[str, Any], key: str, algorithm: str) -> str:
+        return self._jwt.encode(claims, key, algorithm=algorithm)
+
+    def decode(self, token: str, key: str, algorithm: str) -> Dict[str, Any]:
+        try:
+            # "sub" is a string user id here, so skip PyJWT's strict sub type check
+            return self._jwt.decode(token, key, algorithms=[algorithm], options={"verify_sub": False})
+        except self._error as e:
+            raise TokenDecodeError(str(e)) from e
+
+
+JWT_BACKENDS = {
+    JoseBackend.name: JoseBackend,
+    PyJWTBackend.name: PyJWTBackend,
+}
+
+
+def get_jwt_backend(name: str):
+    """Instantiate the configured backend, falling back to python-jose if it is not installed"""
+    backend_class = JWT_BACKENDS.get(name, JoseBackend)
+    try:
+        return backend_class()
+    except ImportError:
+        logger.warning(f"JWT backend '{name}' is not installed, falling back to python-jose")
+        return JoseBackend()
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of verified token digests -> claims
+
+    Only tokens that passed full signature verification are stored, keyed by
+    a digest so raw bearer tokens are not kept in memory. Entries are never
+    returned past their `exp` claim.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=20).digest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        if self.maxsize <= 0:
+            return None
+
+        key = self.digest(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        claims, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return dict(claims)
+
+    def set(self, token: str, claims: Dict[str, Any]) -> None:
+        if self.maxsize <= 0:
+            return
+
+        exp = claims.get("exp")
+        expires_at = float(exp) if isinstance(exp, (int, float)) else None
+
+        key = self.digest(token)
+        self._entries[key] = (dict(claims), expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def discard(self, token: str) -> None:
+        self._entries.pop(self.digest(token), None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
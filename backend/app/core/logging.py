@@ -3,18 +3,65 @@ Logging configuration for CREAFT
 """
 
 import logging
+import random
 import sys
 from loguru import logger
 from app.core.config import get_settings
 
 settings = get_settings()
 
+# stdlib level numbers -> loguru level names (avoids a level lookup per record)
+STDLIB_LEVELS = {
+    logging.CRITICAL: "CRITICAL",
+    logging.ERROR: "ERROR",
+    logging.WARNING: "WARNING",
+    logging.INFO: "INFO",
+    logging.DEBUG: "DEBUG",
+}
+
+def _sample_record(record):
+    """Keep every WARNING+ record and LOG_INFO_SAMPLE_RATE of INFO/DEBUG records (decided once per record)"""
+    if record["level"].no < logging.WARNING and random.random() >= settings.LOG_INFO_SAMPLE_RATE:
+        record["extra"]["sampled_out"] = True
+
+def _sample_info(record) -> bool:
+    """Sink filter, so every sink keeps the same sampled records"""
+    return "sampled_out" not in record["extra"]
+
+def _apply_stdlib_origin(record):
+    """Report the stdlib record's own logger/function/line instead of the handler's"""
+    origin = record["extra"].pop("stdlib_origin", None)
+    if origin:
+        record["name"], record["function"], record["line"] = origin
+
+class InterceptHandler(logging.Handler):
+    """Forward stdlib logging records to loguru"""
+    
+    _logger = logger.patch(_apply_stdlib_origin)
+    
+    def emit(self, record):
+        level = STDLIB_LEVELS.get(record.levelno, record.levelno)
+        self._logger.bind(
+            stdlib_origin=(record.name, record.funcName, record.lineno)
+        ).opt(exception=record.exc_info).log(level, record.getMessage())
+
 def setup_logging():
-    """Setup application logging"""
+    """
+    Setup application logging
+    
+    All sinks are enqueued: records are handed to a background thread, so
+    file writes, rotation and compression never run on the event loop.
+    """
     
     # Remove default loguru handler
     logger.remove()
     
+    level = "DEBUG" if settings.ENVIRONMENT == "development" else "INFO"
+    sample_filter = None
+    if settings.LOG_INFO_SAMPLE_RATE < 1.0:
+        logger.configure(patcher=_sample_record)
+        sample_filter = _sample_info
+    
     # Configure loguru
     log_format = (
         "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
@@ -27,8 +74,10 @@ def setup_logging():
     logger.add(
         sys.stdout,
         format=log_format,
-        level="DEBUG" if settings.ENVIRONMENT == "development" else "INFO",
-        colorize=True
+        level=level,
+        colorize=True,
+        filter=sample_filter,
+        enqueue=True
     )
     
     # File handler for errors
@@ -38,7 +87,8 @@ def setup_logging():
         level="ERROR",
         rotation="1 day",
         retention="30 days",
-        compression="zip"
+        compression="zip",
+        enqueue=True
     )
     
     # File handler for all logs
@@ -48,26 +98,26 @@ def setup_logging():
         level="INFO",
         rotation="1 day", 
         retention="7 days",
-        compression="zip"
+        compression="zip",
+        filter=sample_filter,
+        enqueue=True
     )
     
-    # Intercept standard logging
-    class InterceptHandler(logging.Handler):
-        def emit(self, record):
-            try:
-                level = logger.level(record.levelname).name
-            except ValueError:
-                level = record.levelno
-            
-            frame, depth = logging.currentframe(), 2
-            while frame.f_code.co_filename == logging.__file__:
-                frame = frame.f_back
-                depth += 1
-            
-            logger.opt(depth=depth, exception=record.exc_info).log(level, record.getMessage())
+    # Structured JSON lines for log shippers
+    if settings.LOG_JSON_FILE:
+        logger.add(
+            settings.LOG_JSON_FILE,
+            level="INFO",
+            serialize=True,
+            rotation="1 day",
+            retention="7 days",
+            filter=sample_filter,
+            enqueue=True
+        )
     
-    # Replace standard logging handlers
-    logging.basicConfig(handlers=[InterceptHandler()], level=0)
+    # Replace standard logging handlers; records below the app level are
+    # dropped by the stdlib before they reach loguru
+    logging.basicConfig(handlers=[InterceptHandler()], level=level, force=True)
     
     # Set levels for noisy libraries
     logging.getLogger("uvicorn").setLevel(logging.WARNING)
@@ -76,8 +126,13 @@ def setup_logging():
     
     logger.info("Logging configured successfully")
 
+async def shutdown_logging():
+    """Flush enqueued records before the process exits"""
+    await logger.complete()
+    logger.remove()
+
 def get_logger(name: str = None):
     """Get a logger instance"""
     if name:
         return logger.bind(name=name)
-    return logger 
\ No newline at end of file
+    return logger
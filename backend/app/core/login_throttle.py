@@ -0,0 +1,123 @@
+"""
+Login attempt limits
+
+Counts login attempts per client IP and per email in fixed windows, in memory
+or in Redis. The email counter is reset by a successful login, so it limits
+failed (and in-flight) attempts. Throttled attempts are rejected before any
+password hashing, so credential-stuffing bursts cannot tie up the hash pool.
+"""
+
+from typing import Dict, Tuple
+import time
+
+from fastapi import HTTPException, Request, status
+from loguru import logger
+
+from app.core.config import get_settings
+from app.core.monitoring import metrics
+
+settings = get_settings()
+
+
+class InMemoryAttemptCounter:
+    """Per-process fixed-window counters"""
+
+    PURGE_THRESHOLD = 100_000
+
+    def __init__(self):
+        self._windows: Dict[str, Tuple[int, float]] = {}
+
+    async def increment(self, key: str, window_seconds: int) -> int:
+        now = time.time()
+        count, expires_at = self._windows.get(key, (0, 0.0))
+        if expires_at <= now:
+            count, expires_at = 0, now + window_seconds
+        self._windows[key] = (count + 1, expires_at)
+
+        if len(self._windows) > self.PURGE_THRESHOLD:
+            self._windows = {k: v for k, v in self._windows.items() if v[1] > now}
+
+        return count + 1
+
+    async def reset(self, key: str) -> None:
+        self._windows.pop(key, None)
+
+
+class RedisAttemptCounter:
+    """Fixed-window counters shared by all workers"""
+
+    def __init__(self, redis_url: str):
+        import redis.asyncio as redis
+        self._redis = redis.from_url(redis_url, decode_responses=True)
+
+    async def increment(self, key: str, window_seconds: int) -> int:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            # Start the window only if it does not exist yet, then count
+            pipe.set(key, 0, ex=window_seconds, nx=True)
+            pipe.incr(key)
+            _, count = await pipe.execute()
+        return int(count)
+
+    async def reset(self, key: str) -> None:
+        await self._redis.delete(key)
+
+
+class LoginThrottle:
+    """Per-IP and per-email login attempt limits"""
+
+    def __init__(self):
+        self._counter = None
+
+    @property
+    def counter(self):
+        if self._counter is None:
+            if settings.LOGIN_THROTTLE_BACKEND == "redis":
+                self._counter = RedisAttemptCounter(settings.REDIS_URL)
+            else:
+                self._counter = InMemoryAttemptCounter()
+        return self._counter
+
+    @staticmethod
+    def _ip_key(ip: str) -> str:
+        return f"login_attempts:ip:{ip}"
+
+    @staticmethod
+    def _email_key(email: str) -> str:
+        return f"login_attempts:email:{email.strip().lower()}"
+
+    def _reject(self, reason: str) -> HTTPException:
+        metrics.record_login_attempt("throttled")
+        logger.warning(f"Login throttled ({reason})")
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, please try again later",
+            headers={"Retry-After": str(settings.LOGIN_ATTEMPT_WINDOW_SECONDS)}
+        )
+
+    async def check(self, ip: str, email: str) -> None:
+        """Count an attempt and raise 429 if the IP or email is over its limit"""
+        window = settings.LOGIN_ATTEMPT_WINDOW_SECONDS
+
+        # Count before hashing: concurrent attempts cannot all pass a stale read
+        if await self.counter.increment(self._email_key(email), window) > settings.LOGIN_MAX_FAILURES_PER_EMAIL:
+            raise self._reject("email")
+
+        if await self.counter.increment(self._ip_key(ip), window) > settings.LOGIN_MAX_ATTEMPTS_PER_IP:
+            raise self._reject("ip")
+
+    async def record_failure(self, email: str) -> None:
+        # The attempt was already counted by check()
+        metrics.record_login_attempt("failure")
+
+    async def record_success(self, email: str) -> None:
+        metrics.record_login_attempt("success")
+        await self.counter.reset(self._email_key(email))
+
+
+def client_ip(request: Request) -> str:
+    """Client address as seen by the app (the proxy must set it via --forwarded-allow-ips)"""
+    return request.client.host if request.client else "unknown"
+
+
+# Singleton instance
+login_throttle = LoginThrottle()
@@ -8,33 +8,86 @@ from fastapi.routing import APIRoute
 from typing import Callable
 import time
 
-# Metrics
+# Most endpoints answer in milliseconds; AI and upstream-bound ones take seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000)
+
+# Metrics (endpoint labels are route templates, e.g. /api/v1/creatives/{creative_id})
 REQUEST_COUNT = Counter('http_requests_total', 'Total HTTP requests', ['method', 'endpoint', 'status'])
-REQUEST_DURATION = Histogram('http_request_duration_seconds', 'HTTP request duration', ['method', 'endpoint'])
+REQUEST_DURATION = Histogram('http_request_duration_seconds', 'HTTP request duration', ['method', 'endpoint'], buckets=LATENCY_BUCKETS)
+REQUESTS_IN_PROGRESS = Gauge('http_requests_in_progress', 'HTTP requests currently being served', ['method'])
+RESPONSE_SIZE = Histogram('http_response_size_bytes', 'HTTP response body size', ['method', 'endpoint'], buckets=SIZE_BUCKETS)
 ACTIVE_USERS = Gauge('active_users_total', 'Number of active users')
 API_CALLS_COUNT = Counter('api_calls_total', 'Total API calls to external services', ['platform', 'endpoint'])
 COLLECTION_ERRORS = Counter('collection_errors_total', 'Total collection errors', ['platform', 'error_type'])
 AI_PROCESSING_DURATION = Histogram('ai_processing_duration_seconds', 'AI processing duration', ['task_type'])
+AI_TOKENS = Counter('ai_tokens_total', 'OpenAI tokens consumed', ['feature', 'model', 'plan', 'kind'])
+AI_COST = Counter('ai_cost_usd_total', 'Estimated OpenAI cost in USD', ['feature', 'model', 'plan'])
+AI_BUDGET_REJECTIONS = Counter('ai_budget_rejections_total', 'AI requests rejected by usage budgets', ['plan', 'reason'])
+TOKEN_REVOCATION_CHECKS = Counter('token_revocation_checks_total', 'Token revocation lookups', ['result'])
+PASSWORD_HASH_DURATION = Histogram('password_hash_duration_seconds', 'Password hash/verify duration incl. pool wait', ['operation'])
+LOGIN_ATTEMPTS = Counter('login_attempts_total', 'Login attempts', ['result'])
+UPSTREAM_REQUEST_DURATION = Histogram('upstream_request_duration_seconds', 'Outbound request duration incl. body', ['upstream', 'endpoint'], buckets=LATENCY_BUCKETS)
+UPSTREAM_RESPONSES = Counter('upstream_responses_total', 'Outbound responses by status', ['upstream', 'endpoint', 'status'])
+UPSTREAM_RESPONSE_SIZE = Histogram('upstream_response_size_bytes', 'Outbound response body size', ['upstream', 'endpoint'], buckets=SIZE_BUCKETS)
+UPSTREAM_RETRIES = Counter('upstream_retries_total', 'Outbound requests that were retries', ['upstream', 'endpoint'])
+DB_QUERY_DURATION = Histogram('db_query_duration_seconds', 'SQL statement duration by fingerprint', ['operation', 'fingerprint'], buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0))
+DB_QUERIES_PER_REQUEST = Histogram('db_queries_per_request', 'SQL statements executed per request', ['endpoint'], buckets=(1, 2, 5, 10, 20, 50, 100, 250))
+DB_N_PLUS_ONE = Counter('db_n_plus_one_total', 'Requests repeating one statement fingerprint N_PLUS_ONE_THRESHOLD+ times', ['endpoint'])
+SEARCH_CACHE_REQUESTS = Counter('search_cache_requests_total', 'Keyword search cache lookups', ['result'])
+TRENDING_FEED_SUBSCRIBERS = Gauge('trending_feed_subscribers', 'Connected live trending feed clients')
+TRENDING_FEED_EVENTS = Counter('trending_feed_events_total', 'Live trending feed events (snapshot/diff once per channel, resync per slow client, rejected per connection over capacity)', ['event'])
+OPENAI_TIME_TO_FIRST_TOKEN = Histogram('openai_time_to_first_token_seconds', 'Time to first streamed token', ['model'], buckets=LATENCY_BUCKETS)
+OPENAI_TIME_TO_RESPONSE = Histogram('openai_time_to_response_seconds', 'Time to response headers of non-streamed completions', ['model'], buckets=LATENCY_BUCKETS)
 
-def setup_monitoring(app):
-    """Setup monitoring for the application"""
+class PrometheusMiddleware:
+    """
+    ASGI middleware recording request count, latency, size and concurrency
+
+    Requests are labelled with the matched route template rather than the raw
+    path so ids in URLs do not create new series; unmatched paths share one label.
+    """
     
-    @app.middleware("http")
-    async def metrics_middleware(request, call_next):
-        start_time = time.time()
-        
-        response = await call_next(request)
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # Record metrics
-        duration = time.time() - start_time
-        method = request.method
-        endpoint = request.url.path
-        status = response.status_code
+        method = scope["method"]
+        status_code = 500
+        response_size = 0
         
-        REQUEST_COUNT.labels(method=method, endpoint=endpoint, status=status).inc()
-        REQUEST_DURATION.labels(method=method, endpoint=endpoint).observe(duration)
+        async def send_wrapper(message):
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
         
-        return response
+        in_progress = REQUESTS_IN_PROGRESS.labels(method=method)
+        in_progress.inc()
+        start_time = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start_time
+            in_progress.dec()
+            
+            route = scope.get("route")
+            endpoint = getattr(route, "path_format", None) or getattr(route, "path", None) or "unmatched"
+            
+            REQUEST_COUNT.labels(method=method, endpoint=endpoint, status=status_code).inc()
+            REQUEST_DURATION.labels(method=method, endpoint=endpoint).observe(duration)
+            RESPONSE_SIZE.labels(method=method, endpoint=endpoint).observe(response_size)
+
+def setup_monitoring(app):
+    """Setup monitoring for the application"""
+    
+    app.add_middleware(PrometheusMiddleware)
     
     @app.get("/metrics")
     async def metrics():
@@ -59,6 +112,85 @@ class MetricsCollector:
         """Record AI processing time"""
         AI_PROCESSING_DURATION.labels(task_type=task_type).observe(duration)
     
+    @staticmethod
+    def record_ai_usage(feature: str, model: str, plan: str, prompt_tokens: int, completion_tokens: int, cost_usd: float):
+        """Record tokens and estimated cost of an AI completion"""
+        AI_TOKENS.labels(feature=feature, model=model, plan=plan, kind="prompt").inc(prompt_tokens)
+        AI_TOKENS.labels(feature=feature, model=model, plan=plan, kind="completion").inc(completion_tokens)
+        AI_COST.labels(feature=feature, model=model, plan=plan).inc(cost_usd)
+    
+    @staticmethod
+    def record_ai_budget_rejection(plan: str, reason: str):
+        """Record a request rejected by AI usage limits"""
+        AI_BUDGET_REJECTIONS.labels(plan=plan, reason=reason).inc()
+    
+    @staticmethod
+    def record_token_revocation_check(result: str):
+        """Record a revocation lookup (bloom_negative, revoked or false_positive)"""
+        TOKEN_REVOCATION_CHECKS.labels(result=result).inc()
+    
+    @staticmethod
+    def record_password_hash_time(operation: str, duration: float):
+        """Record a password hash or verify"""
+        PASSWORD_HASH_DURATION.labels(operation=operation).observe(duration)
+    
+    @staticmethod
+    def record_login_attempt(result: str):
+        """Record a login attempt (success, failure or throttled)"""
+        LOGIN_ATTEMPTS.labels(result=result).inc()
+    
+    @staticmethod
+    def record_upstream_call(upstream: str, endpoint: str, status: str, duration: float, size: int):
+        """Record an outbound HTTP call (status 'error' when no response was received)"""
+        UPSTREAM_REQUEST_DURATION.labels(upstream=upstream, endpoint=endpoint).observe(duration)
+        UPSTREAM_RESPONSES.labels(upstream=upstream, endpoint=endpoint, status=status).inc()
+        UPSTREAM_RESPONSE_SIZE.labels(upstream=upstream, endpoint=endpoint).observe(size)
+    
+    @staticmethod
+    def record_upstream_retry(upstream: str, endpoint: str):
+        """Record a retried outbound request"""
+        UPSTREAM_RETRIES.labels(upstream=upstream, endpoint=endpoint).inc()
+    
+    @staticmethod
+    def record_openai_time_to_first_token(model: str, duration: float):
+        """Record time to the first streamed completion chunk"""
+        OPENAI_TIME_TO_FIRST_TOKEN.labels(model=model).observe(duration)
+    
+    @staticmethod
+    def record_openai_time_to_response(model: str, duration: float):
+        """Record time to the response headers of a non-streamed completion"""
+        OPENAI_TIME_TO_RESPONSE.labels(model=model).observe(duration)
+    
+    @staticmethod
+    def record_db_query(operation: str, fingerprint: str, duration: float):
+        """Record a SQL statement execution"""
+        DB_QUERY_DURATION.labels(operation=operation, fingerprint=fingerprint).observe(duration)
+    
+    @staticmethod
+    def record_request_queries(endpoint: str, count: int):
+        """Record the number of statements a request executed"""
+        DB_QUERIES_PER_REQUEST.labels(endpoint=endpoint).observe(count)
+    
+    @staticmethod
+    def record_n_plus_one(endpoint: str):
+        """Record a likely N+1 query pattern"""
+        DB_N_PLUS_ONE.labels(endpoint=endpoint).inc()
+    
+    @staticmethod
+    def record_search_cache(result: str):
+        """Record a keyword search cache lookup (hit, miss or coalesced)"""
+        SEARCH_CACHE_REQUESTS.labels(result=result).inc()
+    
+    @staticmethod
+    def record_trending_feed_event(event: str):
+        """Record a live trending feed event (snapshot, diff or resync)"""
+        TRENDING_FEED_EVENTS.labels(event=event).inc()
+    
+    @staticmethod
+    def update_trending_feed_subscribers(count: int):
+        """Update connected live trending feed clients"""
+        TRENDING_FEED_SUBSCRIBERS.set(count)
+    
     @staticmethod
     def update_active_users(count: int):
         """Update active users count"""
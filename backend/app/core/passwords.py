@@ -0,0 +1,110 @@
+"""
+Password hashing
+
+bcrypt is the most CPU-expensive thing the API does. The cost factor is chosen
+at startup by timing bcrypt on this host against PASSWORD_HASH_TARGET_MS
+(or pinned with PASSWORD_HASH_ROUNDS), hashing runs in a bounded thread pool
+instead of on the event loop (bcrypt releases the GIL), and hashes below the
+current cost are transparently upgraded on the next successful login.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+import asyncio
+import time
+
+from loguru import logger
+from passlib.context import CryptContext
+from passlib.hash import bcrypt
+
+from app.core.config import get_settings
+from app.core.monitoring import metrics
+
+settings = get_settings()
+
+
+def _build_context(rounds: int) -> CryptContext:
+    # min_rounds makes needs_update() flag older, cheaper hashes for rehashing
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds
+    )
+
+
+def benchmark_bcrypt_rounds(target_ms: float, min_rounds: int, max_rounds: int) -> int:
+    """Largest bcrypt cost whose hash time on this host stays within target_ms"""
+    hasher = bcrypt.using(rounds=min_rounds)
+    hasher.hash("benchmark")  # warm up
+
+    samples = []
+    for _ in range(3):
+        start = time.perf_counter()
+        hasher.hash("benchmark")
+        samples.append((time.perf_counter() - start) * 1000)
+    base_ms = min(samples)
+
+    # Each additional round doubles the work
+    rounds = min_rounds
+    while rounds < max_rounds and base_ms * 2 ** (rounds + 1 - min_rounds) <= target_ms:
+        rounds += 1
+
+    logger.info(
+        f"bcrypt cost {rounds} selected (~{base_ms * 2 ** (rounds - min_rounds):.0f} ms per hash, "
+        f"target {target_ms:.0f} ms)"
+    )
+    return rounds
+
+
+class PasswordHasher:
+    """bcrypt hashing/verification off the event loop"""
+
+    def __init__(self, rounds: int, workers: int):
+        self.rounds = rounds
+        self.context = _build_context(rounds)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+
+    async def calibrate(self) -> None:
+        """Pick the cost factor (call once at startup)"""
+        if settings.PASSWORD_HASH_ROUNDS:
+            rounds = settings.PASSWORD_HASH_ROUNDS
+        else:
+            rounds = await asyncio.get_running_loop().run_in_executor(
+                self._executor,
+                benchmark_bcrypt_rounds,
+                settings.PASSWORD_HASH_TARGET_MS,
+                settings.PASSWORD_HASH_MIN_ROUNDS,
+                settings.PASSWORD_HASH_MAX_ROUNDS
+            )
+        self.rounds = rounds
+        self.context = _build_context(rounds)
+
+    async def _run(self, operation: str, func, *args):
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            metrics.record_password_hash_time(operation, time.perf_counter() - start)
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", self.context.hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password and rehash it if its parameters are outdated
+
+        Returns:
+            (valid, new_hash) where new_hash is None unless the stored hash should be replaced
+        """
+        return await self._run("verify", self.context.verify_and_update, password, hashed_password)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+# Singleton instance
+password_hasher = PasswordHasher(
+    rounds=settings.PASSWORD_HASH_ROUNDS or settings.PASSWORD_HASH_MIN_ROUNDS,
+    workers=settings.PASSWORD_HASH_WORKERS
+)
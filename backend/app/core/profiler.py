@@ -0,0 +1,215 @@
+"""
+In-process sampling profiler
+
+A background thread snapshots the stacks of every thread (the event loop and
+worker threads) with sys._current_frames() at a fixed interval and aggregates
+them, so a live worker can be profiled without restarting it or attaching
+external tools. Results are rendered as collapsed stacks (flamegraph.pl,
+speedscope, inferno) or speedscope JSON.
+"""
+
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import hmac
+import sys
+import threading
+import time
+import uuid
+
+from loguru import logger
+
+# Leaf functions that mean "waiting, not working"
+IDLE_LEAVES = {"select", "poll", "epoll", "wait", "_worker", "run_forever", "sleep", "accept"}
+
+StackKey = Tuple[str, Tuple[Tuple[str, str, int], ...]]
+
+
+class ProfilerBusy(RuntimeError):
+    """Raised when a profile is already being taken"""
+
+
+class ProfileResult:
+    """Aggregated samples of one profiling run"""
+
+    def __init__(self, samples: "Counter[StackKey]", duration: float, interval: float, sample_count: int):
+        self.samples = samples
+        self.duration = duration
+        self.interval = interval
+        self.sample_count = sample_count
+
+    def collapsed(self) -> str:
+        """Brendan Gregg collapsed-stack format: 'thread;frame;frame count' per line"""
+        lines = []
+        for (thread_name, frames), count in self.samples.most_common():
+            names = [thread_name] + [f"{name} ({filename}:{line})" for name, filename, line in frames]
+            lines.append(f"{';'.join(names)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self) -> Dict[str, Any]:
+        """speedscope file format, one sampled profile per thread"""
+        frame_index: Dict[Tuple[str, str, int], int] = {}
+        frames = []
+        profiles: Dict[str, Dict[str, Any]] = {}
+
+        for (thread_name, stack), count in self.samples.items():
+            indexes = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                indexes.append(frame_index[frame])
+
+            profile = profiles.setdefault(thread_name, {
+                "type": "sampled",
+                "name": thread_name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": self.duration,
+                "samples": [],
+                "weights": []
+            })
+            profile["samples"].append(indexes)
+            profile["weights"].append(count * self.interval)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"creaft {self.duration:.1f}s profile",
+            "exporter": "creaft-sampling-profiler",
+            "shared": {"frames": frames},
+            "profiles": list(profiles.values())
+        }
+
+
+class SamplingProfiler:
+    """Samples all thread stacks from a daemon thread; one run at a time per process"""
+
+    MAX_STORED_RESULTS = 20
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._samples: "Counter[StackKey]" = Counter()
+        self._sample_count = 0
+        self._interval = 0.005
+        self._include_idle = False
+        self._started_at = 0.0
+        self._results: "OrderedDict[str, ProfileResult]" = OrderedDict()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, interval: float = 0.005, include_idle: bool = False) -> None:
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A profile is already running")
+
+        self._samples = Counter()
+        self._sample_count = 0
+        self._interval = interval
+        self._include_idle = include_idle
+        self._stop.clear()
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> ProfileResult:
+        """Stop sampling; the sampler thread is joined off the event loop"""
+        self._stop.set()
+        # Shielded so a cancelled caller still lets the run finish and release the lock
+        return await asyncio.shield(asyncio.to_thread(self._finish))
+
+    def _finish(self) -> ProfileResult:
+        self._thread.join()
+        self._thread = None
+        result = ProfileResult(
+            self._samples,
+            time.perf_counter() - self._started_at,
+            self._interval,
+            self._sample_count
+        )
+        self._lock.release()
+        logger.info(f"Profile finished: {result.sample_count} samples over {result.duration:.1f}s")
+        return result
+
+    def store(self, result: ProfileResult, profile_id: Optional[str] = None) -> str:
+        """Keep a result for later download and return its id"""
+        profile_id = profile_id or uuid.uuid4().hex[:12]
+        self._results[profile_id] = result
+        while len(self._results) > self.MAX_STORED_RESULTS:
+            self._results.popitem(last=False)
+        return profile_id
+
+    def get_stored(self, profile_id: str) -> Optional[ProfileResult]:
+        return self._results.get(profile_id)
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self._interval):
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_name, code.co_filename, frame.f_lineno))
+                    frame = frame.f_back
+                if not stack or (not self._include_idle and stack[0][0] in IDLE_LEAVES):
+                    continue
+
+                stack.reverse()
+                self._samples[(thread_names.get(thread_id, str(thread_id)), tuple(stack))] += 1
+            self._sample_count += 1
+
+
+class RequestProfilingMiddleware:
+    """
+    Profile a single request when it carries `X-Profile: <PROFILING_TOKEN>`
+
+    The profile id is returned in an X-Profile-Id response header and the
+    result can be downloaded from /api/v1/admin/profiles/{id}. Samples cover
+    the whole process while the request runs, including concurrent requests.
+    """
+
+    HEADER = b"x-profile"
+
+    def __init__(self, app, token: Optional[str]):
+        self.app = app
+        self.token = token.encode() if token else None
+
+    def _authorized(self, scope) -> bool:
+        """X-Profile header present and equal to the token (constant-time comparison)"""
+        if scope["type"] != "http" or self.token is None:
+            return False
+        supplied = dict(scope["headers"]).get(self.HEADER)
+        return supplied is not None and hmac.compare_digest(supplied, self.token)
+
+    async def __call__(self, scope, receive, send):
+        if not self._authorized(scope):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            profiler.start()
+        except ProfilerBusy:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex[:12]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.store(await profiler.stop(), profile_id)
+
+
+# Singleton instance
+profiler = SamplingProfiler()
@@ -0,0 +1,202 @@
+"""
+SQL query profiling
+
+Engine event hooks time every statement and group it by fingerprint (the SQL
+with literals and bind parameters normalized away), exporting per-fingerprint
+latency histograms. Statements slower than SLOW_QUERY_MS are logged with their
+EXPLAIN plan. Queries are also counted per request, so the same fingerprint
+repeated many times in one request is reported as a likely N+1, and a
+per-request query budget can be asserted in tests with assert_max_queries().
+"""
+
+from collections import Counter as CounterDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Iterator, Optional
+import hashlib
+import re
+import time
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import get_settings
+from app.core.monitoring import metrics
+
+settings = get_settings()
+
+COMMENT_PATTERN = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+STRING_PATTERN = re.compile(r"'(?:[^']|'')*'")
+PARAM_PATTERN = re.compile(r"__\[POSTCOMPILE_\w+\]|\$\d+|%\(\w+\)s|%s|(?<![:\w]):\w+|\?")
+NUMBER_PATTERN = re.compile(r"\b\d+(?:\.\d+)?\b")
+IN_LIST_PATTERN = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+VALUES_LIST_PATTERN = re.compile(r"(\(\?\+?\))(?:\s*,\s*\(\?\+?\))+")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+# Seconds between EXPLAINs of the same slow fingerprint
+EXPLAIN_INTERVAL_SECONDS = 600
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """Normalize a SQL statement so executions with different values group together"""
+    sql = COMMENT_PATTERN.sub(" ", statement)
+    sql = STRING_PATTERN.sub("?", sql)
+    sql = PARAM_PATTERN.sub("?", sql)
+    sql = NUMBER_PATTERN.sub("?", sql)
+    sql = IN_LIST_PATTERN.sub("(?+)", sql)
+    sql = VALUES_LIST_PATTERN.sub(r"\1+", sql)
+    return WHITESPACE_PATTERN.sub(" ", sql).strip()
+
+
+@lru_cache(maxsize=4096)
+def fingerprint_id(normalized: str) -> str:
+    """Short stable id for a fingerprint (used as the metrics label)"""
+    return hashlib.blake2b(normalized.encode(), digest_size=6).hexdigest()
+
+
+@dataclass
+class QueryStats:
+    """Statements executed within a request (or a test block)"""
+    count: int = 0
+    total_seconds: float = 0.0
+    fingerprints: CounterDict = field(default_factory=CounterDict)
+    parent: Optional["QueryStats"] = None
+
+    def record(self, normalized: str, duration: float) -> None:
+        stats = self
+        while stats is not None:
+            stats.count += 1
+            stats.total_seconds += duration
+            stats.fingerprints[normalized] += 1
+            stats = stats.parent
+
+    def repeated(self, threshold: int) -> Dict[str, int]:
+        """Fingerprints executed at least `threshold` times"""
+        return {sql: count for sql, count in self.fingerprints.items() if count >= threshold}
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised by assert_max_queries when a block runs more statements than allowed"""
+
+
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+_explained_at: Dict[str, float] = {}
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Count statements executed in this block (nested blocks also count toward outer ones)"""
+    stats = QueryStats(parent=_query_stats.get())
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+
+@contextmanager
+def assert_max_queries(max_queries: int) -> Iterator[QueryStats]:
+    """
+    Fail if the block executes more than max_queries statements
+
+    Usage (tests):
+        with assert_max_queries(3):
+            await client.get("/api/v1/creatives")
+    """
+    with track_queries() as stats:
+        yield stats
+    if stats.count > max_queries:
+        details = "\n".join(f"  {count}x {sql}" for sql, count in stats.fingerprints.most_common(5))
+        raise QueryBudgetExceeded(f"{stats.count} queries executed, budget is {max_queries}:\n{details}")
+
+
+def _explain(conn, statement: str, parameters, normalized: str) -> Optional[str]:
+    """EXPLAIN a slow SELECT once per interval (never EXPLAIN ANALYZE: that would re-run it)"""
+    if normalized[:6].lower() != "select":
+        return None
+
+    now = time.monotonic()
+    if now - _explained_at.get(normalized, -EXPLAIN_INTERVAL_SECONDS) < EXPLAIN_INTERVAL_SECONDS:
+        return None
+    _explained_at[normalized] = now
+
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    conn.info["profiling_disabled"] = True
+    try:
+        rows = conn.exec_driver_sql(prefix + statement, parameters).fetchall()
+        return "\n".join(" | ".join(str(value) for value in row) for row in rows)
+    except Exception as e:
+        return f"EXPLAIN failed: {str(e)}"
+    finally:
+        conn.info["profiling_disabled"] = False
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_time")
+    if not start_times:
+        return
+    duration = time.perf_counter() - start_times.pop()
+
+    if conn.info.get("profiling_disabled"):
+        return
+
+    normalized = fingerprint(statement)
+    operation = normalized.split(" ", 1)[0].lower()
+    metrics.record_db_query(operation, fingerprint_id(normalized), duration)
+
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.record(normalized, duration)
+
+    if duration * 1000 >= settings.SLOW_QUERY_MS:
+        plan = _explain(conn, statement, parameters, normalized) if not executemany else None
+        logger.warning(
+            f"Slow query ({duration * 1000:.0f} ms) [{fingerprint_id(normalized)}]: {normalized}"
+            + (f"\nPlan:\n{plan}" if plan else "")
+        )
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attach the profiling hooks to a (sync) engine; pass async_engine.sync_engine for async engines"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryProfilingMiddleware:
+    """ASGI middleware scoping query stats to a request and reporting N+1 patterns and budget overruns"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            await self.app(scope, receive, send)
+
+        if not stats.count:
+            return
+
+        route = scope.get("route")
+        endpoint = getattr(route, "path_format", None) or "unmatched"
+        metrics.record_request_queries(endpoint, stats.count)
+
+        for sql, count in stats.repeated(settings.N_PLUS_ONE_THRESHOLD).items():
+            metrics.record_n_plus_one(endpoint)
+            logger.warning(f"Possible N+1 in {scope['method']} {endpoint}: {count}x [{fingerprint_id(sql)}] {sql}")
+
+        if settings.REQUEST_QUERY_BUDGET and stats.count > settings.REQUEST_QUERY_BUDGET:
+            logger.warning(
+                f"{scope['method']} {endpoint} ran {stats.count} queries "
+                f"(budget {settings.REQUEST_QUERY_BUDGET}, {stats.total_seconds * 1000:.0f} ms)"
+            )
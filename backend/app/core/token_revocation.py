@@ -0,0 +1,248 @@
+"""
+JWT revocation store
+
+Revoked token ids (`jti`) live in memory or in Redis until the token would
+have expired anyway. Every authenticated request checks its jti, so an
+in-process Bloom filter of revoked ids fronts the store: a negative answer
+(the common case) is definitive and costs no network round trip, and only
+possible hits are confirmed against the store. With the Redis backend, workers
+learn about each other's revocations over pub/sub, and rescan the store into
+their filter every time the subscription is (re)established so revocations
+published while it was down are not missed.
+"""
+
+from typing import AsyncIterator, Dict, Optional, Set
+import asyncio
+import hashlib
+import math
+import time
+
+from loguru import logger
+
+from app.core.config import get_settings
+from app.core.monitoring import metrics
+
+settings = get_settings()
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing on one blake2b digest)"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str) -> bool:
+        """Add an item; False (and not counted) if it was already present"""
+        if item in self:
+            return False
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+        return True
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class InMemoryRevocationStore:
+    """Per-process revocation set (single worker or development)"""
+
+    def __init__(self):
+        self._expires_at: Dict[str, float] = {}
+
+    async def add(self, jti: str, ttl_seconds: int) -> bool:
+        now = time.time()
+        expires_at = self._expires_at.get(jti)
+        if expires_at is not None and expires_at > now:
+            return False
+        self._expires_at[jti] = now + ttl_seconds
+        return True
+
+    async def contains(self, jti: str) -> bool:
+        expires_at = self._expires_at.get(jti)
+        if expires_at is None:
+            return False
+        if expires_at <= time.time():
+            del self._expires_at[jti]
+            return False
+        return True
+
+    async def live_ids(self) -> AsyncIterator[str]:
+        now = time.time()
+        for jti, expires_at in list(self._expires_at.items()):
+            if expires_at > now:
+                yield jti
+            else:
+                del self._expires_at[jti]
+
+
+class RedisRevocationStore:
+    """Revocation set shared by all workers (one expiring key per jti)"""
+
+    KEY_PREFIX = "revoked_jti:"
+    CHANNEL = "revoked_jti"
+
+    def __init__(self, redis_url: str):
+        import redis.asyncio as redis
+        self._redis = redis.from_url(redis_url, decode_responses=True)
+
+    async def add(self, jti: str, ttl_seconds: int) -> bool:
+        added = await self._redis.set(f"{self.KEY_PREFIX}{jti}", 1, ex=ttl_seconds, nx=True)
+        await self._redis.publish(self.CHANNEL, jti)
+        return bool(added)
+
+    async def contains(self, jti: str) -> bool:
+        return bool(await self._redis.exists(f"{self.KEY_PREFIX}{jti}"))
+
+    async def live_ids(self) -> AsyncIterator[str]:
+        async for key in self._redis.scan_iter(match=f"{self.KEY_PREFIX}*", count=1000):
+            yield key[len(self.KEY_PREFIX):]
+
+    async def listen(self, callback, on_subscribed) -> None:
+        """Call callback(jti) for revocations published by any worker, awaiting on_subscribed() once subscribed"""
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(self.CHANNEL)
+        await on_subscribed()
+        async for message in pubsub.listen():
+            if message.get("type") == "message":
+                callback(message["data"])
+
+
+class TokenRevocation:
+    """Revokes token ids and answers "is this jti revoked?" on the auth hot path"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._store = None
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._rebuilding: Optional[Set[str]] = None
+        self._ready = False
+        self._ready_lock = asyncio.Lock()
+        self._listener: Optional[asyncio.Task] = None
+        self._subscribed = asyncio.Event()
+
+    @property
+    def store(self):
+        if self._store is None:
+            if settings.TOKEN_REVOCATION_BACKEND == "redis":
+                self._store = RedisRevocationStore(settings.REDIS_URL)
+            else:
+                self._store = InMemoryRevocationStore()
+        return self._store
+
+    async def revoke(self, jti: str, expires_at: Optional[float]) -> bool:
+        """
+        Revoke a token id until the token's expiry
+
+        Returns:
+            False if the id was already revoked (e.g. a refresh token reused)
+        """
+        await self._ensure_ready()
+
+        ttl_seconds = max(1, int((expires_at or time.time() + 86400) - time.time()))
+        added = await self.store.add(jti, ttl_seconds)
+        self._add_local(jti)
+
+        if self._bloom.count > self.capacity:
+            await self._rebuild()
+
+        return added
+
+    async def is_revoked(self, jti: str) -> bool:
+        await self._ensure_ready()
+
+        if jti not in self._bloom:
+            metrics.record_token_revocation_check("bloom_negative")
+            return False
+
+        revoked = await self.store.contains(jti)
+        metrics.record_token_revocation_check("revoked" if revoked else "false_positive")
+        return revoked
+
+    def _add_local(self, jti: str) -> None:
+        self._bloom.add(jti)
+        if self._rebuilding is not None:
+            self._rebuilding.add(jti)
+
+    async def _ensure_ready(self) -> None:
+        """Seed the filter from the store and subscribe to other workers' revocations once"""
+        if self._ready:
+            return
+
+        async with self._ready_lock:
+            if self._ready:
+                return
+
+            if isinstance(self.store, RedisRevocationStore):
+                # Subscribe before scanning so no revocation falls between the two
+                self._listener = asyncio.get_running_loop().create_task(self._listen())
+                try:
+                    await asyncio.wait_for(self._subscribed.wait(), timeout=5)
+                except asyncio.TimeoutError:
+                    # Scan now anyway; the listener rescans once it manages to subscribe
+                    logger.warning("Token revocation subscription not ready, seeding filter without it")
+                    await self._seed()
+            else:
+                await self._seed()
+            self._ready = True
+
+    async def _seed(self) -> None:
+        """Add every live revoked id in the store to the filter"""
+        async for jti in self.store.live_ids():
+            self._add_local(jti)
+
+    async def _on_subscribed(self) -> None:
+        # Revocations published while unsubscribed are only in the store
+        await self._seed()
+        self._subscribed.set()
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                await self.store.listen(self._add_local, self._on_subscribed)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Token revocation subscription failed, retrying: {str(e)}")
+                await asyncio.sleep(1)
+
+    async def _rebuild(self) -> None:
+        """Rebuild the filter from live entries so expired ids stop producing false positives"""
+        if self._rebuilding is not None:
+            return
+
+        # Ids revoked while the store is being scanned are collected here too
+        self._rebuilding = set()
+        try:
+            live_ids = [jti async for jti in self.store.live_ids()]
+            live_ids.extend(self._rebuilding)
+
+            if len(live_ids) > self.capacity // 2:
+                self.capacity = len(live_ids) * 2
+                logger.warning(f"Token revocation filter near capacity, growing to {self.capacity}")
+
+            bloom = BloomFilter(self.capacity, self.error_rate)
+            for jti in live_ids:
+                bloom.add(jti)
+            self._bloom = bloom
+        finally:
+            self._rebuilding = None
+
+
+# Singleton instance
+token_revocation = TokenRevocation(
+    capacity=settings.TOKEN_REVOCATION_BLOOM_CAPACITY,
+    error_rate=settings.TOKEN_REVOCATION_BLOOM_ERROR_RATE
+)
@@ -0,0 +1,232 @@
+"""
+Authenticated-user principal cache
+
+Most authenticated requests only need who the caller is and what they may do.
+A slim immutable snapshot (id, role, plan, limits, is_active) is cached in a
+per-process TTL LRU, optionally backed by Redis, so the common case skips the
+users table entirely. Entries are invalidated when a transaction that changed
+a user's activation, role, plan or limits commits (see the listeners below).
+With the Redis backend the invalidation is also published to every worker's
+in-process cache; with the memory backend other workers only notice after
+USER_CACHE_TTL_SECONDS.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Optional
+import asyncio
+import json
+import time
+
+from loguru import logger
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import get_settings
+from app.models.user import User, UserRole, SubscriptionPlan
+
+settings = get_settings()
+
+# Changes to these columns invalidate the cached principal
+PRINCIPAL_FIELDS = ("is_active", "role", "subscription_plan", "max_accounts", "max_monthly_creatives")
+
+# Session.info key collecting user ids to invalidate once the transaction commits
+PENDING_INVALIDATIONS = "invalidate_principals"
+
+
+@dataclass(frozen=True)
+class UserPrincipal:
+    """Immutable snapshot of the authorization-relevant user fields"""
+    id: int
+    role: UserRole
+    subscription_plan: SubscriptionPlan
+    is_active: bool
+    max_accounts: int
+    max_monthly_creatives: int
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserPrincipal":
+        return cls(
+            id=user.id,
+            role=user.role,
+            subscription_plan=user.subscription_plan,
+            is_active=bool(user.is_active),
+            max_accounts=user.max_accounts,
+            max_monthly_creatives=user.max_monthly_creatives
+        )
+
+    @property
+    def is_enterprise(self) -> bool:
+        return self.subscription_plan == SubscriptionPlan.ENTERPRISE
+
+    def can_add_account(self, current_count: int) -> bool:
+        """Check if user can add more accounts"""
+        if self.is_enterprise:
+            return True
+        return current_count < self.max_accounts
+
+    def can_analyze_creatives(self, current_monthly_count: int) -> bool:
+        """Check if user can analyze more creatives this month"""
+        if self.is_enterprise:
+            return True
+        return current_monthly_count < self.max_monthly_creatives
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        data["role"] = self.role.value
+        data["subscription_plan"] = self.subscription_plan.value
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "UserPrincipal":
+        data = json.loads(raw)
+        data["role"] = UserRole(data["role"])
+        data["subscription_plan"] = SubscriptionPlan(data["subscription_plan"])
+        return cls(**data)
+
+
+class UserPrincipalCache:
+    """In-process TTL LRU with optional Redis second level and pub/sub invalidation"""
+
+    CHANNEL = "user_principal_invalidate"
+
+    def __init__(self, maxsize: int, ttl_seconds: float, redis_url: Optional[str] = None):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._listener: Optional[asyncio.Task] = None
+        self._redis = None
+        if redis_url:
+            import redis.asyncio as redis
+            self._redis = redis.from_url(redis_url, decode_responses=True)
+
+    def _redis_key(self, user_id: int) -> str:
+        return f"user_principal:{user_id}"
+
+    async def get(self, user_id: int) -> Optional[UserPrincipal]:
+        self._ensure_listener()
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            principal, expires_at = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(user_id)
+                return principal
+            del self._entries[user_id]
+
+        if self._redis is not None:
+            try:
+                raw = await self._redis.get(self._redis_key(user_id))
+                if raw:
+                    principal = UserPrincipal.from_json(raw)
+                    self._store_local(principal)
+                    return principal
+            except Exception as e:
+                logger.warning(f"User cache Redis lookup failed: {str(e)}")
+
+        return None
+
+    async def set(self, principal: UserPrincipal) -> None:
+        self._store_local(principal)
+        if self._redis is not None:
+            try:
+                await self._redis.set(
+                    self._redis_key(principal.id),
+                    principal.to_json(),
+                    ex=max(1, int(self.ttl_seconds))
+                )
+            except Exception as e:
+                logger.warning(f"User cache Redis store failed: {str(e)}")
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop a user's cached principal (local immediately, Redis and other workers in the background)"""
+        self._entries.pop(user_id, None)
+        if self._redis is not None:
+            try:
+                asyncio.get_running_loop().create_task(self._invalidate_shared(user_id))
+            except RuntimeError:
+                # No running loop (sync code path), Redis entry expires with its TTL
+                pass
+
+    async def _invalidate_shared(self, user_id: int) -> None:
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                pipe.delete(self._redis_key(user_id))
+                pipe.publish(self.CHANNEL, user_id)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"User cache Redis invalidation failed: {str(e)}")
+
+    def _ensure_listener(self) -> None:
+        if self._redis is not None and self._listener is None:
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+
+    async def _listen(self) -> None:
+        """Apply invalidations published by any worker to the in-process entries"""
+        while True:
+            try:
+                pubsub = self._redis.pubsub()
+                await pubsub.subscribe(self.CHANNEL)
+                # Invalidations published while unsubscribed were missed; start over
+                self._entries.clear()
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._entries.pop(int(message["data"]), None)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"User cache invalidation subscription failed, retrying: {str(e)}")
+                await asyncio.sleep(1)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _store_local(self, principal: UserPrincipal) -> None:
+        self._entries[principal.id] = (principal, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(principal.id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+user_principal_cache = UserPrincipalCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+    redis_url=settings.REDIS_URL if settings.USER_CACHE_BACKEND == "redis" else None
+)
+
+
+def _invalidate_after_commit(target: User) -> None:
+    """
+    Queue a principal invalidation for when the flushing transaction commits
+
+    Flush events fire before commit; invalidating then would let a concurrent
+    request re-cache the old row until the TTL.
+    """
+    session = object_session(target)
+    if session is None:
+        user_principal_cache.invalidate(target.id)
+        return
+    session.info.setdefault(PENDING_INVALIDATIONS, set()).add(target.id)
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_principal_on_update(mapper, connection, target: User):
+    """Invalidate the cached principal when authorization-relevant fields change"""
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in PRINCIPAL_FIELDS):
+        _invalidate_after_commit(target)
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_principal_on_delete(mapper, connection, target: User):
+    _invalidate_after_commit(target)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_invalidations(session: Session):
+    for user_id in session.info.pop(PENDING_INVALIDATIONS, ()):
+        user_principal_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_invalidations(session: Session):
+    session.info.pop(PENDING_INVALIDATIONS, None)
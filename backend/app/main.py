@@ -6,16 +6,27 @@ Main FastAPI application entry point
 from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 import uvicorn
 from contextlib import asynccontextmanager
+import asyncio
 
 from app.core.config import get_settings
 from app.core.database import init_db
 from app.api.v1.routes import api_router
 from app.core.auth import get_current_user
-from app.core.logging import setup_logging
+from app.core.logging import setup_logging, shutdown_logging
 from app.core.monitoring import setup_monitoring
+from app.core.compression import CompressionMiddleware
+from app.core.http_cache import HTTPCacheMiddleware
+from app.core.passwords import password_hasher
+from app.core.query_profiler import QueryProfilingMiddleware
+from app.core.profiler import RequestProfilingMiddleware
+from app.services.ai.prompt_compaction import load_encoding
+from app.services.social_media.search_cache import keyword_search_cache
+from app.services.social_media.video_index import video_index
+from app.services.social_media.trending_snapshotter import trending_snapshotter
+from app.services.social_media.trending_feed import trending_feed
 
 settings = get_settings()
 
@@ -24,10 +35,24 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager"""
     # Startup
     setup_logging()
-    await init_db()
+    if settings.AUTO_CREATE_TABLES:
+        await init_db()
+    # Calibrate the bcrypt cost in the background so it does not delay readiness
+    calibration = asyncio.create_task(password_hasher.calibrate())
+    # Likewise load the tokenizer (tiktoken may download it) off the event loop
+    tokenizer = asyncio.create_task(load_encoding())
+    keyword_search_cache.start_warmer()
+    trending_snapshotter.start()
     yield
     # Shutdown
-    pass
+    calibration.cancel()
+    tokenizer.cancel()
+    keyword_search_cache.stop_warmer()
+    trending_snapshotter.stop()
+    await trending_feed.shutdown()
+    await video_index.drain()
+    password_hasher.shutdown()
+    await shutdown_logging()
 
 app = FastAPI(
     title="CREAFT API",
@@ -35,6 +60,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/api/docs" if settings.ENVIRONMENT != "production" else None,
     redoc_url="/api/redoc" if settings.ENVIRONMENT != "production" else None,
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -52,6 +78,18 @@ app.add_middleware(
     allowed_hosts=settings.ALLOWED_HOSTS
 )
 
+# Compression runs inside the cache middleware so ETags are per content-coding
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY
+)
+app.add_middleware(HTTPCacheMiddleware)
+
+app.add_middleware(QueryProfilingMiddleware)
+app.add_middleware(RequestProfilingMiddleware, token=settings.PROFILING_TOKEN)
+
 # Setup monitoring (must be called before app starts)
 setup_monitoring(app)
 
@@ -71,9 +109,10 @@ async def health_check():
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     """Global HTTP exception handler"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
-        content={"detail": exc.detail, "status_code": exc.status_code}
+        content={"detail": exc.detail, "status_code": exc.status_code},
+        headers=exc.headers
     )
 
 if __name__ == "__main__":
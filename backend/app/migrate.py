@@ -0,0 +1,21 @@
+"""
+Database schema setup
+Run with: python -m app.migrate
+
+Creates missing tables. This runs as a deploy/migration step instead of on
+every worker boot (set AUTO_CREATE_TABLES=true to keep the old behaviour).
+"""
+
+import asyncio
+
+from app.core.database import init_db
+
+
+def main():
+    """Create all tables that do not exist yet"""
+    asyncio.run(init_db())
+    print("Database schema is up to date")
+
+
+if __name__ == "__main__":
+    main()
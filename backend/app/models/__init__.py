@@ -7,6 +7,9 @@ from .account import Account, Platform, AccountStatus
 from .creative import Creative, CreativeType, ContentType
 from .metric import Metric
 from .label import Label, LabelType, CreativeAnalytic
+from .ai_usage import AIUsage
+from .video_index import IndexedVideo
+from .trending_snapshot import TrendingSnapshot
 
 __all__ = [
     "User",
@@ -21,5 +24,8 @@ __all__ = [
     "Metric",
     "Label",
     "LabelType",
-    "CreativeAnalytic"
+    "CreativeAnalytic",
+    "AIUsage",
+    "IndexedVideo",
+    "TrendingSnapshot"
 ] 
\ No newline at end of file
@@ -0,0 +1,34 @@
+"""
+AI usage ledger model for token and cost accounting
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+class AIUsage(Base):
+    """One OpenAI completion attributed to a user and feature"""
+    __tablename__ = "ai_usage"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)  # None for unauthenticated features
+    
+    # What was called
+    feature = Column(String, nullable=False, index=True)  # e.g. "buzz_analysis", "script_from_video"
+    model = Column(String, nullable=False)
+    
+    # Usage reported by the API
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    cost_usd = Column(Float, default=0.0)  # Estimated from MODEL_PRICING
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    
+    def __repr__(self):
+        return f"<AIUsage(id={self.id}, user_id={self.user_id}, feature='{self.feature}', tokens={self.total_tokens})>"
+    
+    @property
+    def total_tokens(self) -> int:
+        return (self.prompt_tokens or 0) + (self.completion_tokens or 0)
@@ -112,7 +112,11 @@ class Metric(Base):
         from datetime import datetime, timezone, timedelta
         
         now = datetime.now(timezone.utc)
-        hours_since_measurement = (now - self.measured_at).total_seconds() / 3600
+        measured_at = self.measured_at
+        if measured_at.tzinfo is None:
+            # SQLite returns naive datetimes; they are stored in UTC
+            measured_at = measured_at.replace(tzinfo=timezone.utc)
+        hours_since_measurement = (now - measured_at).total_seconds() / 3600
         
         # Recent content gets higher buzz score
         recency_factor = max(0.1, 1 - (hours_since_measurement / 168))  # Decay over a week
@@ -0,0 +1,32 @@
+"""
+Trending chart snapshot model (append-only observation history)
+"""
+
+from sqlalchemy import Column, Integer, BigInteger, SmallInteger, String, Index
+
+from app.core.database import Base
+
+class TrendingSnapshot(Base):
+    """One video's position and statistics in a region's mostPopular chart at one capture"""
+    __tablename__ = "trending_snapshots"
+    
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    video_id = Column(String(16), nullable=False)
+    region = Column(String(2), nullable=False)
+    rank = Column(SmallInteger, nullable=False)  # 1-based chart position
+    
+    # Statistics at capture time
+    views = Column(BigInteger, nullable=False)
+    likes = Column(BigInteger, nullable=False, default=0)
+    comments = Column(Integer, nullable=False, default=0)
+    
+    captured_ts = Column(Integer, nullable=False)  # Epoch seconds, floored to the snapshot interval
+    
+    __table_args__ = (
+        # One row per video/region/capture (concurrent snapshotters dedupe on it); serves the velocity query
+        Index("ux_trending_snapshots_video_region_ts", "video_id", "region", "captured_ts", unique=True),
+        Index("ix_trending_snapshots_captured_ts", "captured_ts"),
+    )
+    
+    def __repr__(self):
+        return f"<TrendingSnapshot(video_id='{self.video_id}', region='{self.region}', rank={self.rank}, ts={self.captured_ts})>"
@@ -0,0 +1,93 @@
+"""
+Local full-text index of YouTube videos we have fetched or collected
+"""
+
+from sqlalchemy import Column, Integer, BigInteger, String, Text, JSON, Float, DateTime, DDL, event
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+class IndexedVideo(Base):
+    """
+    Searchable copy of a video's text and latest statistics
+
+    search_title/search_tags/search_body hold the pre-tokenized text (CJK runs
+    split into bigrams, see app.services.social_media.video_index) and
+    search_cjk the distinct CJK characters for single-character queries. They are
+    indexed by an FTS5 table on SQLite and a weighted tsvector on PostgreSQL,
+    both created with the table below.
+    """
+    __tablename__ = "indexed_videos"
+    
+    id = Column(Integer, primary_key=True)
+    video_id = Column(String, nullable=False, unique=True, index=True)
+    
+    # Display fields
+    title = Column(String, nullable=False, default="")
+    description = Column(Text, nullable=False, default="")
+    tags = Column(JSON, nullable=True)  # List of tag strings
+    channel_id = Column(String, nullable=False, default="")
+    channel_title = Column(String, nullable=False, default="")
+    category_id = Column(String, nullable=False, default="")
+    thumbnail_url = Column(String, nullable=True)
+    duration_seconds = Column(Integer, default=0)
+    published_ts = Column(Float, nullable=True, index=True)  # Epoch seconds
+    
+    # Latest statistics seen
+    views = Column(BigInteger, default=0, index=True)
+    likes = Column(BigInteger, default=0)
+    comments = Column(BigInteger, default=0)
+    
+    # Tokenized text for the full-text index
+    search_title = Column(Text, nullable=False, default="")
+    search_tags = Column(Text, nullable=False, default="")
+    search_body = Column(Text, nullable=False, default="")
+    search_cjk = Column(Text, nullable=False, default="")  # CJK unigrams
+    
+    source = Column(String, nullable=True)  # trending, search, creative
+    indexed_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<IndexedVideo(video_id='{self.video_id}', title='{self.title[:30]}')>"
+
+
+# SQLite: external-content FTS5 table kept in sync by triggers (statistics-only updates skip it)
+SQLITE_FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS indexed_videos_fts USING fts5(
+        search_title, search_tags, search_body, search_cjk,
+        content='indexed_videos', content_rowid='id', tokenize='unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS indexed_videos_fts_insert AFTER INSERT ON indexed_videos BEGIN
+        INSERT INTO indexed_videos_fts(rowid, search_title, search_tags, search_body, search_cjk)
+        VALUES (new.id, new.search_title, new.search_tags, new.search_body, new.search_cjk);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS indexed_videos_fts_delete AFTER DELETE ON indexed_videos BEGIN
+        INSERT INTO indexed_videos_fts(indexed_videos_fts, rowid, search_title, search_tags, search_body, search_cjk)
+        VALUES ('delete', old.id, old.search_title, old.search_tags, old.search_body, old.search_cjk);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS indexed_videos_fts_update AFTER UPDATE OF search_title, search_tags, search_body, search_cjk ON indexed_videos
+    WHEN old.search_title IS NOT new.search_title OR old.search_tags IS NOT new.search_tags OR old.search_body IS NOT new.search_body
+        OR old.search_cjk IS NOT new.search_cjk
+    BEGIN
+        INSERT INTO indexed_videos_fts(indexed_videos_fts, rowid, search_title, search_tags, search_body, search_cjk)
+        VALUES ('delete', old.id, old.search_title, old.search_tags, old.search_body, old.search_cjk);
+        INSERT INTO indexed_videos_fts(rowid, search_title, search_tags, search_body, search_cjk)
+        VALUES (new.id, new.search_title, new.search_tags, new.search_body, new.search_cjk);
+    END""",
+]
+
+# PostgreSQL: generated tsvector (title > tags > description; CJK unigrams as D) with a GIN index
+POSTGRES_FTS_DDL = [
+    """ALTER TABLE indexed_videos ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', search_title), 'A') ||
+        setweight(to_tsvector('simple', search_tags), 'B') ||
+        setweight(to_tsvector('simple', search_body), 'C') ||
+        setweight(to_tsvector('simple', search_cjk), 'D')
+    ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_indexed_videos_search_vector ON indexed_videos USING gin (search_vector)",
+]
+
+for statement in SQLITE_FTS_DDL:
+    event.listen(IndexedVideo.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in POSTGRES_FTS_DDL:
+    event.listen(IndexedVideo.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
@@ -0,0 +1,160 @@
+"""
+Structured output schemas for AI (OpenAI) responses
+
+Every model here is sent to OpenAI as a strict JSON schema, so all fields are
+required and extra keys are forbidden. Numeric ranges are enforced by
+validators rather than schema keywords to stay within the strict subset.
+"""
+
+from pydantic import BaseModel, ConfigDict, field_validator
+from typing import List
+
+
+class StrictModel(BaseModel):
+    """Base for schemas used with strict structured outputs"""
+    model_config = ConfigDict(extra="forbid")
+
+
+def _clamp_rating(value: int) -> int:
+    """Clamp a 1-10 rating returned by the model"""
+    return min(10, max(1, int(value)))
+
+
+class RatedDimension(StrictModel):
+    """Common base for the 9 buzz factor dimensions"""
+    score: int
+
+    @field_validator("score", mode="before")
+    @classmethod
+    def clamp_score(cls, value):
+        return _clamp_rating(value)
+
+
+# Buzz factor analysis (ContentAnalyzer.analyze_buzz_factors)
+class HookAnalysis(RatedDimension):
+    type: str
+    description: str
+
+
+class CTAAnalysis(RatedDimension):
+    type: str
+    description: str
+
+
+class DurationAnalysis(RatedDimension):
+    category: str
+    optimal: bool
+
+
+class GenreAnalysis(RatedDimension):
+    category: str
+    trending: bool
+
+
+class EmotionAnalysis(RatedDimension):
+    primary: str
+    intensity: int
+
+
+class ColorToneAnalysis(RatedDimension):
+    palette: str
+    contrast: str
+
+
+class CompositionAnalysis(RatedDimension):
+    layout: str
+    visual_hierarchy: int
+
+
+class TextOverlayAnalysis(RatedDimension):
+    readability: str
+    impact: int
+
+
+class MusicStyleAnalysis(RatedDimension):
+    genre: str
+    energy: int
+
+
+class BuzzAnalysis(StrictModel):
+    """9-axis buzz factor analysis"""
+    hook: HookAnalysis
+    cta: CTAAnalysis
+    duration: DurationAnalysis
+    genre: GenreAnalysis
+    emotion: EmotionAnalysis
+    color_tone: ColorToneAnalysis
+    composition: CompositionAnalysis
+    text_overlay: TextOverlayAnalysis
+    music_style: MusicStyleAnalysis
+    top_factors: List[str]
+    overall_score: int
+
+    @field_validator("overall_score", mode="before")
+    @classmethod
+    def clamp_overall_score(cls, value):
+        return min(100, max(0, int(value)))
+
+
+class ContentSuggestions(StrictModel):
+    """Content suggestions (ContentAnalyzer.generate_content_suggestions)"""
+    hooks: List[str]
+    ctas: List[str]
+    hashtags: List[str]
+    script: str
+    visual_suggestions: List[str]
+
+
+# Script generation (ScriptGenerator)
+class ScriptSections(StrictModel):
+    """Structured video script"""
+    hook: str
+    introduction: str
+    main_content: str
+    cta: str
+    visual_suggestions: List[str]
+    pacing_notes: str
+    estimated_duration: int
+    full_script: str
+
+
+class ImprovedScript(StrictModel):
+    """Improved script with change notes"""
+    improved_script: str
+    changes: List[str]
+    explanations: List[str]
+    impact_analysis: str
+
+
+class HookOption(StrictModel):
+    hook: str
+    explanation: str
+    viral_rating: int
+    target_audience: str
+
+    @field_validator("viral_rating", mode="before")
+    @classmethod
+    def clamp_viral_rating(cls, value):
+        return _clamp_rating(value)
+
+
+class HookOptions(StrictModel):
+    """Wrapper object - structured outputs require an object at the top level"""
+    hooks: List[HookOption]
+
+
+class CTAOption(StrictModel):
+    cta: str
+    psychology: str
+    timing: str
+    effectiveness: int
+
+    @field_validator("effectiveness", mode="before")
+    @classmethod
+    def clamp_effectiveness(cls, value):
+        return _clamp_rating(value)
+
+
+class CTAOptions(StrictModel):
+    """Wrapper object - structured outputs require an object at the top level"""
+    ctas: List[CTAOption]
@@ -6,6 +6,16 @@ from pydantic import BaseModel, ConfigDict
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
+class CreativeAccountSummary(BaseModel):
+    """Account a creative belongs to (no credentials)"""
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: int
+    platform: str
+    username: str
+    display_name: Optional[str] = None
+    profile_picture_url: Optional[str] = None
+
 class CreativeResponse(BaseModel):
     """Schema for creative response"""
     model_config = ConfigDict(from_attributes=True)
@@ -20,7 +30,7 @@ class CreativeResponse(BaseModel):
     media_url: Optional[str] = None
     thumbnail_url: Optional[str] = None
     published_at: datetime
-    account: Dict[str, Any]
+    account: CreativeAccountSummary
     latest_metrics: Optional[Dict[str, Any]] = None
     ai_labels: Optional[Dict[str, Any]] = None
 
@@ -0,0 +1,45 @@
+"""
+Trending video serialization schemas
+
+Trending endpoints return VideoRecord.to_dict() output we have just built
+ourselves, so it is serialized straight to JSON through these TypedDict
+adapters instead of being re-validated into response models.
+"""
+
+from typing import List, Optional
+
+from pydantic import TypeAdapter
+from typing_extensions import TypedDict
+
+
+class VideoStatisticsRecord(TypedDict):
+    views: int
+    likes: int
+    comments: int
+
+
+class ViralSummaryRecord(TypedDict):
+    viral_score: float
+    status: str
+    views_per_hour: float
+    engagement_rate: float
+
+
+class TrendingVideoRecord(TypedDict):
+    video_id: str
+    url: str
+    title: str
+    description: str
+    channel_id: str
+    channel_title: str
+    published_at: Optional[str]
+    thumbnail_url: Optional[str]
+    duration_seconds: int
+    duration_formatted: str
+    statistics: VideoStatisticsRecord
+    tags: List[str]
+    category_id: str
+    viral: ViralSummaryRecord
+
+
+trending_video_list_adapter = TypeAdapter(List[TrendingVideoRecord])
@@ -3,30 +3,47 @@ AI content analysis service for buzz factor analysis and content generation
 """
 
 import base64
-import httpx
-import json
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 import asyncio
 from io import BytesIO
-from PIL import Image
 import time
 
-from openai import AsyncOpenAI
 from loguru import logger
 
 from app.core.config import get_settings
+from app.core.http_client import create_http_client, get_openai_client
 from app.core.monitoring import metrics
 from app.models.creative import Creative
 from app.models.label import Label, LabelType
+from app.schemas.ai import BuzzAnalysis, ContentSuggestions
+from app.services.ai.structured_output import create_structured_completion
+from app.services.ai.prompt_compaction import compact_description
 
 settings = get_settings()
 
+# Static instructions go first (system message) so provider-side prompt caching
+# can reuse the prefix; only the creative details vary in the user message.
+ANALYSIS_SYSTEM_PROMPT = """You are an expert social media content analyst specializing in viral content prediction.
+Analyze content for viral potential across 9 dimensions and reply only with the requested JSON object:
+1. hook: What makes the opening engaging? (curiosity, controversy, emotion, surprise)
+2. cta: Call-to-action strength (comment prompts, shares, saves, engagement)
+3. duration: Optimal length for platform and content type
+4. genre: Content category and trend alignment
+5. emotion: Emotional triggers (joy, surprise, fear, anger, sadness, anticipation)
+6. color_tone: Visual color psychology (warm, cool, high contrast, etc.)
+7. composition: Visual layout and design principles
+8. text_overlay: Text readability and impact
+9. music_style: Audio elements (if video content)
+
+Score each dimension 1-10 and use lowercase snake_case for type/category values.
+Keep descriptions under 20 words. List the top 3 factors contributing to viral
+potential in top_factors and give an overall_score from 0 to 100."""
+
 class ContentAnalyzer:
     """AI-powered content analysis for buzz factors and content generation"""
     
     def __init__(self):
-        self.openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
         self.model = settings.OPENAI_MODEL
         
         # Genre categories (120 categories like kataseru)
@@ -74,8 +91,7 @@ class ContentAnalyzer:
             messages = [
                 {
                     "role": "system",
-                    "content": """You are an expert social media content analyst specializing in viral content prediction. 
-                    Analyze content across 9 dimensions and provide specific, actionable insights about why content might go viral."""
+                    "content": ANALYSIS_SYSTEM_PROMPT
                 },
                 {
                     "role": "user",
@@ -95,14 +111,16 @@ class ContentAnalyzer:
                 except Exception as e:
                     logger.warning(f"Could not process image for analysis: {str(e)}")
             
-            response = await self.openai_client.chat.completions.create(
-                model=self.model,
-                messages=messages,
+            analysis = await create_structured_completion(
+                get_openai_client(),
+                self.model,
+                messages,
+                BuzzAnalysis,
+                feature="buzz_analysis",
                 temperature=0.1,
-                max_tokens=2000
+                max_tokens=1200
             )
-            
-            analysis_result = self._parse_analysis_response(response.choices[0].message.content)
+            analysis_result = analysis.model_dump()
             
             # Record processing time
             processing_time = time.time() - start_time
@@ -168,109 +186,44 @@ class ContentAnalyzer:
             Brand context: {brand_context if brand_context else "Generic brand"}
             
             Please provide:
-            1. 3 compelling hooks/opening lines
-            2. 3 call-to-action suggestions
-            3. 5 relevant hashtags
-            4. Script outline (30-60 seconds)
-            5. Visual composition suggestions
-            
-            Format as JSON with keys: hooks, ctas, hashtags, script, visual_suggestions
+            - hooks: 3 compelling hooks/opening lines
+            - ctas: 3 call-to-action suggestions
+            - hashtags: 5 relevant hashtags
+            - script: Script outline (30-60 seconds)
+            - visual_suggestions: Visual composition suggestions
             """
             
-            response = await self.openai_client.chat.completions.create(
-                model=self.model,
-                messages=[
+            suggestions = await create_structured_completion(
+                get_openai_client(),
+                self.model,
+                [
                     {"role": "system", "content": "You are a creative social media content strategist."},
                     {"role": "user", "content": prompt}
                 ],
+                ContentSuggestions,
+                feature="content_suggestions",
                 temperature=0.7,
                 max_tokens=1500
             )
-            
-            # Parse the response
-            content = response.choices[0].message.content
-            try:
-                return json.loads(content)
-            except json.JSONDecodeError:
-                # Fallback parsing if JSON is not perfect
-                return self._parse_content_suggestions(content)
+            return suggestions.model_dump()
                 
         except Exception as e:
             logger.error(f"Error generating content suggestions: {str(e)}")
             return self._get_default_suggestions()
     
     def _build_analysis_prompt(self, creative: Creative) -> str:
-        """Build analysis prompt for GPT-4o"""
-        content_info = f"""
-        Content Type: {creative.content_type.value}
-        Caption: {creative.caption or 'No caption'}
-        Title: {creative.title or 'No title'}  
-        Duration: {creative.duration_seconds or 'Unknown'} seconds
-        Published: {creative.published_at}
-        Platform: {creative.account.platform.value if creative.account else 'Unknown'}
-        """
+        """Build the per-creative part of the analysis prompt (static instructions are in ANALYSIS_SYSTEM_PROMPT)"""
+        caption = compact_description(creative.caption, model=self.model)
         
-        return f"""
-        Analyze this social media content for viral potential across 9 dimensions:
-        
-        {content_info}
-        
-        Please analyze:
-        1. HOOK: What makes the opening engaging? (curiosity, controversy, emotion, surprise)
-        2. CTA: Call-to-action strength (comment prompts, shares, saves, engagement)
-        3. DURATION: Optimal length for platform and content type
-        4. GENRE: Content category and trend alignment
-        5. EMOTION: Emotional triggers (joy, surprise, fear, anger, sadness, anticipation)
-        6. COLOR_TONE: Visual color psychology (warm, cool, high contrast, etc.)
-        7. COMPOSITION: Visual layout and design principles
-        8. TEXT_OVERLAY: Text readability and impact
-        9. MUSIC_STYLE: Audio elements (if video content)
-        
-        Rate each dimension 1-10 and explain why. Identify the top 3 factors contributing to viral potential.
-        """
-    
-    def _parse_analysis_response(self, response: str) -> Dict[str, Any]:
-        """Parse GPT-4o analysis response into structured data"""
-        try:
-            # Try to extract structured data from the response
-            analysis = {
-                "hook": {"score": 5, "type": "unknown", "description": ""},
-                "cta": {"score": 5, "type": "unknown", "description": ""},
-                "duration": {"score": 5, "category": "medium", "optimal": True},
-                "genre": {"score": 5, "category": "general", "trending": False},
-                "emotion": {"score": 5, "primary": "neutral", "intensity": 5},
-                "color_tone": {"score": 5, "palette": "neutral", "contrast": "medium"},
-                "composition": {"score": 5, "layout": "standard", "visual_hierarchy": 5},
-                "text_overlay": {"score": 5, "readability": "good", "impact": 5},
-                "music_style": {"score": 5, "genre": "none", "energy": 5},
-                "top_factors": ["hook", "emotion", "composition"],
-                "overall_score": 50
-            }
-            
-            # Simple parsing - in production, you'd want more sophisticated NLP
-            lines = response.lower().split('\n')
-            for line in lines:
-                if 'hook' in line and any(str(i) in line for i in range(1, 11)):
-                    score = self._extract_score_from_line(line)
-                    if score:
-                        analysis["hook"]["score"] = score
-                elif 'cta' in line and any(str(i) in line for i in range(1, 11)):
-                    score = self._extract_score_from_line(line)
-                    if score:
-                        analysis["cta"]["score"] = score
-                # Add more parsing logic for other dimensions...
-            
-            return analysis
-            
-        except Exception as e:
-            logger.error(f"Error parsing analysis response: {str(e)}")
-            return self._get_default_analysis()
-    
-    def _extract_score_from_line(self, line: str) -> Optional[int]:
-        """Extract numeric score from a line of text"""
-        import re
-        matches = re.findall(r'\b([1-9]|10)\b', line)
-        return int(matches[0]) if matches else None
+        return (
+            "Analyze this social media content:\n"
+            f"Content Type: {creative.content_type.value}\n"
+            f"Caption: {caption or 'No caption'}\n"
+            f"Title: {creative.title or 'No title'}\n"
+            f"Duration: {creative.duration_seconds or 'Unknown'} seconds\n"
+            f"Published: {creative.published_at}\n"
+            f"Platform: {creative.account.platform.value if creative.account else 'Unknown'}"
+        )
     
     def _score_hook_factor(self, hook_data: Dict[str, Any]) -> float:
         """Score hook factor (0-25 points)"""
@@ -351,9 +304,11 @@ class ContentAnalyzer:
     async def _encode_image_from_url(self, image_url: str) -> Optional[str]:
         """Download and encode image from URL"""
         try:
-            async with httpx.AsyncClient() as client:
+            async with create_http_client("media", endpoint="image") as client:
                 response = await client.get(image_url)
                 if response.status_code == 200:
+                    from PIL import Image  # deferred: Pillow is only needed for image analysis
+                    
                     # Resize image to reduce token usage
                     image = Image.open(BytesIO(response.content))
                     image.thumbnail((settings.IMAGE_RESIZE_WIDTH, settings.IMAGE_RESIZE_WIDTH))
@@ -368,17 +323,6 @@ class ContentAnalyzer:
         
         return None
     
-    def _parse_content_suggestions(self, content: str) -> Dict[str, Any]:
-        """Parse content suggestions from text response"""
-        # Simplified parsing - in production, use more robust parsing
-        return {
-            "hooks": ["Hook 1", "Hook 2", "Hook 3"],
-            "ctas": ["CTA 1", "CTA 2", "CTA 3"],
-            "hashtags": ["#example1", "#example2", "#example3"],
-            "script": "Generated script content...",
-            "visual_suggestions": ["Visual suggestion 1", "Visual suggestion 2"]
-        }
-    
     def _get_default_analysis(self) -> Dict[str, Any]:
         """Return default analysis structure"""
         return {
@@ -0,0 +1,173 @@
+"""
+Prompt preparation - compact video metadata before it is sent to the LLM
+
+YouTube descriptions are mostly links, chapter timestamps and sponsor text.
+This strips that noise, deduplicates and caps tags, and truncates to a token
+budget with a local tokenizer (tiktoken when installed, a character estimate
+otherwise), so prompts stay small and the static system prefix stays cacheable.
+
+tiktoken may download its BPE file on first use, so encodings are loaded in a
+worker thread (at startup via load_encoding); until one is ready the estimate
+is used instead of blocking the event loop.
+"""
+
+import asyncio
+import re
+from typing import Dict, Iterable, List, Optional
+
+from loguru import logger
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+URL_PATTERN = re.compile(r"(?:https?://|www\.)\S+", re.IGNORECASE)
+TIMESTAMP_PATTERN = re.compile(r"(?<!\d)(?:\d{1,2}:)?\d{1,2}:\d{2}(?!\d)")
+HASHTAG_ONLY_PATTERN = re.compile(r"^(?:#\S+\s*)+$")
+WHITESPACE_PATTERN = re.compile(r"[ \t\u3000]+")
+CJK_PATTERN = re.compile(r"[\u3040-\u30ff\u3400-\u9fff\uac00-\ud7af]")
+
+# Lines containing these are sponsor/social boilerplate
+BOILERPLATE_MARKERS = (
+    "sponsor", "use code", "promo code", "discount code", "affiliate", "% off",
+    "subscribe", "follow me", "follow us", "instagram", "twitter", "tiktok", "facebook",
+    "patreon", "merch", "business inquiries", "business enquiries", "for business",
+    "music by", "song:", "license", "all rights reserved", "copyright",
+    "チャンネル登録", "提供", "お仕事", "案件", "公式サイト",
+)
+
+MAX_TAG_LENGTH = 40
+
+
+def strip_boilerplate(text: str) -> str:
+    """Remove URLs, timestamps, hashtag-only lines and sponsor/social boilerplate"""
+    lines = []
+    seen = set()
+
+    for raw_line in (text or "").splitlines():
+        lowered = raw_line.lower()
+        if any(marker in lowered for marker in BOILERPLATE_MARKERS):
+            continue
+
+        line = URL_PATTERN.sub("", raw_line)
+        line = TIMESTAMP_PATTERN.sub("", line)
+        line = WHITESPACE_PATTERN.sub(" ", line).strip(" -|:•・")
+        if not line or HASHTAG_ONLY_PATTERN.match(line):
+            continue
+
+        key = line.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+
+    return "\n".join(lines)
+
+
+def compact_tags(tags: Optional[Iterable[str]], limit: Optional[int] = None) -> List[str]:
+    """Deduplicate tags case-insensitively (keeping order) and cap their number"""
+    limit = settings.PROMPT_MAX_TAGS if limit is None else limit
+    compacted = []
+    seen = set()
+
+    for tag in tags or []:
+        tag = WHITESPACE_PATTERN.sub(" ", str(tag)).strip().lstrip("#")
+        key = tag.lower()
+        if not tag or key in seen or len(tag) > MAX_TAG_LENGTH:
+            continue
+        seen.add(key)
+        compacted.append(tag)
+        if len(compacted) >= limit:
+            break
+
+    return compacted
+
+
+# Loaded encodings by model (None when tiktoken is unavailable for it)
+_encodings: Dict[str, object] = {}
+_loading: Dict[str, asyncio.Task] = {}
+
+
+def _load_encoding(model: str):
+    """Load the tiktoken encoding for a model (blocking, may download), None on failure"""
+    if model not in _encodings:
+        try:
+            import tiktoken
+            try:
+                encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                encoding = tiktoken.get_encoding("o200k_base")
+        except ImportError:
+            encoding = None
+        except Exception as e:
+            logger.warning(f"tiktoken encoding for {model} unavailable, estimating tokens: {str(e)}")
+            encoding = None
+        _encodings[model] = encoding
+    return _encodings[model]
+
+
+async def load_encoding(model: Optional[str] = None):
+    """Load the encoding for a model in a worker thread (call once at startup)"""
+    return await asyncio.to_thread(_load_encoding, model or settings.OPENAI_MODEL)
+
+
+def _get_encoding(model: str):
+    """Loaded encoding for a model; never loads on a running event loop"""
+    if model in _encodings:
+        return _encodings[model]
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Sync caller (worker, script): loading here blocks nothing else
+        return _load_encoding(model)
+
+    if model not in _loading:
+        _loading[model] = loop.create_task(load_encoding(model))
+    return None
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token estimate: ~1 token per CJK character, ~4 characters per token otherwise"""
+    cjk = len(CJK_PATTERN.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Count tokens with the local tokenizer"""
+    encoding = _get_encoding(model or settings.OPENAI_MODEL)
+    if encoding is None:
+        return _estimate_tokens(text)
+    return len(encoding.encode(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """Truncate text to at most max_tokens tokens"""
+    if not text or max_tokens <= 0:
+        return ""
+
+    encoding = _get_encoding(model or settings.OPENAI_MODEL)
+    if encoding is not None:
+        tokens = encoding.encode(text)
+        if len(tokens) <= max_tokens:
+            return text
+        return encoding.decode(tokens[:max_tokens]).rstrip() + "…"
+
+    if _estimate_tokens(text) <= max_tokens:
+        return text
+
+    # Binary search the longest prefix within budget
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if _estimate_tokens(text[:middle]) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low].rstrip() + "…"
+
+
+def compact_description(text: Optional[str], max_tokens: Optional[int] = None, model: Optional[str] = None) -> str:
+    """Strip boilerplate from a description and fit it to the token budget"""
+    max_tokens = settings.PROMPT_DESCRIPTION_MAX_TOKENS if max_tokens is None else max_tokens
+    return truncate_to_tokens(strip_boilerplate(text or ""), max_tokens, model)
@@ -4,20 +4,33 @@ Similar to 2nd-buzz.com script generation feature
 """
 
 from typing import Dict, List, Optional, Any
-from openai import AsyncOpenAI
 from loguru import logger
-import json
 
 from app.core.config import get_settings
+from app.core.http_client import get_openai_client
+from app.schemas.ai import ScriptSections, ImprovedScript, HookOptions, CTAOptions
+from app.services.ai.structured_output import create_structured_completion
+from app.services.ai.prompt_compaction import compact_description, compact_tags
 
 settings = get_settings()
 
+# Static instructions go first (system message) so provider-side prompt caching
+# can reuse the prefix; only the per-video details vary in the user message.
+SCRIPT_SYSTEM_PROMPT = """You are an expert video script writer specializing in viral social media content. You create engaging, structured scripts that capture attention and drive engagement.
+
+Create a structured script with:
+1. hook (0-5s): Grab attention immediately. Create curiosity or present a problem.
+2. introduction (5-15s): Establish context. Promise value.
+3. main_content: Deliver the core message, provide value/entertainment, use storytelling.
+4. cta (last 10s): Clear next step. Engagement prompt.
+
+Fill in each section with the exact words to say, visual_suggestions with visual suggestions, pacing_notes with pacing and timing notes, estimated_duration in seconds, and full_script with the complete script as it would be read."""
+
 
 class ScriptGenerator:
     """Generate video scripts using OpenAI GPT-4o"""
     
     def __init__(self):
-        self.openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
         self.model = settings.OPENAI_MODEL
     
     async def generate_script_from_video(
@@ -53,29 +66,27 @@ class ScriptGenerator:
                 style=style
             )
             
-            response = await self.openai_client.chat.completions.create(
-                model=self.model,
-                messages=[
+            script = await create_structured_completion(
+                get_openai_client(),
+                self.model,
+                [
                     {
                         "role": "system",
-                        "content": "You are an expert video script writer specializing in viral social media content. You create engaging, structured scripts that capture attention and drive engagement."
+                        "content": SCRIPT_SYSTEM_PROMPT
                     },
                     {
                         "role": "user",
                         "content": prompt
                     }
                 ],
+                ScriptSections,
+                feature="script_from_video",
                 temperature=0.7,
                 max_tokens=2000
             )
             
-            script_content = response.choices[0].message.content
-            
-            # Parse and structure the script
-            structured_script = self._parse_script_response(script_content, duration)
-            
             logger.info(f"Generated script for video: {title[:50]}...")
-            return structured_script
+            return script.model_dump()
             
         except Exception as e:
             logger.error(f"Error generating script: {str(e)}")
@@ -112,23 +123,20 @@ class ScriptGenerator:
             - Format for {target_platform} best practices
             
             Provide a structured script with:
-            1. HOOK (0-5 seconds): Attention-grabbing opening
-            2. INTRODUCTION (5-10 seconds): Context setting
-            3. MAIN CONTENT (varies): Core message/value
-            4. CALL-TO-ACTION (last 5-10 seconds): Clear next step
-            
-            Also include:
-            - Visual suggestions for each section
-            - Text overlay recommendations
-            - Pacing notes
-            - Estimated word count per section
-            
-            Format as JSON with keys: hook, introduction, main_content, cta, visual_suggestions, pacing_notes
+            - hook (0-5 seconds): Attention-grabbing opening
+            - introduction (5-10 seconds): Context setting
+            - main_content (varies): Core message/value
+            - cta (last 5-10 seconds): Clear next step
+            - visual_suggestions: Visual and text overlay suggestions for each section
+            - pacing_notes: Pacing notes
+            - estimated_duration: Estimated duration in seconds
+            - full_script: The complete script as it would be read
             """
             
-            response = await self.openai_client.chat.completions.create(
-                model=self.model,
-                messages=[
+            script = await create_structured_completion(
+                get_openai_client(),
+                self.model,
+                [
                     {
                         "role": "system",
                         "content": "You are an expert viral content script writer."
@@ -138,18 +146,12 @@ class ScriptGenerator:
                         "content": prompt
                     }
                 ],
+                ScriptSections,
+                feature="script_from_idea",
                 temperature=0.8,
                 max_tokens=2000
             )
-            
-            script_content = response.choices[0].message.content
-            
-            # Try to parse as JSON
-            try:
-                structured_script = json.loads(script_content)
-            except json.JSONDecodeError:
-                # Fallback to text parsing
-                structured_script = self._parse_script_response(script_content, target_duration)
+            structured_script = script.model_dump()
             
             # Add metadata
             structured_script["metadata"] = {
@@ -193,17 +195,16 @@ class ScriptGenerator:
             {original_script}
             
             Provide:
-            1. Improved script
-            2. List of changes made
-            3. Explanation for each improvement
-            4. Estimated impact on engagement
-            
-            Format as JSON with keys: improved_script, changes, explanations, impact_analysis
+            - improved_script: The improved script
+            - changes: List of changes made
+            - explanations: Explanation for each improvement
+            - impact_analysis: Estimated impact on engagement
             """
             
-            response = await self.openai_client.chat.completions.create(
-                model=self.model,
-                messages=[
+            improved = await create_structured_completion(
+                get_openai_client(),
+                self.model,
+                [
                     {
                         "role": "system",
                         "content": "You are an expert script editor specializing in viral social media content."
@@ -213,21 +214,12 @@ class ScriptGenerator:
                         "content": prompt
                     }
                 ],
+                ImprovedScript,
+                feature="script_improve",
                 temperature=0.5,
                 max_tokens=2000
             )
-            
-            result = response.choices[0].message.content
-            
-            try:
-                return json.loads(result)
-            except json.JSONDecodeError:
-                return {
-                    "improved_script": result,
-                    "changes": ["Script improved"],
-                    "explanations": ["Various improvements applied"],
-                    "impact_analysis": "Moderate positive impact expected"
-                }
+            return improved.model_dump()
                 
         except Exception as e:
             logger.error(f"Error improving script: {str(e)}")
@@ -258,17 +250,16 @@ class ScriptGenerator:
             Generate {count} different attention-grabbing hooks for a video about: "{video_topic}"
             
             For each hook:
-            1. Write the hook (1-2 sentences, under 10 seconds to say)
-            2. Explain why it works
-            3. Rate its viral potential (1-10)
-            4. Suggest the target audience
-            
-            Format as JSON array with keys: hook, explanation, viral_rating, target_audience
+            - hook: The hook (1-2 sentences, under 10 seconds to say)
+            - explanation: Why it works (one sentence)
+            - viral_rating: Its viral potential (1-10)
+            - target_audience: The target audience
             """
             
-            response = await self.openai_client.chat.completions.create(
-                model=self.model,
-                messages=[
+            options = await create_structured_completion(
+                get_openai_client(),
+                self.model,
+                [
                     {
                         "role": "system",
                         "content": "You are an expert at creating viral video hooks."
@@ -278,18 +269,12 @@ class ScriptGenerator:
                         "content": prompt
                     }
                 ],
+                HookOptions,
+                feature="hooks",
                 temperature=0.9,
                 max_tokens=1500
             )
-            
-            result = response.choices[0].message.content
-            
-            try:
-                hooks = json.loads(result)
-                return hooks if isinstance(hooks, list) else []
-            except json.JSONDecodeError:
-                # Fallback parsing
-                return self._parse_hooks_response(result, count)
+            return [hook.model_dump() for hook in options.hooks[:count]]
                 
         except Exception as e:
             logger.error(f"Error generating hooks: {str(e)}")
@@ -315,17 +300,16 @@ class ScriptGenerator:
             Generate 5 effective call-to-action phrases for a {platform} video with the goal: "{video_goal}"
             
             For each CTA:
-            1. Write the CTA phrase
-            2. Explain the psychology behind it
-            3. Suggest when to use it in the video
-            4. Rate its effectiveness (1-10)
-            
-            Format as JSON array with keys: cta, psychology, timing, effectiveness
+            - cta: The CTA phrase
+            - psychology: The psychology behind it (one sentence)
+            - timing: When to use it in the video
+            - effectiveness: Its effectiveness (1-10)
             """
             
-            response = await self.openai_client.chat.completions.create(
-                model=self.model,
-                messages=[
+            options = await create_structured_completion(
+                get_openai_client(),
+                self.model,
+                [
                     {
                         "role": "system",
                         "content": "You are an expert at creating effective call-to-actions."
@@ -335,17 +319,12 @@ class ScriptGenerator:
                         "content": prompt
                     }
                 ],
+                CTAOptions,
+                feature="ctas",
                 temperature=0.7,
                 max_tokens=1200
             )
-            
-            result = response.choices[0].message.content
-            
-            try:
-                ctas = json.loads(result)
-                return ctas if isinstance(ctas, list) else []
-            except json.JSONDecodeError:
-                return []
+            return [cta.model_dump() for cta in options.ctas]
                 
         except Exception as e:
             logger.error(f"Error generating CTAs: {str(e)}")
@@ -360,96 +339,18 @@ class ScriptGenerator:
         script_length: str,
         style: str
     ) -> str:
-        """Build prompt for script generation"""
-        return f"""
-        Generate a {style} video script based on this video:
-        
-        Title: {title}
-        Description: {description}
-        Tags: {', '.join(tags[:10])}
-        Target Duration: {target_duration} seconds
-        Length Preference: {script_length}
-        
-        Create a structured script with:
-        
-        1. HOOK (0-5s): 
-           - Grab attention immediately
-           - Create curiosity or present a problem
-        
-        2. INTRODUCTION (5-15s):
-           - Establish context
-           - Promise value
-        
-        3. MAIN CONTENT ({int(target_duration * 0.6)}s):
-           - Deliver core message
-           - Provide value/entertainment
-           - Use storytelling
-        
-        4. CALL-TO-ACTION (last 10s):
-           - Clear next step
-           - Engagement prompt
-        
-        Include:
-        - Exact words to say
-        - Visual suggestions
-        - Pacing notes
-        - Estimated timing for each section
-        
-        Format: Structured text with clear sections
-        """
-    
-    def _parse_script_response(self, response: str, duration: int) -> Dict[str, Any]:
-        """Parse script response into structured format"""
-        # Simple parsing - in production, use more robust parsing
-        sections = {
-            "hook": "",
-            "introduction": "",
-            "main_content": "",
-            "cta": "",
-            "visual_suggestions": [],
-            "pacing_notes": "",
-            "estimated_duration": duration,
-            "full_script": response
-        }
-        
-        # Try to extract sections
-        lines = response.split('\n')
-        current_section = None
-        
-        for line in lines:
-            line_lower = line.lower()
-            if 'hook' in line_lower:
-                current_section = 'hook'
-            elif 'introduction' in line_lower or 'intro' in line_lower:
-                current_section = 'introduction'
-            elif 'main content' in line_lower or 'body' in line_lower:
-                current_section = 'main_content'
-            elif 'call' in line_lower and 'action' in line_lower or 'cta' in line_lower:
-                current_section = 'cta'
-            elif current_section and line.strip():
-                sections[current_section] += line + "\n"
-        
-        return sections
-    
-    def _parse_hooks_response(self, response: str, count: int) -> List[Dict[str, str]]:
-        """Parse hooks from text response"""
-        # Fallback parsing
-        hooks = []
-        lines = response.split('\n')
-        current_hook = {}
-        
-        for line in lines:
-            if line.strip().startswith(('1.', '2.', '3.', '4.', '5.')):
-                if current_hook:
-                    hooks.append(current_hook)
-                current_hook = {"hook": line.strip(), "explanation": "", "viral_rating": 7}
-            elif current_hook and line.strip():
-                current_hook["explanation"] += line.strip() + " "
-        
-        if current_hook:
-            hooks.append(current_hook)
+        """Build the per-video part of the script prompt (static instructions are in SCRIPT_SYSTEM_PROMPT)"""
+        description = compact_description(description, model=self.model)
         
-        return hooks[:count]
+        return (
+            f"Generate a {style} video script based on this video:\n"
+            f"Title: {title}\n"
+            f"Description: {description or 'No description'}\n"
+            f"Tags: {', '.join(compact_tags(tags))}\n"
+            f"Target Duration: {target_duration} seconds\n"
+            f"Main Content Duration: {int(target_duration * 0.6)} seconds\n"
+            f"Length Preference: {script_length}"
+        )
     
     def _get_default_script(self) -> Dict[str, Any]:
         """Return default script structure"""
@@ -0,0 +1,151 @@
+"""
+Structured (JSON schema) outputs for OpenAI chat completions
+
+All AI calls go through create_structured_completion(): the Pydantic schema is
+sent as a strict response_format and the reply is read by a single incremental
+parser, so there is no free-text scanning or prose to throw away.
+"""
+
+from typing import TYPE_CHECKING, Any, Dict, Generic, List, Optional, Type, TypeVar
+from pydantic import BaseModel
+
+from app.core.http_client import openai_request, span
+from app.services.ai.usage_ledger import usage_ledger
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class StructuredOutputError(ValueError):
+    """Raised when a completion does not contain a valid structured object"""
+
+
+def json_schema_format(schema: Type[BaseModel]) -> Dict[str, Any]:
+    """Build a strict json_schema response_format for a Pydantic model"""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": schema.__name__,
+            "schema": schema.model_json_schema(),
+            "strict": True
+        }
+    }
+
+
+class StructuredOutputParser(Generic[T]):
+    """
+    Incremental parser for a JSON object completion
+
+    Chunks are fed as they arrive (whole message or stream deltas). Each
+    character is scanned exactly once to track string/escape state and brace
+    depth, so the end of the top-level object is known without re-parsing.
+    Anything before the first '{' or after the matching '}' is ignored.
+    """
+
+    def __init__(self, schema: Type[T]):
+        self.schema = schema
+        self._buffer: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._started = False
+        self._complete = False
+
+    @property
+    def complete(self) -> bool:
+        return self._complete
+
+    def feed(self, chunk: str) -> bool:
+        """Consume a chunk, returns True once the top-level object is closed"""
+        if self._complete or not chunk:
+            return self._complete
+
+        start = 0
+        if not self._started:
+            start = chunk.find("{")
+            if start == -1:
+                return False
+            self._started = True
+
+        for index in range(start, len(chunk)):
+            char = chunk[index]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._buffer.append(chunk[start:index + 1])
+                    self._complete = True
+                    return True
+
+        self._buffer.append(chunk[start:])
+        return False
+
+    def result(self) -> T:
+        """Validate the collected object against the schema"""
+        if not self._complete:
+            raise StructuredOutputError(f"Incomplete {self.schema.__name__} object in completion")
+        try:
+            return self.schema.model_validate_json("".join(self._buffer))
+        except ValueError as e:
+            raise StructuredOutputError(f"Invalid {self.schema.__name__} object: {str(e)}") from e
+
+
+def parse_structured_response(content: Optional[str], schema: Type[T]) -> T:
+    """Parse a complete message body into the schema"""
+    parser = StructuredOutputParser(schema)
+    parser.feed(content or "")
+    return parser.result()
+
+
+async def create_structured_completion(
+    client: "AsyncOpenAI",
+    model: str,
+    messages: List[Dict[str, Any]],
+    schema: Type[T],
+    feature: str,
+    **kwargs: Any
+) -> T:
+    """
+    Run a chat completion constrained to a Pydantic schema
+
+    Args:
+        client: OpenAI client
+        model: Model name
+        messages: Chat messages
+        schema: Pydantic model the reply must conform to
+        feature: Feature name the usage is accounted to
+        **kwargs: Extra completion parameters (temperature, max_tokens, ...)
+
+    Returns:
+        Validated schema instance
+    """
+    with span(f"openai.{feature}", {"gen_ai.request.model": model, "feature": feature}) as current_span, \
+            openai_request(model, streaming=bool(kwargs.get("stream"))):
+        response = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            response_format=json_schema_format(schema),
+            **kwargs
+        )
+        if current_span is not None and response.usage is not None:
+            current_span.set_attribute("gen_ai.usage.input_tokens", response.usage.prompt_tokens)
+            current_span.set_attribute("gen_ai.usage.output_tokens", response.usage.completion_tokens)
+    await usage_ledger.record(feature, model, response.usage)
+
+    message = response.choices[0].message
+    if getattr(message, "refusal", None):
+        raise StructuredOutputError(f"Model refused {schema.__name__}: {message.refusal}")
+
+    return parse_structured_response(message.content, schema)
@@ -0,0 +1,285 @@
+"""
+AI usage ledger - token/cost accounting and per-tenant budgets
+
+Every OpenAI completion is attributed to the current user (set per request by
+require_ai_budget) and a feature name. Usage is persisted to the ai_usage table
+for reporting, while limits are enforced from a monthly counter held in memory
+or Redis, so the hot path never runs a COUNT/SUM query. Redis counters are
+seeded once per user and month from the ledger table; in-memory counters
+only see their own process's calls, so they are re-seeded every
+AI_USAGE_RESYNC_SECONDS to pick up other workers' usage, and past months
+are dropped.
+"""
+
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import time
+
+from fastapi import Depends, HTTPException, status
+from loguru import logger
+from sqlalchemy import select, func
+
+from app.core.auth import get_current_principal
+from app.core.config import get_settings
+from app.core.database import get_db_context
+from app.core.monitoring import metrics
+from app.core.user_cache import UserPrincipal
+from app.models.ai_usage import AIUsage
+
+settings = get_settings()
+
+# USD per 1M tokens (input, output); the longest matching model prefix wins
+MODEL_PRICING: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+}
+
+
+@dataclass(frozen=True)
+class UsageScope:
+    """Who AI calls in the current request are billed to"""
+    user_id: int
+    plan: str
+
+
+@dataclass
+class MonthlyUsage:
+    """Usage counters for one user and calendar month"""
+    tokens: int = 0
+    requests: Dict[str, int] = field(default_factory=dict)
+
+
+_usage_scope: ContextVar[Optional[UsageScope]] = ContextVar("ai_usage_scope", default=None)
+
+
+def set_usage_scope(user: UserPrincipal) -> None:
+    """Attribute AI calls in the current request to a user"""
+    _usage_scope.set(UsageScope(user_id=user.id, plan=user.subscription_plan.value))
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimate the USD cost of a completion"""
+    prefixes = [prefix for prefix in MODEL_PRICING if model.startswith(prefix)]
+    if not prefixes:
+        return 0.0
+    input_price, output_price = MODEL_PRICING[max(prefixes, key=len)]
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+def current_month() -> str:
+    return datetime.now(timezone.utc).strftime("%Y%m")
+
+
+def monthly_token_budget(plan: str) -> int:
+    """Monthly token budget for a plan (0 = unlimited)"""
+    return {
+        "starter": settings.AI_MONTHLY_TOKEN_BUDGET_STARTER,
+        "growth": settings.AI_MONTHLY_TOKEN_BUDGET_GROWTH,
+        "enterprise": settings.AI_MONTHLY_TOKEN_BUDGET_ENTERPRISE,
+    }.get(plan, settings.AI_MONTHLY_TOKEN_BUDGET_STARTER)
+
+
+class InMemoryUsageCounter:
+    """Per-process monthly counters, re-seeded from the ledger table after `resync_seconds`"""
+
+    def __init__(self, resync_seconds: float):
+        self.resync_seconds = resync_seconds
+        self._usage: Dict[Tuple[int, str], MonthlyUsage] = {}
+        self._seeded_at: Dict[Tuple[int, str], float] = {}
+        self._month: Optional[str] = None
+
+    async def exists(self, user_id: int, month: str) -> bool:
+        """Seeded recently enough (stale counters miss other workers' usage)"""
+        seeded_at = self._seeded_at.get((user_id, month))
+        return seeded_at is not None and time.monotonic() - seeded_at < self.resync_seconds
+
+    async def seed(self, user_id: int, month: str, usage: MonthlyUsage) -> None:
+        # The ledger table has every worker's usage, so it replaces the local count
+        self._evict_past_months(month)
+        self._usage[(user_id, month)] = usage
+        self._seeded_at[(user_id, month)] = time.monotonic()
+
+    async def increment(self, user_id: int, month: str, feature: str, tokens: int) -> None:
+        self._evict_past_months(month)
+        usage = self._usage.setdefault((user_id, month), MonthlyUsage())
+        usage.tokens += tokens
+        usage.requests[feature] = usage.requests.get(feature, 0) + 1
+
+    async def get(self, user_id: int, month: str) -> MonthlyUsage:
+        return self._usage.get((user_id, month), MonthlyUsage())
+
+    def _evict_past_months(self, month: str) -> None:
+        if month == self._month:
+            return
+        self._month = month
+        for key in [key for key in self._usage if key[1] != month]:
+            del self._usage[key]
+            self._seeded_at.pop(key, None)
+
+
+class RedisUsageCounter:
+    """Monthly counters in a Redis hash shared by all workers"""
+
+    KEY_TTL_SECONDS = 40 * 24 * 3600
+
+    def __init__(self, redis_url: str):
+        import redis.asyncio as redis
+        self._redis = redis.from_url(redis_url, decode_responses=True)
+
+    def _key(self, user_id: int, month: str) -> str:
+        return f"ai_usage:{user_id}:{month}"
+
+    async def exists(self, user_id: int, month: str) -> bool:
+        return bool(await self._redis.exists(self._key(user_id, month)))
+
+    async def seed(self, user_id: int, month: str, usage: MonthlyUsage) -> None:
+        key = self._key(user_id, month)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hsetnx(key, "tokens", usage.tokens)
+            for feature, count in usage.requests.items():
+                pipe.hsetnx(key, f"requests:{feature}", count)
+            pipe.expire(key, self.KEY_TTL_SECONDS)
+            await pipe.execute()
+
+    async def increment(self, user_id: int, month: str, feature: str, tokens: int) -> None:
+        key = self._key(user_id, month)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hincrby(key, "tokens", tokens)
+            pipe.hincrby(key, f"requests:{feature}", 1)
+            pipe.expire(key, self.KEY_TTL_SECONDS)
+            await pipe.execute()
+
+    async def get(self, user_id: int, month: str) -> MonthlyUsage:
+        values = await self._redis.hgetall(self._key(user_id, month))
+        return MonthlyUsage(
+            tokens=int(values.get("tokens", 0)),
+            requests={
+                name.split(":", 1)[1]: int(count)
+                for name, count in values.items()
+                if name.startswith("requests:")
+            }
+        )
+
+
+class UsageLedger:
+    """Records AI usage and answers budget checks"""
+
+    def __init__(self):
+        self._counter = None
+        self._seed_lock = asyncio.Lock()
+
+    @property
+    def counter(self):
+        if self._counter is None:
+            if settings.AI_USAGE_BACKEND == "redis":
+                self._counter = RedisUsageCounter(settings.REDIS_URL)
+            else:
+                self._counter = InMemoryUsageCounter(settings.AI_USAGE_RESYNC_SECONDS)
+        return self._counter
+
+    async def record(self, feature: str, model: str, usage: Any) -> None:
+        """
+        Record token usage from an OpenAI response
+
+        Args:
+            feature: Feature name (e.g. 'buzz_analysis')
+            model: Model used
+            usage: `response.usage` from the OpenAI client (may be None)
+        """
+        if usage is None:
+            return
+
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        cost_usd = estimate_cost(model, prompt_tokens, completion_tokens)
+        scope = _usage_scope.get()
+        plan = scope.plan if scope else "anonymous"
+
+        metrics.record_ai_usage(feature, model, plan, prompt_tokens, completion_tokens, cost_usd)
+
+        try:
+            if scope:
+                month = current_month()
+                await self._ensure_seeded(scope.user_id, month)
+                await self.counter.increment(scope.user_id, month, feature, prompt_tokens + completion_tokens)
+
+            async with get_db_context() as db:
+                db.add(AIUsage(
+                    user_id=scope.user_id if scope else None,
+                    feature=feature,
+                    model=model,
+                    prompt_tokens=prompt_tokens,
+                    completion_tokens=completion_tokens,
+                    cost_usd=cost_usd
+                ))
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Error recording AI usage for {feature}: {str(e)}")
+
+    async def get_monthly_usage(self, user_id: int) -> MonthlyUsage:
+        """Current calendar month usage for a user"""
+        month = current_month()
+        await self._ensure_seeded(user_id, month)
+        return await self.counter.get(user_id, month)
+
+    async def _ensure_seeded(self, user_id: int, month: str) -> None:
+        """Load the counter from the ledger table (once per user and month, or when stale in memory)"""
+        if await self.counter.exists(user_id, month):
+            return
+
+        async with self._seed_lock:
+            if await self.counter.exists(user_id, month):
+                return
+
+            month_start = datetime.strptime(month, "%Y%m").replace(tzinfo=timezone.utc)
+            async with get_db_context() as db:
+                result = await db.execute(
+                    select(
+                        AIUsage.feature,
+                        func.count(AIUsage.id),
+                        func.coalesce(func.sum(AIUsage.prompt_tokens + AIUsage.completion_tokens), 0)
+                    ).where(
+                        AIUsage.user_id == user_id,
+                        AIUsage.created_at >= month_start
+                    ).group_by(AIUsage.feature)
+                )
+                rows = result.all()
+
+            await self.counter.seed(user_id, month, MonthlyUsage(
+                tokens=sum(int(tokens) for _, _, tokens in rows),
+                requests={feature: count for feature, count, _ in rows}
+            ))
+
+
+def require_ai_budget(user_dependency=get_current_principal):
+    """
+    Dependency that enforces the monthly AI token budget of the user's plan
+    and attributes the request's AI usage to that user
+    """
+    async def budget_checker(current_user: UserPrincipal = Depends(user_dependency)) -> UserPrincipal:
+        plan = current_user.subscription_plan.value
+        budget = monthly_token_budget(plan)
+
+        if budget:
+            usage = await usage_ledger.get_monthly_usage(current_user.id)
+            if usage.tokens >= budget:
+                metrics.record_ai_budget_rejection(plan, "monthly_tokens")
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Monthly AI usage budget reached for your plan"
+                )
+
+        set_usage_scope(current_user)
+        return current_user
+
+    return budget_checker
+
+
+# Instance for easy import
+usage_ledger = UsageLedger()
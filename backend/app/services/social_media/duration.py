@@ -0,0 +1,48 @@
+"""
+ISO 8601 duration parsing
+
+YouTube reports video lengths as ISO 8601 durations ("PT4M13S", "P1DT2H3M"
+for long streams, "P0D" for upcoming/live ones). Patterns are compiled once,
+the whole-number day/time shape the API sends takes a fast path before the
+full designator grammar, and results are memoized: a trending list or
+channel sync repeats the same few hundred short durations.
+"""
+
+from functools import lru_cache
+import re
+
+# Designator format: PnYnMnWnDTnHnMnS, any component optional, decimal fraction (. or ,) allowed
+_NUMBER = r"(\d+(?:[.,]\d+)?)"
+DURATION_PATTERN = re.compile(
+    rf"P(?!$)(?:{_NUMBER}Y)?(?:{_NUMBER}M)?(?:{_NUMBER}W)?(?:{_NUMBER}D)?"
+    rf"(?:T(?!$)(?:{_NUMBER}H)?(?:{_NUMBER}M)?(?:{_NUMBER}S)?)?"
+)
+
+# What the API actually sends: whole days/hours/minutes/seconds ("P1DT2H3M4S", "PT45S", "P0D");
+# like DURATION_PATTERN, "P" and "T" must each be followed by a component
+COMMON_PATTERN = re.compile(r"P(?!$)(?:(\d+)D)?(?:T(?!$)(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?")
+
+# Seconds per component; years and months have no fixed length, so nominal 365 and 30 days are used
+UNIT_SECONDS = (365 * 86400, 30 * 86400, 7 * 86400, 86400, 3600, 60, 1)
+
+
+@lru_cache(maxsize=1024)
+def parse_duration(duration: str) -> int:
+    """ISO 8601 duration to whole seconds (0 for empty or malformed values)"""
+    match = COMMON_PATTERN.fullmatch(duration or "")
+    if match is not None:
+        days, hours, minutes, seconds = match.groups()
+        return int(days or 0) * 86400 + int(hours or 0) * 3600 + int(minutes or 0) * 60 + int(seconds or 0)
+
+    match = DURATION_PATTERN.fullmatch(duration or "")
+    if match is None:
+        return 0
+
+    total = 0
+    for value, unit_seconds in zip(match.groups(), UNIT_SECONDS):
+        if value:
+            if value.isdigit():
+                total += int(value) * unit_seconds
+            else:
+                total += float(value.replace(",", ".")) * unit_seconds
+    return int(total)
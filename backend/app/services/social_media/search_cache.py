@@ -0,0 +1,271 @@
+"""
+Keyword search result cache
+
+A YouTube keyword search costs 100 quota units (search.list) plus a
+videos.list call, and the keyword-search, instant-results and viral-analysis
+pages all issue the same popular searches. Results are cached under a
+normalized key:
+
+- the query is NFKC-normalized (full-width Japanese input, ideographic
+  spaces), case-folded and whitespace-collapsed
+- for date-sorted searches `published_after_hours` is rounded up to a fixed
+  bucket and cached pages are filtered back to the exact window on every
+  read; the newest videos of the wider window include those of the narrower
+  one. Other orders rank across the whole window, so filtering a wider
+  bucket would drop results; they are keyed by the exact window
+- the full 50 results are always fetched (same quota cost), filtered
+  (window, min_views) and sliced, so max_results is not part of the key
+
+TTLs depend on the sort order: date-sorted results go stale fastest.
+Concurrent misses for one key share a single upstream search, and a
+background warmer (SEARCH_CACHE_WARM_INTERVAL_MINUTES) refreshes the most
+requested queries and current trending tags before users ask for them.
+"""
+
+from collections import Counter, OrderedDict
+from dataclasses import fields
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+import asyncio
+import json
+import sys
+import time
+import unicodedata
+
+from loguru import logger
+
+from app.core.config import get_settings
+from app.core.monitoring import metrics
+from app.services.social_media.video_record import VideoRecord
+from app.services.social_media.youtube_trending import youtube_trending
+
+settings = get_settings()
+
+# Seconds a result set stays fresh, by search order
+SEARCH_CACHE_TTLS = {
+    "date": 300,
+    "viewCount": 900,
+    "relevance": 1800,
+    "rating": 3600,
+}
+DEFAULT_TTL = 900
+
+# published_after_hours of date-sorted searches is rounded up to one of these (longer windows to whole days)
+HOUR_BUCKETS = (1, 3, 6, 12, 24, 48, 72, 168, 336, 720)
+
+# Entries closer than this to expiry are refreshed by the warmer
+REFRESH_AHEAD_SECONDS = 120
+
+SEARCH_PAGE_SIZE = 50
+
+RECORD_FIELDS = tuple(field.name for field in fields(VideoRecord))
+
+CacheKey = Tuple[str, str, Optional[int]]
+
+
+def normalize_query(keyword: str) -> str:
+    """NFKC + casefold + collapsed whitespace ('ＡＢＣ　ｄｅｆ ' -> 'abc def')"""
+    return " ".join(unicodedata.normalize("NFKC", keyword).casefold().split())
+
+
+def bucket_hours(hours: Optional[int], order: str = "date") -> Optional[int]:
+    """Round a published-within window up to its cache bucket (date order only)"""
+    if not hours:
+        return None
+    if order != "date":
+        return hours
+    for bucket in HOUR_BUCKETS:
+        if hours <= bucket:
+            return bucket
+    return -(-hours // 24) * 24
+
+
+def _dump_records(videos: List[VideoRecord]) -> str:
+    return json.dumps([[getattr(video, name) for name in RECORD_FIELDS] for video in videos], ensure_ascii=False)
+
+
+def _load_records(raw: str) -> List[VideoRecord]:
+    videos = []
+    for row in json.loads(raw):
+        video = VideoRecord(*row)
+        video.tags = tuple(sys.intern(tag) for tag in video.tags)
+        videos.append(video)
+    return videos
+
+
+class KeywordSearchCache:
+    """In-process TTL LRU of keyword searches with optional Redis second level"""
+
+    def __init__(self, maxsize: int, redis_url: Optional[str] = None):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[CacheKey, tuple]" = OrderedDict()
+        self._inflight: Dict[CacheKey, asyncio.Task] = {}
+        self._popularity: "Counter[CacheKey]" = Counter()
+        self._warmer: Optional[asyncio.Task] = None
+        self._redis = None
+        if redis_url:
+            import redis.asyncio as redis
+            self._redis = redis.from_url(redis_url, decode_responses=True)
+
+    def _redis_key(self, key: CacheKey) -> str:
+        query, order, hours = key
+        return f"yt_search:{order}:{hours or 0}:{query}"
+
+    async def search(
+        self,
+        keyword: str,
+        published_after_hours: Optional[int] = None,
+        max_results: int = SEARCH_PAGE_SIZE,
+        order: str = "relevance",
+        min_views: Optional[int] = None
+    ) -> List[VideoRecord]:
+        """Keyword search served from cache when possible"""
+        key = (normalize_query(keyword), order, bucket_hours(published_after_hours, order))
+        if self._warmer is not None:
+            self._popularity[key] += 1
+
+        videos = await self._get(key)
+        if videos is not None:
+            metrics.record_search_cache("hit")
+        else:
+            metrics.record_search_cache("coalesced" if key in self._inflight else "miss")
+            # Shielded so one caller disconnecting doesn't cancel the search for the others
+            videos = await asyncio.shield(self._fetch(key))
+        return self._select(videos, published_after_hours, max_results, min_views)
+
+    async def warm(self, extra_terms: Iterable[str] = (), limit: Optional[int] = None) -> int:
+        """
+        Refresh the most requested searches and the given terms ahead of expiry
+
+        Only keys that are missing or about to expire are fetched, at most
+        `limit` of them (each costs ~101 quota units). Returns the number fetched.
+        """
+        limit = settings.SEARCH_CACHE_WARM_TERMS if limit is None else limit
+        candidates = [key for key, _ in self._popularity.most_common(limit)]
+        candidates += [(normalize_query(term), "relevance", None) for term in extra_terms]
+
+        fetched = 0
+        for key in dict.fromkeys(candidates):
+            if fetched >= limit:
+                break
+            if not key[0] or not self._needs_refresh(key) or key in self._inflight:
+                continue
+            await self._fetch(key)
+            fetched += 1
+
+        # Popularity is per warm interval so stale favourites age out
+        self._popularity.clear()
+        return fetched
+
+    def start_warmer(self) -> None:
+        """Start the periodic warmer (no-op when SEARCH_CACHE_WARM_INTERVAL_MINUTES is 0)"""
+        if settings.SEARCH_CACHE_WARM_INTERVAL_MINUTES > 0 and self._warmer is None:
+            self._warmer = asyncio.get_running_loop().create_task(self._run_warmer())
+
+    def stop_warmer(self) -> None:
+        if self._warmer is not None:
+            self._warmer.cancel()
+            self._warmer = None
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._popularity.clear()
+
+    async def _run_warmer(self) -> None:
+        interval = settings.SEARCH_CACHE_WARM_INTERVAL_MINUTES * 60
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                trending = await youtube_trending.get_trending_videos(region_code=settings.SEARCH_CACHE_WARM_REGION)
+                patterns = await youtube_trending.analyze_trending_patterns(trending) if trending else {}
+                tags = [item["tag"] for item in patterns.get("top_tags", [])]
+                fetched = await self.warm(extra_terms=tags)
+                logger.info(f"Search cache warmed {fetched} queries")
+            except Exception as e:
+                logger.warning(f"Search cache warming failed: {str(e)}")
+
+    @staticmethod
+    def _select(
+        videos: List[VideoRecord],
+        published_after_hours: Optional[int],
+        max_results: int,
+        min_views: Optional[int]
+    ) -> List[VideoRecord]:
+        """Apply the exact filters to a cached page (date order: fetched for the wider bucket), then slice"""
+        if published_after_hours:
+            since = time.time() - published_after_hours * 3600
+            videos = [video for video in videos if video.published_ts is not None and video.published_ts >= since]
+        if min_views:
+            videos = [video for video in videos if video.views >= min_views]
+        return videos[:max_results]
+
+    def _needs_refresh(self, key: CacheKey) -> bool:
+        entry = self._entries.get(key)
+        return entry is None or entry[1] - time.monotonic() < REFRESH_AHEAD_SECONDS
+
+    def _fetch(self, key: CacheKey) -> "asyncio.Task[List[VideoRecord]]":
+        """Upstream search for a key, shared by all concurrent callers"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self._search_upstream(key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._inflight.pop(key, None))
+        return task
+
+    async def _search_upstream(self, key: CacheKey) -> List[VideoRecord]:
+        query, order, hours = key
+        published_after = datetime.now(timezone.utc) - timedelta(hours=hours) if hours else None
+        videos = await youtube_trending.search_videos_by_keyword(
+            keyword=query,
+            published_after=published_after,
+            max_results=SEARCH_PAGE_SIZE,
+            order=order
+        )
+        # Empty results are usually upstream errors (quota, network); don't pin them
+        if videos:
+            await self._set(key, videos)
+        return videos
+
+    async def _get(self, key: CacheKey) -> Optional[List[VideoRecord]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            videos, expires_at = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                return videos
+            del self._entries[key]
+
+        if self._redis is not None:
+            try:
+                redis_key = self._redis_key(key)
+                raw, ttl = await asyncio.gather(self._redis.get(redis_key), self._redis.ttl(redis_key))
+                if raw and ttl > 0:
+                    videos = _load_records(raw)
+                    self._store_local(key, videos, ttl)
+                    return videos
+            except Exception as e:
+                logger.warning(f"Search cache Redis lookup failed: {str(e)}")
+
+        return None
+
+    async def _set(self, key: CacheKey, videos: List[VideoRecord]) -> None:
+        ttl = SEARCH_CACHE_TTLS.get(key[1], DEFAULT_TTL)
+        self._store_local(key, videos, ttl)
+        if self._redis is not None:
+            try:
+                await self._redis.set(self._redis_key(key), _dump_records(videos), ex=ttl)
+            except Exception as e:
+                logger.warning(f"Search cache Redis store failed: {str(e)}")
+
+    def _store_local(self, key: CacheKey, videos: List[VideoRecord], ttl: float) -> None:
+        self._entries[key] = (videos, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+# Singleton instance
+keyword_search_cache = KeywordSearchCache(
+    maxsize=settings.SEARCH_CACHE_MAX_ENTRIES,
+    redis_url=settings.REDIS_URL if settings.SEARCH_CACHE_BACKEND == "redis" else None
+)
@@ -0,0 +1,227 @@
+"""
+Live trending feed (Server-Sent Events)
+
+Instead of every open trending page polling /trending/videos, clients
+subscribe to GET /trending/live. Each (region, category) with at least one
+subscriber has a single poller refreshing the chart every
+TRENDING_FEED_INTERVAL_SECONDS. Each refresh is compared with the previous
+chart and the changes are broadcast to every subscriber:
+
+- `snapshot`: the full ranked chart, sent on connect (and to resync clients
+  that fell behind)
+- `diff`: added videos, removed videos, rank moves and view/like/comment deltas
+
+Events are encoded once per channel and the same bytes are queued for every
+client, so upstream calls and encoding work scale with channels, not viewers.
+Pollers stop when their last subscriber disconnects.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+import asyncio
+
+import orjson
+from loguru import logger
+
+from app.core.config import get_settings
+from app.core.monitoring import metrics
+from app.services.social_media.video_record import VideoRecord
+from app.services.social_media.youtube_trending import youtube_trending
+
+settings = get_settings()
+
+# Events buffered per client before it is considered slow and resynced
+CLIENT_QUEUE_SIZE = 16
+
+# Sent (then the stream ends) when the last poller slot was taken after the endpoint's check
+CAPACITY_ERROR_EVENT = b'event: error\ndata: {"detail":"Live feed capacity reached"}\n\n'
+
+ChannelKey = Tuple[str, Optional[str]]
+
+
+def diff_charts(previous: List[VideoRecord], current: List[VideoRecord]) -> Dict[str, list]:
+    """Changes between two ranked charts (empty lists when nothing changed)"""
+    previous_by_id = {video.video_id: (rank, video) for rank, video in enumerate(previous, start=1)}
+    current_ids = set()
+    added, moved, stats = [], [], []
+
+    for rank, video in enumerate(current, start=1):
+        current_ids.add(video.video_id)
+        entry = previous_by_id.get(video.video_id)
+        if entry is None:
+            added.append({"rank": rank, **video.to_dict()})
+            continue
+
+        previous_rank, previous_video = entry
+        if rank != previous_rank:
+            moved.append({"video_id": video.video_id, "rank": rank, "previous_rank": previous_rank})
+        if (video.views, video.likes, video.comments) != (previous_video.views, previous_video.likes, previous_video.comments):
+            stats.append({
+                "video_id": video.video_id,
+                "views": video.views,
+                "view_delta": video.views - previous_video.views,
+                "likes": video.likes,
+                "comments": video.comments,
+            })
+
+    removed = [
+        {"video_id": video_id, "previous_rank": rank}
+        for video_id, (rank, _) in previous_by_id.items()
+        if video_id not in current_ids
+    ]
+    return {"added": added, "removed": removed, "moved": moved, "stats": stats}
+
+
+@dataclass
+class _Channel:
+    region: str
+    category: Optional[str]
+    subscribers: Set[asyncio.Queue] = field(default_factory=set)
+    videos: Optional[List[VideoRecord]] = None
+    captured_at: Optional[str] = None
+    sequence: int = 0
+    poller: Optional[asyncio.Task] = None
+    _snapshot: Optional[bytes] = None
+
+    def encode(self, event: str, data: dict) -> bytes:
+        self.sequence += 1
+        payload = orjson.dumps({"region": self.region, "category": self.category, "captured_at": self.captured_at, **data})
+        return b"id: %d\nevent: %s\ndata: %s\n\n" % (self.sequence, event.encode(), payload)
+
+    def snapshot(self) -> Optional[bytes]:
+        """Full chart event for new or resynced clients (encoded once per chart)"""
+        if self.videos is None:
+            return None
+        if self._snapshot is None:
+            videos = [{"rank": rank, **video.to_dict()} for rank, video in enumerate(self.videos, start=1)]
+            self._snapshot = self.encode("snapshot", {"videos": videos})
+        return self._snapshot
+
+
+class TrendingFeed:
+    """One chart poller per (region, category), fanned out to SSE subscribers"""
+
+    def __init__(self):
+        self._channels: Dict[ChannelKey, _Channel] = {}
+        self._subscriber_count = 0
+
+    def has_capacity(self, region: str, category: Optional[str]) -> bool:
+        """
+        Whether a subscription would be accepted (existing channel or a free poller slot)
+
+        A pre-check for answering 503; the slot is only reserved when the
+        stream starts, so stream() checks again.
+        """
+        return (region, category) in self._channels or len(self._channels) < settings.TRENDING_FEED_MAX_CHANNELS
+
+    async def stream(self, region: str, category: Optional[str] = None) -> AsyncIterator[bytes]:
+        """SSE byte stream for one client; unsubscribes when the client goes away"""
+        subscription = self._subscribe(region, category)
+        if subscription is None:
+            metrics.record_trending_feed_event("rejected")
+            yield CAPACITY_ERROR_EVENT
+            return
+
+        channel, queue = subscription
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.TRENDING_FEED_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if event is None:
+                    return
+                yield event
+        finally:
+            self._unsubscribe(channel, queue)
+
+    async def shutdown(self) -> None:
+        """Stop all pollers and end every open stream"""
+        for channel in list(self._channels.values()):
+            if channel.poller is not None:
+                channel.poller.cancel()
+            for queue in channel.subscribers:
+                self._replace(queue, None)
+        self._channels.clear()
+
+    def _subscribe(self, region: str, category: Optional[str]) -> Optional[Tuple[_Channel, asyncio.Queue]]:
+        """Join (or create) a channel; None when a new channel would exceed TRENDING_FEED_MAX_CHANNELS"""
+        key = (region, category)
+        channel = self._channels.get(key)
+        if channel is None:
+            if len(self._channels) >= settings.TRENDING_FEED_MAX_CHANNELS:
+                return None
+            channel = self._channels[key] = _Channel(region=region, category=category)
+            channel.poller = asyncio.get_running_loop().create_task(self._poll(channel))
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        snapshot = channel.snapshot()
+        if snapshot is not None:
+            queue.put_nowait(snapshot)
+        channel.subscribers.add(queue)
+
+        self._subscriber_count += 1
+        metrics.update_trending_feed_subscribers(self._subscriber_count)
+        return channel, queue
+
+    def _unsubscribe(self, channel: _Channel, queue: asyncio.Queue) -> None:
+        channel.subscribers.discard(queue)
+        self._subscriber_count -= 1
+        metrics.update_trending_feed_subscribers(self._subscriber_count)
+
+        if not channel.subscribers and self._channels.get((channel.region, channel.category)) is channel:
+            del self._channels[(channel.region, channel.category)]
+            if channel.poller is not None:
+                channel.poller.cancel()
+
+    async def _poll(self, channel: _Channel) -> None:
+        while True:
+            try:
+                videos = await youtube_trending.get_trending_videos(
+                    region_code=channel.region,
+                    category_id=channel.category,
+                    max_results=50
+                )
+                # An empty chart means the upstream call failed; keep the last one
+                if videos:
+                    self._publish(channel, videos)
+            except Exception as e:
+                logger.warning(f"Live trending feed refresh failed for {channel.region}/{channel.category}: {str(e)}")
+            await asyncio.sleep(settings.TRENDING_FEED_INTERVAL_SECONDS)
+
+    def _publish(self, channel: _Channel, videos: List[VideoRecord]) -> None:
+        previous = channel.videos
+        diff = diff_charts(previous, videos) if previous is not None else None
+        if diff is not None and not any(diff.values()):
+            return
+
+        channel.videos = videos
+        channel.captured_at = datetime.now(timezone.utc).isoformat()
+        channel._snapshot = None
+
+        if diff is None:
+            event, name = channel.snapshot(), "snapshot"
+        else:
+            event, name = channel.encode("diff", diff), "diff"
+        metrics.record_trending_feed_event(name)
+
+        for queue in channel.subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Too far behind for diffs to apply; replace its backlog with the current chart
+                self._replace(queue, channel.snapshot())
+                metrics.record_trending_feed_event("resync")
+
+    @staticmethod
+    def _replace(queue: asyncio.Queue, event: Optional[bytes]) -> None:
+        """Drop a client's backlog and queue `event` (None ends the stream)"""
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(event)
+
+
+# Singleton instance
+trending_feed = TrendingFeed()
@@ -0,0 +1,158 @@
+"""
+Trending snapshot history and view velocity
+
+Snapshots of each region's mostPopular chart are appended to
+`trending_snapshots` (see app.services.social_media.trending_snapshotter).
+Consecutive observations of a video give its real view velocity
+(views/hour between captures) and acceleration (change in velocity per hour),
+instead of the lifetime average views / hours_since_published.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+import time
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.core.database import AsyncSessionLocal, is_sqlite
+from app.models.trending_snapshot import TrendingSnapshot
+from app.services.social_media.video_record import VideoRecord
+
+
+@dataclass(frozen=True)
+class VideoVelocity:
+    """View velocity of one video over a window of snapshots"""
+    video_id: str
+    observations: int
+    views_per_hour: float  # Between the last two captures
+    avg_views_per_hour: float  # Between the first and last capture in the window
+    acceleration: Optional[float]  # views/hour per hour over the last three captures
+    latest_rank: int
+    best_rank: int
+    first_seen_ts: int
+    last_seen_ts: int
+
+
+def _velocity(video_id: str, rows: List[tuple]) -> Optional[VideoVelocity]:
+    """rows: (captured_ts, views, best_rank, view_delta, seconds) ordered by captured_ts"""
+    # Per-segment rate at the segment midpoint; skip non-increasing time and view count resets
+    segments = [
+        ((captured_ts - seconds / 2), view_delta / seconds * 3600)
+        for captured_ts, _, _, view_delta, seconds in rows
+        if seconds and seconds > 0 and view_delta is not None and view_delta >= 0
+    ]
+    if not segments:
+        return None
+
+    first, last = rows[0], rows[-1]
+    elapsed = last[0] - first[0]
+
+    acceleration = None
+    if len(segments) >= 2:
+        (previous_mid, previous_rate), (last_mid, last_rate) = segments[-2], segments[-1]
+        if last_mid > previous_mid:
+            acceleration = (last_rate - previous_rate) / ((last_mid - previous_mid) / 3600)
+
+    return VideoVelocity(
+        video_id=video_id,
+        observations=len(rows),
+        views_per_hour=segments[-1][1],
+        avg_views_per_hour=(last[1] - first[1]) / elapsed * 3600 if elapsed > 0 else segments[-1][1],
+        acceleration=acceleration,
+        latest_rank=last[2],
+        best_rank=min(row[2] for row in rows),
+        first_seen_ts=first[0],
+        last_seen_ts=last[0]
+    )
+
+
+class TrendingHistory:
+    """Append-only snapshot store and velocity queries"""
+
+    async def record(self, region: str, videos: List[VideoRecord], captured_ts: int) -> int:
+        """Append one chart capture (rank = list position); captures already recorded are skipped"""
+        rows = [
+            {
+                "video_id": video.video_id,
+                "region": region,
+                "rank": rank,
+                "views": video.views,
+                "likes": video.likes,
+                "comments": video.comments,
+                "captured_ts": captured_ts,
+            }
+            for rank, video in enumerate(videos, start=1)
+        ]
+        if not rows:
+            return 0
+
+        dialect_insert = sqlite.insert if is_sqlite else postgresql.insert
+        statement = dialect_insert(TrendingSnapshot).values(rows).on_conflict_do_nothing()
+        async with AsyncSessionLocal() as db:
+            await db.execute(statement)
+            await db.commit()
+        return len(rows)
+
+    async def prune(self, retention_days: int) -> int:
+        """Delete snapshots older than the retention window"""
+        cutoff = int(time.time()) - retention_days * 86400
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(delete(TrendingSnapshot).where(TrendingSnapshot.captured_ts < cutoff))
+            await db.commit()
+        return result.rowcount
+
+    async def velocities(self, video_ids: Iterable[str], window_hours: int = 24) -> Dict[str, VideoVelocity]:
+        """
+        Velocity per video from its snapshots in the last `window_hours`
+
+        Views are global, so captures of one video in several regions at the
+        same time are merged first; LAG() over each video's captures then gives
+        the view and time deltas between consecutive observations. Videos with
+        fewer than two usable captures are omitted.
+        """
+        video_ids = list(dict.fromkeys(video_ids))
+        if not video_ids:
+            return {}
+
+        since = int(time.time()) - window_hours * 3600
+        observations = (
+            select(
+                TrendingSnapshot.video_id,
+                TrendingSnapshot.captured_ts,
+                func.max(TrendingSnapshot.views).label("views"),
+                func.min(TrendingSnapshot.rank).label("rank")
+            )
+            .where(TrendingSnapshot.video_id.in_(video_ids), TrendingSnapshot.captured_ts >= since)
+            .group_by(TrendingSnapshot.video_id, TrendingSnapshot.captured_ts)
+            .subquery()
+        )
+        previous = dict(partition_by=observations.c.video_id, order_by=observations.c.captured_ts)
+        statement = select(
+            observations.c.video_id,
+            observations.c.captured_ts,
+            observations.c.views,
+            observations.c.rank,
+            (observations.c.views - func.lag(observations.c.views).over(**previous)).label("view_delta"),
+            (observations.c.captured_ts - func.lag(observations.c.captured_ts).over(**previous)).label("seconds")
+        ).order_by(observations.c.video_id, observations.c.captured_ts)
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(statement)
+            rows_by_video: Dict[str, List[tuple]] = {}
+            for video_id, captured_ts, views, rank, view_delta, seconds in result:
+                rows_by_video.setdefault(video_id, []).append((captured_ts, views, rank, view_delta, seconds))
+
+        velocities = {}
+        for video_id, rows in rows_by_video.items():
+            velocity = _velocity(video_id, rows)
+            if velocity is not None:
+                velocities[video_id] = velocity
+        return velocities
+
+    async def velocity(self, video_id: str, window_hours: int = 24) -> Optional[VideoVelocity]:
+        return (await self.velocities([video_id], window_hours)).get(video_id)
+
+
+# Singleton instance
+trending_history = TrendingHistory()
@@ -0,0 +1,401 @@
+"""
+Incremental trending pattern aggregation
+
+Top categories, top tags and the duration distribution of each region's chart
+are maintained as charts are observed, instead of being recomputed from a
+freshly fetched chart on every request:
+
+- Observations land in 15-minute buckets per region, kept for 7 days. A
+  video counts once per bucket however often the chart is fetched, so counts
+  are "video-slots on the chart".
+- Categories, duration buckets and totals are small exact counters.
+- Tags go into a Count-Min Sketch per bucket (uint16, 4 x 1024, 8 KiB).
+  Each bucket also keeps its heaviest tags as candidates. A window query sums
+  the bucket sketches and ranks the union of their candidates by the
+  merged estimate. NumPy is imported on first use, not at app import.
+
+Every full (50-video) unfiltered chart fetch, including snapshot captures,
+is observed by the process that made it; other workers pick up snapshots
+with an incremental sync of `trending_snapshots` left-joined with
+`indexed_videos` (at most once a minute, when patterns are requested).
+Snapshots only carry
+counts, so the synced category, tags and duration come from the video index:
+videos not indexed yet (or with VIDEO_INDEX_ENABLED=false) are counted under
+"unknown" category and duration, with no tags.
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set, Tuple
+import asyncio
+import hashlib
+import time
+
+from loguru import logger
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal
+from app.models.trending_snapshot import TrendingSnapshot
+from app.models.video_index import IndexedVideo
+from app.services.social_media.video_record import VideoRecord
+
+if TYPE_CHECKING:
+    import numpy as np
+
+BUCKET_SECONDS = 900
+RETENTION_SECONDS = 7 * 24 * 3600
+
+# Window name -> seconds
+PATTERN_WINDOWS = {
+    "1h": 3600,
+    "24h": 24 * 3600,
+    "7d": 7 * 24 * 3600,
+}
+
+SKETCH_DEPTH = 4
+SKETCH_WIDTH = 1024
+SKETCH_ROWS = tuple(range(SKETCH_DEPTH))
+
+# Heavy-hitter tags remembered per bucket
+CANDIDATES_PER_BUCKET = 50
+TAGS_PER_VIDEO = 10
+TOP_CATEGORIES = 5
+TOP_TAGS = 20
+
+SYNC_INTERVAL_SECONDS = 60
+
+
+@lru_cache(maxsize=65536)
+def _sketch_columns(key: str) -> Tuple[int, ...]:
+    """Column of `key` in each sketch row (double hashing of one blake2b digest)"""
+    digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], "little")
+    h2 = int.from_bytes(digest[8:], "little") | 1
+    return tuple((h1 + row * h2) % SKETCH_WIDTH for row in range(SKETCH_DEPTH))
+
+
+def new_sketch(dtype: str) -> "np.ndarray":
+    """Empty SKETCH_DEPTH x SKETCH_WIDTH counter table"""
+    import numpy as np  # deferred: NumPy is only needed once charts are observed
+    return np.zeros((SKETCH_DEPTH, SKETCH_WIDTH), dtype=dtype)
+
+
+def _columns(keys: List[str]) -> "np.ndarray":
+    import numpy as np
+    return np.array([_sketch_columns(key) for key in keys], dtype=np.intp).reshape(-1, SKETCH_DEPTH)
+
+
+def sketch_add(table: "np.ndarray", keys: List[str]) -> None:
+    """Count each key once (repeat a key to count it more)"""
+    if keys:
+        import numpy as np
+        np.add.at(table, (SKETCH_ROWS, _columns(keys)), 1)
+
+
+def sketch_estimate(table: "np.ndarray", keys: List[str]) -> "np.ndarray":
+    """Count-Min estimates (never below the true count)"""
+    if not keys:
+        return table[0, :0]
+    return table[SKETCH_ROWS, _columns(keys)].min(axis=1)
+
+
+def duration_bucket(duration_seconds: Optional[int]) -> str:
+    if duration_seconds is None:
+        return "unknown"
+    if duration_seconds < 180:  # < 3 minutes
+        return "short"
+    elif duration_seconds < 600:  # < 10 minutes
+        return "medium"
+    return "long"
+
+
+def _count(target: Counter, keys: Iterable[str], sign: int = 1) -> None:
+    """Add (or subtract) one per key, dropping keys that reach zero"""
+    for key in keys:
+        count = target[key] + sign
+        if count > 0:
+            target[key] = count
+        else:
+            del target[key]
+
+
+def _subtract(target: Counter, counts: Counter) -> None:
+    for key, count in counts.items():
+        remaining = target[key] - count
+        if remaining > 0:
+            target[key] = remaining
+        else:
+            del target[key]
+
+
+@dataclass(slots=True)
+class _Delta:
+    """What one observation added to a bucket"""
+    video_ids: List[str]
+    categories: List[str]
+    durations: List[str]
+    tags: List[str]
+    views: int
+    likes: int
+    comments: int
+    dropped_candidates: List[str]
+    added_candidates: List[str]
+
+
+@dataclass(slots=True)
+class _Bucket:
+    """One region's chart observations within BUCKET_SECONDS"""
+    start_ts: int
+    video_ids: Set[str] = field(default_factory=set)
+    sketch: "np.ndarray" = field(default_factory=lambda: new_sketch("uint16"))
+    candidates: Tuple[str, ...] = ()
+    categories: Counter = field(default_factory=Counter)
+    durations: Counter = field(default_factory=Counter)
+    views: int = 0
+    likes: int = 0
+    comments: int = 0
+
+    def add(self, videos: Iterable[VideoRecord]) -> Optional[_Delta]:
+        """Add videos not yet seen in this bucket"""
+        new_videos = list({video.video_id: video for video in videos if video.video_id not in self.video_ids}.values())
+        if not new_videos:
+            return None
+
+        delta = _Delta(
+            video_ids=[video.video_id for video in new_videos],
+            categories=[video.category_id or "unknown" for video in new_videos],
+            durations=[duration_bucket(video.duration_seconds) for video in new_videos],
+            tags=[tag.lower() for video in new_videos for tag in video.tags[:TAGS_PER_VIDEO]],
+            views=sum(video.views for video in new_videos),
+            likes=sum(video.likes for video in new_videos),
+            comments=sum(video.comments for video in new_videos),
+            dropped_candidates=[],
+            added_candidates=[]
+        )
+        self.video_ids.update(delta.video_ids)
+        self.categories.update(delta.categories)
+        self.durations.update(delta.durations)
+        self.views += delta.views
+        self.likes += delta.likes
+        self.comments += delta.comments
+
+        if delta.tags:
+            sketch_add(self.sketch, delta.tags)
+            pool = list(dict.fromkeys((*self.candidates, *delta.tags)))
+            if len(pool) > CANDIDATES_PER_BUCKET:
+                estimates = sketch_estimate(self.sketch, pool)
+                keep = (-estimates).argsort(kind="stable")[:CANDIDATES_PER_BUCKET]
+                pool = [pool[i] for i in keep]
+            kept = set(pool)
+            delta.dropped_candidates = [tag for tag in self.candidates if tag not in kept]
+            delta.added_candidates = [tag for tag in pool if tag not in self.candidates]
+            self.candidates = tuple(pool)
+        return delta
+
+
+class _Window:
+    """Running totals of the buckets inside one sliding window"""
+
+    def __init__(self, seconds: int):
+        self.seconds = seconds
+        self.since = 0  # Start of the oldest bucket included
+        self.sketch = new_sketch("int64")
+        self.categories: Counter = Counter()
+        self.durations: Counter = Counter()
+        self.videos: Counter = Counter()  # video_id -> buckets it appears in
+        self.candidates: Counter = Counter()  # tag -> buckets listing it as a candidate
+        self.views = self.likes = self.comments = 0
+
+    def add(self, delta: _Delta) -> None:
+        _count(self.categories, delta.categories)
+        _count(self.durations, delta.durations)
+        _count(self.videos, delta.video_ids)
+        _count(self.candidates, delta.dropped_candidates, -1)
+        _count(self.candidates, delta.added_candidates)
+        sketch_add(self.sketch, delta.tags)
+        self.views += delta.views
+        self.likes += delta.likes
+        self.comments += delta.comments
+
+    def remove(self, bucket: _Bucket) -> None:
+        _subtract(self.categories, bucket.categories)
+        _subtract(self.durations, bucket.durations)
+        _count(self.videos, bucket.video_ids, -1)
+        _count(self.candidates, bucket.candidates, -1)
+        self.sketch -= bucket.sketch
+        self.views -= bucket.views
+        self.likes -= bucket.likes
+        self.comments -= bucket.comments
+
+    def summary(self) -> Dict[str, Any]:
+        observations = sum(self.durations.values())
+        tags = list(self.candidates)
+        estimates = sketch_estimate(self.sketch, tags).tolist()
+        top_tags = sorted(zip(tags, estimates), key=lambda item: item[1], reverse=True)[:TOP_TAGS]
+        return {
+            "total_videos_analyzed": len(self.videos),
+            "observations": observations,
+            "top_categories": [{"id": cat, "count": count} for cat, count in self.categories.most_common(TOP_CATEGORIES)],
+            "top_tags": [{"tag": tag, "count": count} for tag, count in top_tags],
+            "duration_distribution": self._duration_distribution(),
+            "average_metrics": {
+                "views": round(self.views / observations) if observations else 0,
+                "likes": round(self.likes / observations) if observations else 0,
+                "comments": round(self.comments / observations) if observations else 0,
+                "engagement_rate": round((self.likes + self.comments) / self.views * 100, 2) if self.views > 0 else 0
+            }
+        }
+
+
+    def _duration_distribution(self) -> Dict[str, int]:
+        distribution = {name: self.durations[name] for name in ("short", "medium", "long")}
+        if self.durations["unknown"]:
+            distribution["unknown"] = self.durations["unknown"]
+        return distribution
+
+
+class RegionPatterns:
+    """Bucketed aggregate of one region's chart with running window totals"""
+
+    def __init__(self):
+        self._buckets: Dict[int, _Bucket] = {}
+        self._windows = {name: _Window(seconds) for name, seconds in PATTERN_WINDOWS.items()}
+        self._summaries: Dict[str, Dict[str, Any]] = {}
+
+    def observe(self, videos: List[VideoRecord], observed_ts: float) -> None:
+        self._advance(time.time())
+        start_ts = int(observed_ts) // BUCKET_SECONDS * BUCKET_SECONDS
+        if start_ts < self._windows["7d"].since:
+            return
+        bucket = self._buckets.get(start_ts)
+        if bucket is None:
+            bucket = self._buckets[start_ts] = _Bucket(start_ts)
+
+        delta = bucket.add(videos)
+        if delta is None:
+            return
+        for name, window in self._windows.items():
+            if start_ts >= window.since:
+                window.add(delta)
+                self._summaries.pop(name, None)
+
+    def summary(self, window: str) -> Dict[str, Any]:
+        """Patterns over the buckets overlapping the window (cached until it changes)"""
+        self._advance(time.time())
+        summary = self._summaries.get(window)
+        if summary is None:
+            summary = self._summaries[window] = self._windows[window].summary()
+        return summary
+
+    def _advance(self, now: float) -> None:
+        """Slide the windows forward, subtracting buckets that left them"""
+        current = int(now) // BUCKET_SECONDS * BUCKET_SECONDS
+        advanced = False
+        for name, window in self._windows.items():
+            since = current - window.seconds + BUCKET_SECONDS
+            if since <= window.since:
+                continue
+            for start_ts, bucket in self._buckets.items():
+                if window.since <= start_ts < since:
+                    window.remove(bucket)
+            window.since = since
+            self._summaries.pop(name, None)
+            advanced = True
+
+        if advanced:
+            oldest = self._windows["7d"].since
+            for start_ts in [start_ts for start_ts in self._buckets if start_ts < oldest]:
+                del self._buckets[start_ts]
+
+
+class TrendingPatternStore:
+    """Per-region pattern aggregates, fed by chart fetches and snapshots"""
+
+    def __init__(self):
+        self._regions: Dict[str, RegionPatterns] = {}
+        self._synced_ts: Optional[int] = None
+        self._last_sync = 0.0
+        self._sync_lock = asyncio.Lock()
+
+    def observe(self, region: str, videos: List[VideoRecord], observed_ts: Optional[float] = None) -> None:
+        """Add one observation of a region's (unfiltered) chart"""
+        if not videos:
+            return
+        patterns = self._regions.get(region)
+        if patterns is None:
+            patterns = self._regions[region] = RegionPatterns()
+        patterns.observe(videos, time.time() if observed_ts is None else observed_ts)
+
+    async def patterns(self, region: str, window: str = "24h") -> Dict[str, Any]:
+        """Aggregated patterns for a region over a window (1h, 24h or 7d)"""
+        try:
+            await self.sync()
+        except Exception as e:
+            logger.warning(f"Trending pattern sync failed: {str(e)}")
+
+        patterns = self._regions.get(region)
+        if patterns is None:
+            patterns = self._regions[region] = RegionPatterns()
+        return patterns.summary(window)
+
+    async def sync(self, force: bool = False) -> int:
+        """
+        Observe snapshots recorded since the last sync (by any process); returns rows read
+
+        Category, tags and duration depend on the video index: snapshot rows
+        whose video has no `indexed_videos` row are counted as "unknown".
+        """
+        if not force and time.monotonic() - self._last_sync < SYNC_INTERVAL_SECONDS:
+            return 0
+        async with self._sync_lock:
+            if not force and time.monotonic() - self._last_sync < SYNC_INTERVAL_SECONDS:
+                return 0
+            self._last_sync = time.monotonic()
+
+            # Re-read the last synced slot: other regions may have landed in it since (re-observing is a no-op)
+            since = self._synced_ts if self._synced_ts is not None else int(time.time()) - RETENTION_SECONDS
+            statement = (
+                select(
+                    TrendingSnapshot.region,
+                    TrendingSnapshot.captured_ts,
+                    TrendingSnapshot.video_id,
+                    TrendingSnapshot.views,
+                    TrendingSnapshot.likes,
+                    TrendingSnapshot.comments,
+                    IndexedVideo.category_id,
+                    IndexedVideo.tags,
+                    IndexedVideo.duration_seconds
+                )
+                .outerjoin(IndexedVideo, IndexedVideo.video_id == TrendingSnapshot.video_id)
+                .where(TrendingSnapshot.captured_ts >= since)
+                .order_by(TrendingSnapshot.captured_ts)
+            )
+            async with AsyncSessionLocal() as db:
+                rows = (await db.execute(statement)).all()
+
+            captures: Dict[Tuple[str, int], List[VideoRecord]] = {}
+            for region, captured_ts, video_id, views, likes, comments, category_id, tags, duration_seconds in rows:
+                captures.setdefault((region, captured_ts), []).append(VideoRecord(
+                    video_id=video_id,
+                    title="",
+                    description="",
+                    channel_id="",
+                    channel_title="",
+                    published_ts=None,
+                    thumbnail_url=None,
+                    duration_seconds=duration_seconds,  # None when not indexed
+                    views=views,
+                    likes=likes,
+                    comments=comments,
+                    tags=tuple(tags or ()),
+                    category_id=category_id or ""
+                ))
+            for (region, captured_ts), videos in captures.items():
+                self.observe(region, videos, captured_ts)
+                self._synced_ts = max(self._synced_ts or 0, captured_ts)
+            return len(rows)
+
+
+# Singleton instance
+trending_patterns = TrendingPatternStore()
@@ -0,0 +1,86 @@
+"""
+Scheduled trending chart snapshots
+
+Every TRENDING_SNAPSHOT_INTERVAL_MINUTES the mostPopular chart of each region
+in TRENDING_SNAPSHOT_REGIONS is fetched (1 quota unit per region) and appended
+to the snapshot history. Capture times are floored to the interval, so two
+processes snapshotting the same slot write each row once.
+
+Run it in one API process (TRENDING_SNAPSHOT_INTERVAL_MINUTES > 0) or from
+cron with `python -m app.snapshot`.
+"""
+
+from typing import Dict, Optional
+import asyncio
+import time
+
+from loguru import logger
+
+from app.core.config import get_settings
+from app.services.social_media.trending_history import trending_history
+from app.services.social_media.youtube_trending import youtube_trending
+
+settings = get_settings()
+
+# Used to floor capture times when the scheduler is off (cron runs)
+DEFAULT_SLOT_SECONDS = 900
+
+
+class TrendingSnapshotter:
+    """Captures region charts into trending_snapshots on a fixed schedule"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def slot_seconds(self) -> int:
+        return settings.TRENDING_SNAPSHOT_INTERVAL_MINUTES * 60 or DEFAULT_SLOT_SECONDS
+
+    async def capture(self, region: str, captured_ts: Optional[int] = None) -> int:
+        """Snapshot one region's chart; returns the number of videos captured"""
+        if captured_ts is None:
+            captured_ts = int(time.time()) // self.slot_seconds * self.slot_seconds
+        videos = await youtube_trending.get_trending_videos(region_code=region, max_results=50)
+        if not videos:
+            logger.warning(f"Trending snapshot for {region} returned no videos")
+            return 0
+        return await trending_history.record(region, videos, captured_ts)
+
+    async def capture_all(self) -> Dict[str, int]:
+        """Snapshot every configured region in the same slot and prune expired rows"""
+        captured_ts = int(time.time()) // self.slot_seconds * self.slot_seconds
+        results = {}
+        for region in settings.TRENDING_SNAPSHOT_REGIONS:
+            try:
+                results[region] = await self.capture(region, captured_ts)
+            except Exception as e:
+                logger.error(f"Trending snapshot for {region} failed: {str(e)}")
+                results[region] = 0
+
+        try:
+            await trending_history.prune(settings.TRENDING_SNAPSHOT_RETENTION_DAYS)
+        except Exception as e:
+            logger.warning(f"Trending snapshot pruning failed: {str(e)}")
+        return results
+
+    def start(self) -> None:
+        """Start the snapshot loop (no-op when TRENDING_SNAPSHOT_INTERVAL_MINUTES is 0)"""
+        if settings.TRENDING_SNAPSHOT_INTERVAL_MINUTES > 0 and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            results = await self.capture_all()
+            logger.info(f"Trending snapshot captured: {results}")
+            # Sleep to the start of the next slot so captures stay aligned across restarts
+            slot = self.slot_seconds
+            await asyncio.sleep(slot - time.time() % slot)
+
+
+# Singleton instance
+trending_snapshotter = TrendingSnapshotter()
@@ -0,0 +1,296 @@
+"""
+Local full-text video search
+
+Every video we fetch from YouTube (trending charts, keyword searches, detail
+lookups) and every collected creative is upserted into `indexed_videos`, so
+keyword searches over videos we already know can be answered from the
+database with no quota: FTS5 with BM25 ranking on SQLite, a weighted tsvector
+with ts_rank_cd on PostgreSQL (which has no built-in BM25).
+
+Japanese/Chinese/Korean text has no spaces between words, so CJK runs are
+indexed as overlapping bigrams ("料理動画" -> "料理 理動 動画", as in Lucene's
+CJKAnalyzer) and queries are tokenized the same way and matched as phrases.
+A single-character query cannot be a bigram prefix when the character ends a
+run ("理" in "料理"), so the distinct CJK characters are also indexed as
+unigrams in search_cjk and such queries are matched against that column.
+Other text is NFKC-normalized, case-folded and split on non-word characters.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Set
+import asyncio
+import re
+import unicodedata
+
+from loguru import logger
+from sqlalchemy import select, text, event
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal, is_sqlite
+from app.models.creative import Creative
+from app.models.video_index import IndexedVideo
+from app.services.social_media.video_record import VideoRecord
+
+settings = get_settings()
+
+# Hiragana, Katakana, CJK ideographs (incl. extension A) and Hangul syllables
+CJK_CHARS = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af"
+TOKEN_PATTERN = re.compile(rf"([{CJK_CHARS}]+)|([^\W_{CJK_CHARS}]+)")
+CJK_PATTERN = re.compile(rf"[{CJK_CHARS}]")
+
+# Long descriptions add little ranking signal beyond this
+MAX_BODY_CHARS = 2000
+
+# Weights for (title, tags, description, CJK unigrams) in FTS5 bm25()
+BM25_WEIGHTS = (10.0, 5.0, 1.0, 2.0)
+
+LOCAL_SEARCH_ORDERS = {
+    "relevance": "score",
+    "date": "published_ts DESC",
+    "viewCount": "views DESC",
+    "rating": "likes DESC",
+}
+
+
+def _token_groups(value: str) -> List[List[str]]:
+    """Word tokens and CJK bigram runs, each run kept as one group"""
+    groups = []
+    for cjk, word in TOKEN_PATTERN.findall(unicodedata.normalize("NFKC", value or "").casefold()):
+        if word:
+            groups.append([word])
+        elif len(cjk) == 1:
+            groups.append([cjk])
+        else:
+            groups.append([cjk[i:i + 2] for i in range(len(cjk) - 1)])
+    return groups
+
+
+def tokenize(value: str) -> str:
+    """Space-separated index tokens for a piece of text"""
+    return " ".join(token for group in _token_groups(value) for token in group)
+
+
+def cjk_unigrams(*values: str) -> str:
+    """Distinct CJK characters of the given texts, space-separated"""
+    normalized = unicodedata.normalize("NFKC", " ".join(values)).casefold()
+    return " ".join(dict.fromkeys(CJK_PATTERN.findall(normalized)))
+
+
+def _is_unigram(group: List[str]) -> bool:
+    return len(group) == 1 and CJK_PATTERN.fullmatch(group[0]) is not None
+
+
+def fts5_query(query: str) -> Optional[str]:
+    """
+    FTS5 MATCH expression: every group as a phrase, the last one prefix-matched
+
+    Single CJK characters are matched against the unigram column instead.
+    """
+    groups = _token_groups(query)
+    if not groups:
+        return None
+    phrases = []
+    for index, group in enumerate(groups):
+        phrase = '"' + " ".join(group) + '"'
+        if _is_unigram(group):
+            phrase = f"search_cjk : {phrase}"
+        elif index == len(groups) - 1 and len(group) == 1:
+            phrase += "*"
+        phrases.append(phrase)
+    return " ".join(phrases)
+
+
+def tsquery(query: str) -> Optional[str]:
+    """to_tsquery('simple', ...) expression equivalent to fts5_query (unigrams carry weight D)"""
+    groups = _token_groups(query)
+    if not groups:
+        return None
+    phrases = []
+    for index, group in enumerate(groups):
+        phrase = " <-> ".join(group)
+        if _is_unigram(group):
+            phrase += ":D"
+        elif index == len(groups) - 1 and len(group) == 1:
+            phrase += ":*"
+        phrases.append(phrase)
+    return " & ".join(f"({phrase})" for phrase in phrases)
+
+
+def _index_row(video: VideoRecord, source: str) -> dict:
+    return {
+        "video_id": video.video_id,
+        "title": video.title,
+        "description": video.description,
+        "tags": list(video.tags),
+        "channel_id": video.channel_id,
+        "channel_title": video.channel_title,
+        "category_id": video.category_id,
+        "thumbnail_url": video.thumbnail_url,
+        "duration_seconds": video.duration_seconds,
+        "published_ts": video.published_ts,
+        "views": video.views,
+        "likes": video.likes,
+        "comments": video.comments,
+        "search_title": tokenize(video.title),
+        "search_tags": tokenize(" ".join(video.tags)),
+        "search_body": tokenize(video.description[:MAX_BODY_CHARS]),
+        "search_cjk": cjk_unigrams(video.title, " ".join(video.tags), video.description[:MAX_BODY_CHARS]),
+        "source": source,
+    }
+
+
+def _creative_row(creative: Creative) -> dict:
+    """Text fields of a collected YouTube creative (statistics come from API fetches)"""
+    title = creative.title or ""
+    description = creative.description or creative.caption or ""
+    tags = list(creative.hashtags or [])
+    return {
+        "video_id": creative.platform_creative_id,
+        "title": title,
+        "description": description,
+        "tags": tags,
+        "thumbnail_url": creative.thumbnail_url,
+        "duration_seconds": int(creative.duration_seconds or 0),
+        "published_ts": creative.published_at.timestamp() if creative.published_at else None,
+        "search_title": tokenize(title),
+        "search_tags": tokenize(" ".join(tags)),
+        "search_body": tokenize(description[:MAX_BODY_CHARS]),
+        "search_cjk": cjk_unigrams(title, " ".join(tags), description[:MAX_BODY_CHARS]),
+        "source": "creative",
+    }
+
+
+def _to_record(row: IndexedVideo) -> VideoRecord:
+    return VideoRecord(
+        video_id=row.video_id,
+        title=row.title,
+        description=row.description,
+        channel_id=row.channel_id,
+        channel_title=row.channel_title,
+        published_ts=row.published_ts,
+        thumbnail_url=row.thumbnail_url,
+        duration_seconds=row.duration_seconds or 0,
+        views=row.views or 0,
+        likes=row.likes or 0,
+        comments=row.comments or 0,
+        tags=tuple(row.tags or ()),
+        category_id=row.category_id
+    )
+
+
+def _upsert_statement(rows: List[dict]):
+    dialect_insert = sqlite.insert if is_sqlite else postgresql.insert
+    statement = dialect_insert(IndexedVideo).values(rows)
+    return statement.on_conflict_do_update(
+        index_elements=[IndexedVideo.video_id],
+        set_={
+            column: statement.excluded[column]
+            for column in rows[0]
+            if column != "video_id"
+        }
+    )
+
+
+class VideoIndex:
+    """Upserts fetched videos into the local index and searches it"""
+
+    def __init__(self):
+        self._pending: Set[asyncio.Task] = set()
+
+    async def upsert(self, videos: Iterable[VideoRecord], source: str) -> int:
+        """Insert or refresh videos in the index; returns the number written"""
+        rows = list({video.video_id: _index_row(video, source) for video in videos}.values())
+        if not rows:
+            return 0
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(_upsert_statement(rows))
+            await db.commit()
+        return len(rows)
+
+    def index_in_background(self, videos: List[VideoRecord], source: str) -> None:
+        """Schedule an upsert without delaying the caller (no-op when VIDEO_INDEX_ENABLED is off)"""
+        if not settings.VIDEO_INDEX_ENABLED or not videos:
+            return
+        task = asyncio.get_running_loop().create_task(self._upsert_logged(videos, source))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def drain(self) -> None:
+        """Wait for scheduled upserts (shutdown)"""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    async def search(
+        self,
+        query: str,
+        max_results: int = 50,
+        order: str = "relevance",
+        min_views: Optional[int] = None,
+        published_after_hours: Optional[int] = None
+    ) -> List[VideoRecord]:
+        """
+        Ranked local search
+
+        Args:
+            query: Keyword(s); the last word is prefix-matched
+            max_results: Number of results
+            order: relevance (BM25), date, viewCount or rating (likes)
+            min_views: Only videos with at least this many views
+            published_after_hours: Only videos published within the last N hours
+        """
+        match = fts5_query(query) if is_sqlite else tsquery(query)
+        if match is None:
+            return []
+
+        params = {"match": match, "limit": max_results}
+        filters = []
+        if min_views:
+            filters.append("v.views >= :min_views")
+            params["min_views"] = min_views
+        if published_after_hours:
+            filters.append("v.published_ts >= :since")
+            params["since"] = (datetime.now(timezone.utc) - timedelta(hours=published_after_hours)).timestamp()
+        where = "".join(f" AND {condition}" for condition in filters)
+        order_by = LOCAL_SEARCH_ORDERS.get(order, "score")
+
+        if is_sqlite:
+            weights = ", ".join(str(weight) for weight in BM25_WEIGHTS)
+            sql = (
+                f"SELECT v.*, bm25(indexed_videos_fts, {weights}) AS score "
+                f"FROM indexed_videos_fts JOIN indexed_videos v ON v.id = indexed_videos_fts.rowid "
+                f"WHERE indexed_videos_fts MATCH :match{where} "
+                f"ORDER BY {order_by} LIMIT :limit"
+            )
+        else:
+            # ts_rank_cd is higher-is-better; negate so 'score' sorts ascending like bm25()
+            sql = (
+                f"SELECT v.*, -ts_rank_cd(v.search_vector, q) AS score "
+                f"FROM indexed_videos v, to_tsquery('simple', :match) q "
+                f"WHERE v.search_vector @@ q{where} "
+                f"ORDER BY {order_by} LIMIT :limit"
+            )
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(IndexedVideo).from_statement(text(sql)), params)
+            return [_to_record(row) for row in result.scalars()]
+
+    async def _upsert_logged(self, videos: List[VideoRecord], source: str) -> None:
+        try:
+            await self.upsert(videos, source)
+        except Exception as e:
+            logger.warning(f"Video index update failed: {str(e)}")
+
+
+# Singleton instance
+video_index = VideoIndex()
+
+
+@event.listens_for(Creative, "after_insert")
+@event.listens_for(Creative, "after_update")
+def _index_creative(mapper, connection, target: Creative):
+    """Index YouTube creatives in the same transaction that writes them"""
+    if not settings.VIDEO_INDEX_ENABLED or "youtube.com" not in (target.platform_url or ""):
+        return
+    connection.execute(_upsert_statement([_creative_row(target)]))
@@ -0,0 +1,79 @@
+"""
+Compact trending video record
+
+YouTube items are parsed once into a slotted dataclass holding only what
+analysis, scoring and the API need: int statistics, the publish time as an
+epoch timestamp, duration in seconds, and tags/category/channel ids interned
+by the service (the same few values repeat across every trending list). The
+raw API payload is not kept.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+
+def format_duration(seconds: int) -> str:
+    """Format seconds to HH:MM:SS or MM:SS"""
+    hours = seconds // 3600
+    minutes = (seconds % 3600) // 60
+    secs = seconds % 60
+
+    if hours > 0:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes}:{secs:02d}"
+
+
+@dataclass(slots=True)
+class VideoRecord:
+    """Parsed YouTube video with only the fields we use"""
+    video_id: str
+    title: str
+    description: str
+    channel_id: str
+    channel_title: str
+    published_ts: Optional[float]
+    thumbnail_url: Optional[str]
+    duration_seconds: int
+    views: int
+    likes: int
+    comments: int
+    tags: Tuple[str, ...]
+    category_id: str
+
+    @property
+    def url(self) -> str:
+        return f"https://www.youtube.com/watch?v={self.video_id}"
+
+    @property
+    def published_at(self) -> Optional[datetime]:
+        if self.published_ts is None:
+            return None
+        return datetime.fromtimestamp(self.published_ts, timezone.utc)
+
+    @property
+    def duration_formatted(self) -> str:
+        return format_duration(self.duration_seconds)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The fields exposed by the API (TrendingVideoResponse shape)"""
+        published_at = self.published_at
+        return {
+            "video_id": self.video_id,
+            "url": self.url,
+            "title": self.title,
+            "description": self.description,
+            "channel_id": self.channel_id,
+            "channel_title": self.channel_title,
+            "published_at": published_at.isoformat() if published_at else None,
+            "thumbnail_url": self.thumbnail_url,
+            "duration_seconds": self.duration_seconds,
+            "duration_formatted": self.duration_formatted,
+            "statistics": {
+                "views": self.views,
+                "likes": self.likes,
+                "comments": self.comments,
+            },
+            "tags": list(self.tags),
+            "category_id": self.category_id
+        }
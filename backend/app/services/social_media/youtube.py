@@ -2,16 +2,17 @@
 YouTube data collection service using YouTube Data API v3
 """
 
-import httpx
 import asyncio
 from typing import List, Dict, Optional, Any
 from datetime import datetime, timezone
 from loguru import logger
 
 from app.core.config import get_settings
+from app.core.http_client import create_http_client
 from app.core.monitoring import metrics
 from app.models.account import Account
 from app.models.creative import Creative, CreativeType, ContentType
+from app.services.social_media.duration import parse_duration
 
 settings = get_settings()
 
@@ -19,7 +20,7 @@ class YouTubeCollector:
     """YouTube data collector using YouTube Data API v3"""
     
     def __init__(self):
-        self.api_base = "https://www.googleapis.com/youtube/v3"
+        self.api_base = settings.YOUTUBE_API_BASE.rstrip("/")
         self.api_key = settings.YOUTUBE_API_KEY
         
     async def collect_channel_videos(self, account: Account, limit: int = 50) -> List[Dict[str, Any]]:
@@ -70,7 +71,7 @@ class YouTubeCollector:
                 "key": self.api_key
             }
             
-            async with httpx.AsyncClient() as client:
+            async with create_http_client("youtube") as client:
                 response = await client.get(url, params=params)
                 metrics.record_api_call("youtube", "channel_info")
                 
@@ -101,7 +102,7 @@ class YouTubeCollector:
                 "key": self.api_key
             }
             
-            async with httpx.AsyncClient() as client:
+            async with create_http_client("youtube") as client:
                 response = await client.get(url, params=params)
                 metrics.record_api_call("youtube", "playlist_items")
                 
@@ -138,7 +139,7 @@ class YouTubeCollector:
                     "key": self.api_key
                 }
                 
-                async with httpx.AsyncClient() as client:
+                async with create_http_client("youtube") as client:
                     response = await client.get(url, params=params)
                     metrics.record_api_call("youtube", "video_details")
                     
@@ -184,6 +185,7 @@ class YouTubeCollector:
                 "thumbnail_url": snippet.get("thumbnails", {}).get("high", {}).get("url"),
                 "published_at": published_at,
                 "duration": content_details.get("duration", ""),
+                "duration_seconds": parse_duration(content_details.get("duration", "")),
                 "metrics": {
                     "views": int(statistics.get("viewCount", 0)),
                     "likes": int(statistics.get("likeCount", 0)),
@@ -209,7 +211,7 @@ class YouTubeCollector:
                 "key": self.api_key
             }
             
-            async with httpx.AsyncClient() as client:
+            async with create_http_client("youtube") as client:
                 response = await client.get(url, params=params)
                 metrics.record_api_call("youtube", "channel_info")
                 
@@ -251,7 +253,7 @@ class YouTubeCollector:
                 "key": self.api_key
             }
             
-            async with httpx.AsyncClient() as client:
+            async with create_http_client("youtube") as client:
                 response = await client.get(url, params=params)
                 metrics.record_api_call("youtube", "search")
                 
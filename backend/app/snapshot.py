@@ -0,0 +1,23 @@
+"""
+Trending chart snapshot
+Run with: python -m app.snapshot
+
+Captures the mostPopular chart of every region in TRENDING_SNAPSHOT_REGIONS
+once, for cron-driven deployments (e.g. every 15 minutes) instead of the
+in-process scheduler.
+"""
+
+import asyncio
+
+from app.services.social_media.trending_snapshotter import trending_snapshotter
+
+
+def main():
+    """Capture one snapshot of each configured region"""
+    results = asyncio.run(trending_snapshotter.capture_all())
+    for region, count in results.items():
+        print(f"{region}: {count} videos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+ISO 8601 duration parsing benchmark
+Compares the previous per-call parser (import + re.match on every call, no
+day support) against the shared precompiled parser with and without its memo
+cache, over the durations of the local YouTube fake corpus.
+
+Run with: python -m benchmarks.bench_duration --iterations 200
+"""
+
+import argparse
+import os
+import time
+
+# Settings are required to import the app modules; the values are never used
+for name, value in {
+    "SECRET_KEY": "benchmark",
+    "DATABASE_URL": "sqlite+aiosqlite:///./benchmark.db",
+    "REDIS_URL": "redis://localhost:6379/0",
+    "YOUTUBE_API_KEY": "benchmark",
+    "OPENAI_API_KEY": "benchmark",
+    "CELERY_BROKER_URL": "redis://localhost:6379/1",
+    "CELERY_RESULT_BACKEND": "redis://localhost:6379/2",
+}.items():
+    os.environ.setdefault(name, value)
+
+from app.services.social_media.duration import parse_duration
+from stubs.youtube_fake import generate_corpus
+
+
+def _previous_parse_duration(duration: str) -> int:
+    """The parser youtube_trending used before"""
+    try:
+        import re
+        match = re.match(r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?', duration)
+        if match:
+            hours = int(match.group(1) or 0)
+            minutes = int(match.group(2) or 0)
+            seconds = int(match.group(3) or 0)
+            return hours * 3600 + minutes * 60 + seconds
+    except Exception:
+        pass
+    return 0
+
+
+def _time_per_call(func, values, iterations: int) -> float:
+    """Nanoseconds per parsed value"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for value in values:
+            func(value)
+    return (time.perf_counter() - start) / (iterations * len(values)) * 1_000_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ISO 8601 duration parsing")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--videos", type=int, default=1000)
+    args = parser.parse_args()
+
+    corpus = generate_corpus(videos=args.videos, channels=max(1, args.videos // 10), seed=42)
+    # ~1% are day-long streams ("P1DT2H3M4S"), which the previous parser returned 0 for
+    durations = [item["contentDetails"]["duration"] for item in corpus.videos]
+
+    uncached = parse_duration.__wrapped__
+    mismatches = [value for value in durations if "D" not in value and _previous_parse_duration(value) != uncached(value)]
+    assert not mismatches, f"parsers disagree on {mismatches[:5]}"
+
+    long_streams = sum(1 for value in durations if "D" in value)
+    print(f"{len(durations)} durations, {len(set(durations))} distinct, {long_streams} with days")
+    for name, func in [
+        ("previous (import + re.match)", _previous_parse_duration),
+        ("precompiled", uncached),
+        ("precompiled + lru_cache", parse_duration),
+    ]:
+        print(f"{name:<30} {_time_per_call(func, durations, args.iterations):>8.1f} ns/value")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark
+Measures how long a fresh interpreter takes to import the app (what every
+worker pays before serving), and lists the slowest modules from -X importtime.
+Uses the current environment/.env for settings.
+
+Run with: python -m benchmarks.bench_import --runs 5 --module app.main
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+
+def time_import(module: str) -> float:
+    """Wall-clock seconds for a fresh interpreter to import the module"""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", f"import {module}"], check=True)
+    return time.perf_counter() - start
+
+
+def slowest_imports(module: str, top: int):
+    """(cumulative µs, module) for the slowest imports, from -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        check=True,
+        capture_output=True,
+        text=True
+    )
+
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        timings.append((int(cumulative), name.strip()))
+    return sorted(timings, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark app import time")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    samples = [time_import(args.module) for _ in range(args.runs)]
+    print(
+        f"import {args.module}: median {statistics.median(samples) * 1000:.0f} ms, "
+        f"min {min(samples) * 1000:.0f} ms over {args.runs} runs"
+    )
+
+    print("\nSlowest imports (cumulative):")
+    for cumulative, name in slowest_imports(args.module, args.top):
+        print(f"{cumulative / 1000:>9.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
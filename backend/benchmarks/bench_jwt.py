@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+JWT backend benchmark
+Compares create_access_token/decode_token costs of each JWT backend, and the
+verified-token cache hit path, for the HS256 tokens this API issues.
+
+Run with: python -m benchmarks.bench_jwt --iterations 20000
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.core.jwt_backends import JWT_BACKENDS, VerifiedTokenCache
+
+SECRET_KEY = "benchmark-secret-key-0123456789abcdef"
+ALGORITHM = "HS256"
+
+
+def _claims() -> dict:
+    return {
+        "sub": "12345",
+        "exp": datetime.now(timezone.utc) + timedelta(minutes=30)
+    }
+
+
+def _time_per_op(func, iterations: int) -> float:
+    """Microseconds per call"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def bench_backend(backend, iterations: int) -> dict:
+    claims = _claims()
+    token = backend.encode(claims, SECRET_KEY, ALGORITHM)
+
+    cache = VerifiedTokenCache(maxsize=1024)
+    cache.set(token, backend.decode(token, SECRET_KEY, ALGORITHM))
+
+    return {
+        "encode_us": _time_per_op(lambda: backend.encode(claims, SECRET_KEY, ALGORITHM), iterations),
+        "decode_us": _time_per_op(lambda: backend.decode(token, SECRET_KEY, ALGORITHM), iterations),
+        "cached_decode_us": _time_per_op(lambda: cache.get(token), iterations),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JWT backends")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'backend':<8} {'encode µs':>10} {'decode µs':>10} {'cached µs':>10}")
+    for name, backend_class in JWT_BACKENDS.items():
+        try:
+            backend = backend_class()
+        except ImportError:
+            print(f"{name:<8} not installed")
+            continue
+
+        result = bench_backend(backend, args.iterations)
+        print(
+            f"{name:<8} {result['encode_us']:>10.1f} {result['decode_us']:>10.1f} "
+            f"{result['cached_decode_us']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Trending list serialization benchmark
+Compares the CPU cost per request of serializing a 50-video trending list:
+FastAPI's default path (validate into response models, jsonable_encoder,
+stdlib json) against orjson and the TypedDict TypeAdapter used by the
+trending endpoints. Videos come from the local YouTube fake corpus.
+
+Run with: python -m benchmarks.bench_serialization --iterations 500
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import List
+
+# Settings are required to import the app modules; the values are never used
+for name, value in {
+    "SECRET_KEY": "benchmark",
+    "DATABASE_URL": "sqlite+aiosqlite:///./benchmark.db",
+    "REDIS_URL": "redis://localhost:6379/0",
+    "YOUTUBE_API_KEY": "benchmark",
+    "OPENAI_API_KEY": "benchmark",
+    "CELERY_BROKER_URL": "redis://localhost:6379/1",
+    "CELERY_RESULT_BACKEND": "redis://localhost:6379/2",
+}.items():
+    os.environ.setdefault(name, value)
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.api.v1.endpoints.trending import TrendingVideoResponse
+from app.schemas.trending import trending_video_list_adapter
+from app.services.social_media.youtube_trending import youtube_trending
+from stubs.youtube_fake import generate_corpus
+
+
+def _trending_list(size: int) -> list:
+    corpus = generate_corpus(videos=size, channels=max(1, size // 10), seed=42)
+    return [youtube_trending._normalize_trending_video(item).to_dict() for item in corpus.videos]
+
+
+def _time_per_call(func, iterations: int) -> float:
+    """Microseconds per call"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark trending list serialization")
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--videos", type=int, default=50)
+    args = parser.parse_args()
+
+    videos = _trending_list(args.videos)
+    model_list_adapter = TypeAdapter(List[TrendingVideoResponse])
+
+    def fastapi_default():
+        models = model_list_adapter.validate_python(videos)
+        return json.dumps(jsonable_encoder(models), ensure_ascii=False).encode()
+
+    def validate_then_orjson():
+        models = model_list_adapter.validate_python(videos)
+        return orjson.dumps([model.model_dump() for model in models])
+
+    def typed_dict_adapter():
+        return trending_video_list_adapter.dump_json(videos)
+
+    cases = [
+        ("validate + jsonable_encoder + json", fastapi_default),
+        ("validate + orjson", validate_then_orjson),
+        ("TypedDict TypeAdapter.dump_json", typed_dict_adapter),
+    ]
+
+    print(f"{len(videos)} videos, response {len(typed_dict_adapter()) / 1024:.1f} KiB")
+    for name, func in cases:
+        print(f"{name:<36} {_time_per_call(func, args.iterations):>9.1f} µs/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Viral scoring benchmark
+Compares scoring a list of videos one at a time in Python (the previous
+per-video path) against the NumPy batch scorer, and checks that both give
+the same scores. Videos come from the local YouTube fake corpus.
+
+Run with: python -m benchmarks.bench_viral_scoring --videos 1000
+"""
+
+import argparse
+import os
+import time
+
+# Settings are required to import the app modules; the values are never used
+for name, value in {
+    "SECRET_KEY": "benchmark",
+    "DATABASE_URL": "sqlite+aiosqlite:///./benchmark.db",
+    "REDIS_URL": "redis://localhost:6379/0",
+    "YOUTUBE_API_KEY": "benchmark",
+    "OPENAI_API_KEY": "benchmark",
+    "CELERY_BROKER_URL": "redis://localhost:6379/1",
+    "CELERY_RESULT_BACKEND": "redis://localhost:6379/2",
+}.items():
+    os.environ.setdefault(name, value)
+
+import numpy as np
+
+from app.services.social_media.viral_scoring import score_videos
+from app.services.social_media.youtube_trending import youtube_trending
+from stubs.youtube_fake import generate_corpus
+
+
+def _score_one(video, now: float) -> float:
+    """Per-video reference implementation"""
+    engagement_rate = (video.likes + video.comments) / video.views * 100 if video.views > 0 else 0
+    hours = (now - video.published_ts) / 3600
+    views_per_hour = video.views / hours if hours > 0 else 0
+    recency = 0
+    if hours < 24:
+        recency = 30 * (1 - hours / 24)
+    elif hours < 72:
+        recency = 15 * (1 - (hours - 24) / 48)
+    return min(100, max(0, min(40, views_per_hour / 100) + min(30, engagement_rate * 3) + recency))
+
+
+def _time_per_call(func, iterations: int) -> float:
+    """Microseconds per call"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batch viral scoring")
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--videos", type=int, default=1000)
+    args = parser.parse_args()
+
+    corpus = generate_corpus(videos=args.videos, channels=max(1, args.videos // 10), seed=42)
+    videos = [youtube_trending._normalize_trending_video(item) for item in corpus.videos]
+    now = time.time()
+
+    reference = np.array([_score_one(video, now) for video in videos])
+    batch = score_videos(videos, now=now).viral_score
+    assert np.allclose(reference, batch), "batch scores differ from the reference"
+
+    cases = [
+        ("per-video Python", lambda: [_score_one(video, now) for video in videos]),
+        ("score_videos (NumPy)", lambda: score_videos(videos, now=now)),
+        ("score_videos + summaries()", lambda: score_videos(videos, now=now).summaries()),
+    ]
+
+    print(f"{len(videos)} videos")
+    for name, func in cases:
+        print(f"{name:<28} {_time_per_call(func, args.iterations):>9.1f} µs/batch")
+
+
+if __name__ == "__main__":
+    main()
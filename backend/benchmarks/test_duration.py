@@ -0,0 +1,23 @@
+"""
+ISO 8601 duration parsing cases (the parser benchmarked by bench_duration)
+Run with: python -m pytest benchmarks/test_duration.py
+"""
+
+import pytest
+
+from app.services.social_media.duration import parse_duration
+
+
+@pytest.mark.parametrize("duration, seconds", [
+    ("PT4M13S", 253),
+    ("P1DT2H", 26 * 3600),
+    ("P0D", 0),
+    ("P1W", 7 * 86400),
+    ("PT1.5S", 1),  # fractions are truncated to whole seconds
+    ("P1DT", 0),  # "T" without a time component is malformed
+    ("P", 0),
+    ("PT", 0),
+    ("", 0),
+])
+def test_parse_duration(duration, seconds):
+    assert parse_duration(duration) == seconds
@@ -0,0 +1,21 @@
+"""
+Shared pytest setup
+Run with: python -m pytest
+"""
+
+import os
+import tempfile
+
+# Settings are required to import the app modules; tests use a throwaway SQLite file
+for name, value in {
+    "SECRET_KEY": "test",
+    "DATABASE_URL": f"sqlite+aiosqlite:///{os.path.join(tempfile.gettempdir(), 'creaft-test.db')}",
+    "REDIS_URL": "redis://localhost:6379/0",
+    "YOUTUBE_API_KEY": "test",
+    "OPENAI_API_KEY": "test",
+    "CELERY_BROKER_URL": "redis://localhost:6379/1",
+    "CELERY_RESULT_BACKEND": "redis://localhost:6379/2",
+    "ALLOWED_HOSTS": '["testserver"]',
+    "PASSWORD_HASH_ROUNDS": "4",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Local OpenAI-compatible stub server
+Speaks the chat-completions API (including streaming) so AI endpoints can be
+load and latency tested without calling paid OpenAI.
+
+Run with: python -m stubs.openai_stub --port 8100 --latency-dist lognormal --latency-ms 800
+Then set OPENAI_BASE_URL=http://127.0.0.1:8100/v1 for the backend.
+
+Replies are chosen in this order:
+1. A canned/templated file in --templates-dir named after the json_schema
+   (e.g. BuzzAnalysis.json). "{{model}}", "{{prompt_tokens}}" and "{{now}}"
+   placeholders are substituted.
+2. A value synthesized from the request's json_schema response_format.
+3. A short plain-text reply.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# Roughly 4 characters per token for English text
+CHARS_PER_TOKEN = 4
+
+
+@dataclass
+class StubConfig:
+    """Latency, throughput and output settings for the stub"""
+    latency_dist: str = "fixed"  # fixed, uniform, normal, lognormal
+    latency_ms: float = 300.0  # time to first token (mean/median)
+    latency_spread_ms: float = 100.0  # stddev (normal), half-range (uniform)
+    lognormal_sigma: float = 0.5
+    tokens_per_second: float = 80.0  # 0 = no generation delay
+    error_rate: float = 0.0  # fraction of requests answered with 429
+    templates_dir: Optional[Path] = None
+    seed: Optional[int] = None
+
+
+class LatencyModel:
+    """Samples time-to-first-token and per-token delays"""
+
+    def __init__(self, config: StubConfig):
+        self.config = config
+        self.random = random.Random(config.seed)
+
+    def first_token_delay(self) -> float:
+        """Return time to first token in seconds"""
+        config = self.config
+        if config.latency_dist == "uniform":
+            value = self.random.uniform(
+                config.latency_ms - config.latency_spread_ms,
+                config.latency_ms + config.latency_spread_ms
+            )
+        elif config.latency_dist == "normal":
+            value = self.random.gauss(config.latency_ms, config.latency_spread_ms)
+        elif config.latency_dist == "lognormal":
+            value = config.latency_ms * self.random.lognormvariate(0, config.lognormal_sigma)
+        else:
+            value = config.latency_ms
+        return max(0.0, value) / 1000
+
+    def generation_delay(self, tokens: int) -> float:
+        """Return time to generate the given number of tokens in seconds"""
+        if self.config.tokens_per_second <= 0:
+            return 0.0
+        return tokens / self.config.tokens_per_second
+
+    def should_fail(self) -> bool:
+        return self.config.error_rate > 0 and self.random.random() < self.config.error_rate
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count"""
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def _message_text(messages: List[Dict[str, Any]]) -> str:
+    """Flatten chat messages (including multi-part content) into text"""
+    parts = []
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            parts.append(content)
+        elif isinstance(content, list):
+            parts.extend(part.get("text", "") for part in content if part.get("type") == "text")
+    return "\n".join(parts)
+
+
+def synthesize_from_schema(schema: Dict[str, Any], defs: Dict[str, Any], name: str = "value") -> Any:
+    """Build a value that conforms to a (strict) JSON schema"""
+    if "$ref" in schema:
+        schema = defs[schema["$ref"].split("/")[-1]]
+
+    schema_type = schema.get("type")
+    if "enum" in schema:
+        return schema["enum"][0]
+    if schema_type == "object":
+        return {
+            key: synthesize_from_schema(prop, defs, key)
+            for key, prop in schema.get("properties", {}).items()
+        }
+    if schema_type == "array":
+        return [synthesize_from_schema(schema.get("items", {}), defs, name) for _ in range(3)]
+    if schema_type == "integer":
+        return 7
+    if schema_type == "number":
+        return 7.0
+    if schema_type == "boolean":
+        return True
+    return f"Sample {name.replace('_', ' ')}"
+
+
+class ChatCompletionStub:
+    """Builds chat completion payloads for a request"""
+
+    def __init__(self, config: StubConfig):
+        self.config = config
+        self.latency = LatencyModel(config)
+
+    def render_content(self, body: Dict[str, Any], prompt_tokens: int) -> str:
+        """Produce the assistant message content for a request"""
+        response_format = body.get("response_format") or {}
+        json_schema = response_format.get("json_schema") or {}
+        schema_name = json_schema.get("name")
+
+        if schema_name and self.config.templates_dir:
+            template_path = self.config.templates_dir / f"{schema_name}.json"
+            if template_path.exists():
+                template = template_path.read_text(encoding="utf-8")
+                return (
+                    template.replace("{{model}}", str(body.get("model", "")))
+                    .replace("{{prompt_tokens}}", str(prompt_tokens))
+                    .replace("{{now}}", str(int(time.time())))
+                )
+
+        if json_schema.get("schema"):
+            schema = json_schema["schema"]
+            return json.dumps(synthesize_from_schema(schema, schema.get("$defs", {})))
+
+        if response_format.get("type") == "json_object":
+            return json.dumps({"result": "Sample result"})
+
+        return "This is a stubbed completion from the local OpenAI stand-in."
+
+    def usage(self, prompt_tokens: int, completion_tokens: int) -> Dict[str, int]:
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+
+    async def complete(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        prompt_tokens = estimate_tokens(_message_text(body.get("messages", [])))
+        content = self.render_content(body, prompt_tokens)
+        completion_tokens = estimate_tokens(content)
+
+        await asyncio.sleep(
+            self.latency.first_token_delay() + self.latency.generation_delay(completion_tokens)
+        )
+
+        return {
+            "id": f"chatcmpl-stub-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content, "refusal": None},
+                "logprobs": None,
+                "finish_reason": "stop"
+            }],
+            "usage": self.usage(prompt_tokens, completion_tokens)
+        }
+
+    async def stream(self, body: Dict[str, Any]):
+        """Yield server-sent events for a streamed completion"""
+        prompt_tokens = estimate_tokens(_message_text(body.get("messages", [])))
+        content = self.render_content(body, prompt_tokens)
+        completion_tokens = estimate_tokens(content)
+        include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+
+        completion_id = f"chatcmpl-stub-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        model = body.get("model", "stub")
+
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None, usage=None) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if delta is not None else [],
+                "usage": usage
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+
+        await asyncio.sleep(self.latency.first_token_delay())
+        yield chunk({"role": "assistant", "content": ""})
+
+        per_token_delay = self.latency.generation_delay(1)
+        for start in range(0, len(content), CHARS_PER_TOKEN):
+            yield chunk({"content": content[start:start + CHARS_PER_TOKEN]})
+            if per_token_delay:
+                await asyncio.sleep(per_token_delay)
+
+        yield chunk({}, finish_reason="stop")
+        if include_usage:
+            yield chunk(None, usage=self.usage(prompt_tokens, completion_tokens))
+        yield "data: [DONE]\n\n"
+
+
+def create_app(config: StubConfig) -> FastAPI:
+    """Create the stub FastAPI application"""
+    app = FastAPI(title="OpenAI Stub", docs_url=None, redoc_url=None)
+    stub = ChatCompletionStub(config)
+
+    @app.get("/v1/models")
+    async def list_models():
+        return {"object": "list", "data": [{"id": "gpt-4o", "object": "model", "owned_by": "stub"}]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+
+        if stub.latency.should_fail():
+            return JSONResponse(
+                status_code=429,
+                content={"error": {"message": "Rate limit reached (stub)", "type": "rate_limit_error"}}
+            )
+
+        if body.get("stream"):
+            return StreamingResponse(stub.stream(body), media_type="text/event-stream")
+
+        return await stub.complete(body)
+
+    return app
+
+
+def main():
+    """Run the stub server"""
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-dist", choices=["fixed", "uniform", "normal", "lognormal"], default="fixed")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Time to first token (mean/median)")
+    parser.add_argument("--latency-spread-ms", type=float, default=100.0)
+    parser.add_argument("--lognormal-sigma", type=float, default=0.5)
+    parser.add_argument("--tokens-per-second", type=float, default=80.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--templates-dir", type=Path, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = StubConfig(
+        latency_dist=args.latency_dist,
+        latency_ms=args.latency_ms,
+        latency_spread_ms=args.latency_spread_ms,
+        lognormal_sigma=args.lognormal_sigma,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        templates_dir=args.templates_dir,
+        seed=args.seed
+    )
+
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
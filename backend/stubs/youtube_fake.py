@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+"""
+Local YouTube Data API v3 fake
+Implements videos (chart=mostPopular and id lists), search, channels and
+playlistItems with pagination, ETags, injected latency and quota errors, so
+collection and trending benchmarks can run offline and deterministically.
+
+Run with: python -m stubs.youtube_fake --port 8200 --latency-ms 120
+Then set YOUTUBE_API_BASE=http://127.0.0.1:8200/youtube/v3 for the backend.
+
+The corpus is loaded from --fixtures-dir (videos.json / channels.json, as
+written by `record` or `generate`) or generated from --seed when no fixtures
+exist:
+    python -m stubs.youtube_fake generate --out stubs/fixtures/youtube --videos 5000
+    python -m stubs.youtube_fake record --out stubs/fixtures/youtube --regions US,JP
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Quota cost per endpoint (YouTube Data API v3)
+QUOTA_COSTS = {"videos": 1, "channels": 1, "playlistItems": 1, "search": 100}
+
+REGIONS = ["US", "GB", "CA", "AU", "JP", "KR", "IN", "BR", "MX", "DE", "FR", "IT", "ES"]
+CATEGORIES = ["1", "2", "10", "15", "17", "19", "20", "22", "23", "24", "25", "26", "27", "28"]
+MAX_CHART_SIZE = 200
+
+# Generated publish dates count back from this date, so a seed always yields the same corpus
+DEFAULT_ANCHOR_DATE = "2026-01-01"
+
+TITLE_WORDS = [
+    "ultimate", "guide", "challenge", "reaction", "morning", "routine", "review",
+    "unboxing", "vlog", "recipe", "tutorial", "secret", "tips", "gaming", "live",
+    "highlights", "shorts", "travel", "tokyo", "fitness", "budget", "makeup",
+    "料理", "ルーティン", "検証", "まとめ", "旅行", "ゲーム実況", "vlog", "레시피"
+]
+
+
+@dataclass
+class FakeConfig:
+    """Latency, quota and corpus settings for the fake"""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    quota_limit: int = 0  # units per key before quotaExceeded, 0 = unlimited
+    quota_error_rate: float = 0.0  # fraction of requests answered with quotaExceeded
+    fixtures_dir: Optional[Path] = None
+    videos: int = 5000
+    channels: int = 250
+    seed: int = 42
+    anchor_date: str = DEFAULT_ANCHOR_DATE
+
+
+@dataclass
+class Corpus:
+    """In-memory fixture corpus"""
+    videos: List[Dict[str, Any]] = field(default_factory=list)
+    channels: List[Dict[str, Any]] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.videos_by_id = {video["id"]: video for video in self.videos}
+        self.channels_by_id = {channel["id"]: channel for channel in self.channels}
+        self.uploads: Dict[str, List[str]] = {}
+        for video in sorted(self.videos, key=lambda v: v["snippet"]["publishedAt"], reverse=True):
+            playlist_id = "UU" + video["snippet"]["channelId"][2:]
+            self.uploads.setdefault(playlist_id, []).append(video["id"])
+        self._charts: Dict[tuple, List[str]] = {}
+
+    def chart(self, region: str, category: Optional[str]) -> List[str]:
+        """mostPopular chart for a region/category, stable per corpus"""
+        key = (region, category)
+        if key not in self._charts:
+            candidates = [
+                video for video in self.videos
+                if category is None or video["snippet"]["categoryId"] == category
+            ]
+            rng = random.Random(f"{region}:{category}")
+            scored = sorted(
+                candidates,
+                key=lambda v: int(v["statistics"]["viewCount"]) * rng.uniform(0.2, 1.0),
+                reverse=True
+            )
+            self._charts[key] = [video["id"] for video in scored[:MAX_CHART_SIZE]]
+        return self._charts[key]
+
+    @classmethod
+    def load(cls, fixtures_dir: Path) -> "Corpus":
+        videos = json.loads((fixtures_dir / "videos.json").read_text(encoding="utf-8"))
+        channels_path = fixtures_dir / "channels.json"
+        channels = json.loads(channels_path.read_text(encoding="utf-8")) if channels_path.exists() else []
+        return cls(videos=videos, channels=channels)
+
+
+def _iso_duration(seconds: int) -> str:
+    days, seconds = divmod(seconds, 86400)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    value = "P"
+    if days:
+        value += f"{days}D"
+    value += "T"
+    if hours:
+        value += f"{hours}H"
+    if minutes:
+        value += f"{minutes}M"
+    if seconds or value.endswith("T"):
+        value += f"{seconds}S"
+    return value
+
+
+def _anchor(anchor_date: str) -> datetime:
+    """Midnight UTC of an ISO date (or of the current day for 'today')"""
+    if anchor_date == "today":
+        return datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    return datetime.fromisoformat(anchor_date).replace(tzinfo=timezone.utc)
+
+
+def generate_corpus(videos: int, channels: int, seed: int, anchor_date: str = DEFAULT_ANCHOR_DATE) -> Corpus:
+    """
+    Generate a deterministic corpus with realistic field shapes and sizes
+
+    Publish dates lie up to 60 days before anchor_date. The fixed default
+    keeps the corpus identical from day to day; "today" makes recency-based
+    scores realistic at the cost of that.
+    """
+    rng = random.Random(seed)
+    now = _anchor(anchor_date)
+
+    channel_items = []
+    for index in range(channels):
+        channel_id = f"UC{hashlib.md5(f'{seed}:channel:{index}'.encode()).hexdigest()[:22]}"
+        channel_items.append({
+            "kind": "youtube#channel",
+            "id": channel_id,
+            "snippet": {
+                "title": f"Channel {index} {rng.choice(TITLE_WORDS).title()}",
+                "description": "Official channel. New videos every week!",
+                "customUrl": f"@channel{index}",
+                "publishedAt": (now - timedelta(days=rng.randint(100, 4000))).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "thumbnails": {"high": {"url": f"https://yt3.ggpht.com/{channel_id}=s800"}}
+            },
+            "contentDetails": {"relatedPlaylists": {"uploads": "UU" + channel_id[2:]}},
+            "statistics": {
+                "subscriberCount": str(int(rng.lognormvariate(11, 2))),
+                "videoCount": "0",
+                "viewCount": "0"
+            }
+        })
+
+    video_items = []
+    for index in range(videos):
+        channel = rng.choice(channel_items)
+        video_id = hashlib.sha1(f"{seed}:video:{index}".encode()).hexdigest()[:11]
+        views = int(rng.lognormvariate(11, 2.2))
+        published = now - timedelta(minutes=rng.randint(30, 60 * 24 * 60))
+        words = rng.sample(TITLE_WORDS, 4)
+        title = " ".join(words).title()
+        tags = list(dict.fromkeys(rng.sample(TITLE_WORDS, rng.randint(0, 15))))
+        # Real descriptions are long and full of links, timestamps and sponsor text
+        description = "\n".join(
+            [f"{title} - thanks for watching!", ""]
+            + [f"{minute:02d}:{rng.randint(0, 59):02d} {rng.choice(TITLE_WORDS)}" for minute in range(rng.randint(0, 12))]
+            + ["", "This video is sponsored by Example. Use code FAKE for 20% off: https://example.com/sponsor"]
+            + [f"https://example.com/link/{rng.randint(1000, 9999)}" for _ in range(rng.randint(1, 8))]
+            + ["#" + tag.replace(" ", "") for tag in tags[:3]]
+        )
+        duration = rng.choice([rng.randint(15, 60), rng.randint(60, 600), rng.randint(600, 3600)])
+        if rng.random() < 0.01:
+            duration = rng.randint(86400, 172800)  # long live streams
+
+        video_items.append({
+            "kind": "youtube#video",
+            "id": video_id,
+            "snippet": {
+                "publishedAt": published.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "channelId": channel["id"],
+                "title": title,
+                "description": description,
+                "thumbnails": {
+                    size: {"url": f"https://i.ytimg.com/vi/{video_id}/{prefix}default.jpg"}
+                    for size, prefix in (("default", ""), ("medium", "mq"), ("high", "hq"))
+                },
+                "channelTitle": channel["snippet"]["title"],
+                "tags": tags,
+                "categoryId": rng.choice(CATEGORIES),
+                "liveBroadcastContent": "none",
+                "defaultAudioLanguage": rng.choice(["en", "ja", "ko"])
+            },
+            "contentDetails": {
+                "duration": _iso_duration(duration),
+                "dimension": "2d",
+                "definition": "hd",
+                "caption": "false"
+            },
+            "statistics": {
+                "viewCount": str(views),
+                "likeCount": str(int(views * rng.uniform(0.005, 0.08))),
+                "favoriteCount": "0",
+                "commentCount": str(int(views * rng.uniform(0.0005, 0.01)))
+            }
+        })
+
+    return Corpus(videos=video_items, channels=channel_items)
+
+
+def _etag(payload: Any) -> str:
+    digest = hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+class InvalidPageToken(ValueError):
+    """A pageToken this fake did not issue (answered with 400 invalidPageToken)"""
+
+
+def _page(items: List[Any], page_token: Optional[str], max_results: int) -> tuple:
+    """Slice items for a page, returns (page_items, next_token, prev_token)"""
+    offset = 0
+    if page_token:
+        if not (page_token.startswith("P") and page_token[1:].isdigit()):
+            raise InvalidPageToken(page_token)
+        offset = int(page_token[1:])
+    page_items = items[offset:offset + max_results]
+    next_token = f"P{offset + max_results}" if offset + max_results < len(items) else None
+    prev_token = f"P{max(0, offset - max_results)}" if offset > 0 else None
+    return page_items, next_token, prev_token
+
+
+def _search_item(resource: Dict[str, Any]) -> Dict[str, Any]:
+    kind = resource["kind"]
+    id_field = "videoId" if kind == "youtube#video" else "channelId"
+    snippet = {
+        "publishedAt": resource["snippet"]["publishedAt"],
+        "channelId": resource["snippet"].get("channelId", resource["id"]),
+        "title": resource["snippet"]["title"],
+        "description": resource["snippet"]["description"][:160],
+        "thumbnails": resource["snippet"]["thumbnails"],
+        "channelTitle": resource["snippet"].get("channelTitle", resource["snippet"]["title"])
+    }
+    return {"kind": "youtube#searchResult", "id": {"kind": kind, id_field: resource["id"]}, "snippet": snippet}
+
+
+def _filter_parts(resource: Dict[str, Any], parts: List[str]) -> Dict[str, Any]:
+    filtered = {"kind": resource["kind"], "id": resource["id"]}
+    for part in parts:
+        if part in resource:
+            filtered[part] = resource[part]
+    return filtered
+
+
+def create_app(config: FakeConfig):
+    """Create the fake FastAPI application"""
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse, Response
+
+    if config.fixtures_dir and (config.fixtures_dir / "videos.json").exists():
+        corpus = Corpus.load(config.fixtures_dir)
+    else:
+        corpus = generate_corpus(config.videos, config.channels, config.seed, config.anchor_date)
+
+    app = FastAPI(title="YouTube Data API Fake", docs_url=None, redoc_url=None)
+    rng = random.Random(config.seed)
+    quota_used: Dict[str, int] = {}
+
+    def error(status_code: int, reason: str, message: str) -> JSONResponse:
+        return JSONResponse(
+            status_code=status_code,
+            content={"error": {
+                "code": status_code,
+                "message": message,
+                "errors": [{"message": message, "domain": "youtube.quota" if reason == "quotaExceeded" else "youtube.parameter", "reason": reason}]
+            }}
+        )
+
+    async def handle(request: Request, resource: str, build):
+        if config.latency_ms or config.jitter_ms:
+            delay = config.latency_ms + rng.uniform(-config.jitter_ms, config.jitter_ms)
+            await asyncio.sleep(max(0.0, delay) / 1000)
+
+        key = request.query_params.get("key", "")
+        cost = QUOTA_COSTS[resource]
+        if config.quota_error_rate and rng.random() < config.quota_error_rate:
+            return error(403, "quotaExceeded", "The request cannot be completed because you have exceeded your quota.")
+        if config.quota_limit and quota_used.get(key, 0) + cost > config.quota_limit:
+            return error(403, "quotaExceeded", "The request cannot be completed because you have exceeded your quota.")
+        quota_used[key] = quota_used.get(key, 0) + cost
+
+        params = request.query_params
+        max_results = min(int(params.get("maxResults", 5)), 50)
+        try:
+            result = build(params, max_results)
+        except InvalidPageToken:
+            return error(400, "invalidPageToken", "The request specifies an invalid page token.")
+        if isinstance(result, JSONResponse):
+            return result
+
+        items, next_token, prev_token, total = result
+        payload = {"kind": f"youtube#{resource[:-1] if resource.endswith('s') else resource}ListResponse", "items": items}
+        etag = _etag(payload)
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+
+        body = {
+            "kind": payload["kind"],
+            "etag": etag.strip('"'),
+            "pageInfo": {"totalResults": total, "resultsPerPage": max_results},
+            "items": items
+        }
+        if next_token:
+            body["nextPageToken"] = next_token
+        if prev_token:
+            body["prevPageToken"] = prev_token
+        return JSONResponse(content=body, headers={"ETag": etag})
+
+    def build_videos(params, max_results):
+        parts = params.get("part", "snippet").split(",")
+        if params.get("chart") == "mostPopular":
+            ids = corpus.chart(params.get("regionCode", "US"), params.get("videoCategoryId"))
+            page_ids, next_token, prev_token = _page(ids, params.get("pageToken"), max_results)
+            total = len(ids)
+        elif params.get("id"):
+            page_ids = [video_id for video_id in params["id"].split(",")[:50] if video_id in corpus.videos_by_id]
+            next_token = prev_token = None
+            total = len(page_ids)
+        else:
+            return error(400, "missingRequiredParameter", "No filter selected. Expected one of: chart, id")
+        items = [_filter_parts(corpus.videos_by_id[video_id], parts) for video_id in page_ids]
+        return items, next_token, prev_token, total
+
+    def build_channels(params, max_results):
+        parts = params.get("part", "snippet").split(",")
+        ids = [channel_id for channel_id in params.get("id", "").split(",") if channel_id in corpus.channels_by_id]
+        items = []
+        for channel_id in ids:
+            channel = dict(corpus.channels_by_id[channel_id])
+            uploads = corpus.uploads.get("UU" + channel_id[2:], [])
+            channel["statistics"] = dict(
+                channel["statistics"],
+                videoCount=str(len(uploads)),
+                viewCount=str(sum(int(corpus.videos_by_id[v]["statistics"]["viewCount"]) for v in uploads))
+            )
+            items.append(_filter_parts(channel, parts))
+        return items, None, None, len(items)
+
+    def build_playlist_items(params, max_results):
+        playlist_id = params.get("playlistId", "")
+        if playlist_id not in corpus.uploads:
+            return error(404, "playlistNotFound", "The playlist identified with the request's playlistId parameter cannot be found.")
+        video_ids = corpus.uploads[playlist_id]
+        page_ids, next_token, prev_token = _page(video_ids, params.get("pageToken"), max_results)
+        items = [
+            {
+                "kind": "youtube#playlistItem",
+                "id": hashlib.md5(f"{playlist_id}:{video_id}".encode()).hexdigest(),
+                "contentDetails": {
+                    "videoId": video_id,
+                    "videoPublishedAt": corpus.videos_by_id[video_id]["snippet"]["publishedAt"]
+                }
+            }
+            for video_id in page_ids
+        ]
+        return items, next_token, prev_token, len(video_ids)
+
+    def build_search(params, max_results):
+        query = params.get("q", "").lower()
+        search_type = params.get("type", "video")
+        pool = corpus.channels if search_type == "channel" else corpus.videos
+
+        def matches(resource):
+            snippet = resource["snippet"]
+            haystack = " ".join([snippet["title"], snippet.get("description", "")] + snippet.get("tags", [])).lower()
+            return all(term in haystack for term in query.split())
+
+        results = [resource for resource in pool if matches(resource)]
+
+        published_after = params.get("publishedAfter")
+        if published_after:
+            cutoff = published_after.replace("+00:00Z", "Z").replace("+00:00", "Z")
+            results = [resource for resource in results if resource["snippet"]["publishedAt"] >= cutoff[:19] + "Z"]
+
+        order = params.get("order", "relevance")
+        if search_type == "video":
+            if order == "date":
+                results.sort(key=lambda v: v["snippet"]["publishedAt"], reverse=True)
+            elif order == "viewCount":
+                results.sort(key=lambda v: int(v["statistics"]["viewCount"]), reverse=True)
+            elif order == "rating":
+                results.sort(key=lambda v: int(v["statistics"]["likeCount"]), reverse=True)
+
+        page, next_token, prev_token = _page(results, params.get("pageToken"), max_results)
+        return [_search_item(resource) for resource in page], next_token, prev_token, len(results)
+
+    @app.get("/youtube/v3/videos")
+    async def videos(request: Request):
+        return await handle(request, "videos", build_videos)
+
+    @app.get("/youtube/v3/channels")
+    async def channels(request: Request):
+        return await handle(request, "channels", build_channels)
+
+    @app.get("/youtube/v3/playlistItems")
+    async def playlist_items(request: Request):
+        return await handle(request, "playlistItems", build_playlist_items)
+
+    @app.get("/youtube/v3/search")
+    async def search(request: Request):
+        return await handle(request, "search", build_search)
+
+    @app.get("/_fake/quota")
+    async def quota():
+        """Quota units consumed per API key"""
+        return quota_used
+
+    return app
+
+
+def write_corpus(corpus: Corpus, out_dir: Path):
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / "videos.json").write_text(json.dumps(corpus.videos, ensure_ascii=False), encoding="utf-8")
+    (out_dir / "channels.json").write_text(json.dumps(corpus.channels, ensure_ascii=False), encoding="utf-8")
+
+
+def record_corpus(api_key: str, regions: List[str], out_dir: Path):
+    """Record mostPopular charts (and their channels) from the real API as fixtures"""
+    import httpx
+
+    api_base = "https://www.googleapis.com/youtube/v3"
+    videos: Dict[str, Dict[str, Any]] = {}
+    with httpx.Client(timeout=30.0) as client:
+        for region in regions:
+            page_token = None
+            while True:
+                params = {
+                    "part": "snippet,contentDetails,statistics",
+                    "chart": "mostPopular",
+                    "regionCode": region,
+                    "maxResults": 50,
+                    "key": api_key
+                }
+                if page_token:
+                    params["pageToken"] = page_token
+                data = client.get(f"{api_base}/videos", params=params).raise_for_status().json()
+                for item in data.get("items", []):
+                    videos[item["id"]] = item
+                page_token = data.get("nextPageToken")
+                if not page_token:
+                    break
+
+        channel_ids = sorted({video["snippet"]["channelId"] for video in videos.values()})
+        channels = []
+        for i in range(0, len(channel_ids), 50):
+            data = client.get(f"{api_base}/channels", params={
+                "part": "snippet,contentDetails,statistics",
+                "id": ",".join(channel_ids[i:i + 50]),
+                "key": api_key
+            }).raise_for_status().json()
+            channels.extend(data.get("items", []))
+
+    write_corpus(Corpus(videos=list(videos.values()), channels=channels), out_dir)
+    print(f"Recorded {len(videos)} videos and {len(channels)} channels to {out_dir}")
+
+
+def main():
+    """Run the fake server or manage fixtures"""
+    parser = argparse.ArgumentParser(description="Local YouTube Data API v3 fake")
+    subparsers = parser.add_subparsers(dest="command")
+
+    generate = subparsers.add_parser("generate", help="Write a synthetic fixture corpus")
+    generate.add_argument("--out", type=Path, required=True)
+    generate.add_argument("--videos", type=int, default=5000)
+    generate.add_argument("--channels", type=int, default=250)
+    generate.add_argument("--seed", type=int, default=42)
+    generate.add_argument("--anchor-date", default=DEFAULT_ANCHOR_DATE, help="YYYY-MM-DD or 'today'")
+
+    record = subparsers.add_parser("record", help="Record fixtures from the real API (uses YOUTUBE_API_KEY)")
+    record.add_argument("--out", type=Path, required=True)
+    record.add_argument("--regions", default="US,JP")
+
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8200)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--quota-limit", type=int, default=0, help="Quota units per key, 0 = unlimited")
+    parser.add_argument("--quota-error-rate", type=float, default=0.0)
+    parser.add_argument("--fixtures-dir", type=Path, default=None)
+    parser.add_argument("--videos", type=int, default=5000)
+    parser.add_argument("--channels", type=int, default=250)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--anchor-date", default=DEFAULT_ANCHOR_DATE, help="Publish dates count back from this YYYY-MM-DD, or 'today'")
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        write_corpus(generate_corpus(args.videos, args.channels, args.seed, args.anchor_date), args.out)
+        return
+    if args.command == "record":
+        record_corpus(os.environ["YOUTUBE_API_KEY"], args.regions.split(","), args.out)
+        return
+
+    import uvicorn
+
+    config = FakeConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        quota_limit=args.quota_limit,
+        quota_error_rate=args.quota_error_rate,
+        fixtures_dir=args.fixtures_dir,
+        videos=args.videos,
+        channels=args.channels,
+        seed=args.seed,
+        anchor_date=args.anchor_date
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Query budget of GET /api/v1/creatives
+
+The creatives list eager-loads account, metrics and labels, so the number of
+statements must not grow with the number of creatives returned.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from app.core.auth import create_access_token
+from app.core.database import AsyncSessionLocal, Base, async_engine
+from app.core.query_profiler import assert_max_queries
+from app.core.user_cache import user_principal_cache
+from app.main import app
+from app.models.account import Account, Platform
+from app.models.creative import ContentType, Creative, CreativeType
+from app.models.label import Label, LabelType
+from app.models.metric import Metric
+from app.models.user import User
+
+CREATIVE_COUNT = 20
+
+# Creatives page, its account/metrics/labels eager loads and the total count
+CREATIVES_QUERY_BUDGET = 5
+
+
+@pytest_asyncio.fixture
+async def access_token():
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    user_principal_cache.clear()
+
+    async with AsyncSessionLocal() as db:
+        user = User(email="creator@example.com", username="creator", hashed_password="x")
+        account = Account(user=user, platform=Platform.YOUTUBE, platform_account_id="UC1", username="creator")
+        now = datetime.now(timezone.utc)
+        for index in range(CREATIVE_COUNT):
+            creative = Creative(
+                account=account,
+                platform_creative_id=f"video{index}",
+                platform_url=f"https://example.com/video{index}",
+                creative_type=CreativeType.ORGANIC,
+                content_type=ContentType.VIDEO,
+                published_at=now - timedelta(hours=index)
+            )
+            creative.metrics = [Metric(views=100 * day, measured_at=now - timedelta(days=day)) for day in range(3)]
+            creative.labels = [Label(label_type=LabelType.HOOK, label_value="question")]
+            db.add(creative)
+        await db.commit()
+        return create_access_token(data={"sub": str(user.id)})
+
+
+@pytest.mark.asyncio
+async def test_creatives_list_query_budget(access_token):
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {access_token}"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        # Warm the principal cache so the budget covers the listing only
+        await client.get("/api/v1/creatives/", params={"limit": 1}, headers=headers)
+
+        with assert_max_queries(CREATIVES_QUERY_BUDGET):
+            response = await client.get("/api/v1/creatives/", headers=headers)
+
+    assert response.status_code == 200
+    assert len(response.json()["creatives"]) == CREATIVE_COUNT